@@ -0,0 +1,39 @@
+"""empty message
+
+Revision ID: 84b856c98893
+Revises: cb04b42029b9
+Create Date: 2026-10-18 14:37:05.204418
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '84b856c98893'
+down_revision: Union[str, None] = 'cb04b42029b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The list endpoints page through organisationId ordered by
+    # (createdAt, id), which the composite indexes serve on their own.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_issue_credential_record_organisationId_createdAt', 'issue_credential_record', ['organisationId', 'createdAt', 'id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_verification_record_organisationId_createdAt', 'verification_record', ['organisationId', 'createdAt', 'id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_credential_organisationId_createdAt', 'credential', ['organisationId', 'createdAt', 'id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_issue_credential_record_organisationId', table_name='issue_credential_record', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_verification_record_organisationId', table_name='verification_record', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_credential_organisationId', table_name='credential', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_credential_organisationId', 'credential', ['organisationId'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_verification_record_organisationId', 'verification_record', ['organisationId'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_issue_credential_record_organisationId', 'issue_credential_record', ['organisationId'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_credential_organisationId_createdAt', table_name='credential', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_verification_record_organisationId_createdAt', table_name='verification_record', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_issue_credential_record_organisationId_createdAt', table_name='issue_credential_record', postgresql_concurrently=True, if_exists=True)
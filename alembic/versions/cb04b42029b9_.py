@@ -0,0 +1,48 @@
+"""empty message
+
+Revision ID: cb04b42029b9
+Revises: a3819b3c9d50
+Create Date: 2026-10-18 10:12:41.512093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cb04b42029b9'
+down_revision: Union[str, None] = 'a3819b3c9d50'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Built concurrently so that issuance is not blocked on large tables,
+    # which requires running outside of the migration transaction.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_issue_credential_record_authorisationCode', 'issue_credential_record', ['authorisationCode'], unique=True, postgresql_where=sa.text('"authorisationCode" IS NOT NULL'), postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_issue_credential_record_acceptanceToken', 'issue_credential_record', ['acceptanceToken'], unique=True, postgresql_where=sa.text('"acceptanceToken" IS NOT NULL'), postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_issue_credential_record_idTokenRequestState', 'issue_credential_record', ['idTokenRequestState'], unique=True, postgresql_where=sa.text('"idTokenRequestState" IS NOT NULL'), postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_issue_credential_record_clientId', 'issue_credential_record', ['clientId'], unique=False, postgresql_where=sa.text('"clientId" IS NOT NULL'), postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_issue_credential_record_organisationId', 'issue_credential_record', ['organisationId'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_issue_credential_record_dataAgreementId', 'issue_credential_record', ['dataAgreementId'], unique=False, postgresql_where=sa.text('"dataAgreementId" IS NOT NULL'), postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_verification_record_vp_token_request_state', 'verification_record', ['vp_token_request_state'], unique=True, postgresql_where=sa.text('vp_token_request_state IS NOT NULL'), postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_verification_record_organisationId', 'verification_record', ['organisationId'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_credential_organisationId', 'credential', ['organisationId'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_v2_data_agreement_organisationId_purpose', 'v2_data_agreement', ['organisationId', 'purpose'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_v2_data_agreement_organisationId_purpose', table_name='v2_data_agreement', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_credential_organisationId', table_name='credential', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_verification_record_organisationId', table_name='verification_record', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_verification_record_vp_token_request_state', table_name='verification_record', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_issue_credential_record_dataAgreementId', table_name='issue_credential_record', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_issue_credential_record_organisationId', table_name='issue_credential_record', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_issue_credential_record_clientId', table_name='issue_credential_record', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_issue_credential_record_idTokenRequestState', table_name='issue_credential_record', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_issue_credential_record_acceptanceToken', table_name='issue_credential_record', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_issue_credential_record_authorisationCode', table_name='issue_credential_record', postgresql_concurrently=True, if_exists=True)
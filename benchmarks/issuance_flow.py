@@ -0,0 +1,561 @@
+"""End-to-end OID4VCI issuance latency and throughput.
+
+Starts the server in process against the configured database and runs
+wallets concurrently through the issuance flows, timing every request:
+
+    pre-authorised:      offer, credential-offer, token, credential
+    authorisation-code:  offer, credential-offer, authorize, direct_post,
+                         token, credential
+
+"offer" is the issuer creating the credential offer through the config
+API. Wallet side signing is done before a request is timed, but the
+wallets share the event loop with the server, so compare results taken on
+the same machine only. Only Postgres is supported, the models use
+PostgreSQL column types.
+
+The authorisation code flow needs the issuer metadata discovered at
+startup, so the conformance service must be reachable.
+
+Save a baseline, then compare later runs against it:
+
+    python -m benchmarks.issuance_flow --concurrency 1 --concurrency 16 --save-baseline
+    python -m benchmarks.issuance_flow --concurrency 1 --concurrency 16 --compare-baseline
+"""
+import asyncio
+import json
+import logging
+import pathlib
+import socket
+import statistics
+import time
+import typing
+import urllib.parse
+import uuid
+
+import aiohttp
+import click
+from aiohttp import web
+
+from eudi_wallet.did_key import KeyDid, PublicKeyJWK
+from eudi_wallet.ebsi.entry_points.server.start import AppLogger, DBSetup, ServerSetup
+from eudi_wallet.ebsi.models.organisation import OrganisationModel
+from eudi_wallet.ebsi.utils.jwt import decode_header_and_claims_in_jwt
+from eudi_wallet.ebsi.value_objects.application.organisation import OrganisationRoles
+from eudi_wallet.ebsi.value_objects.domain.authn import AuthorisationGrants
+from eudi_wallet.siop_auth.util import generate_code_challenge, generate_code_verifier
+
+PRE_AUTHORISED = "pre-authorised"
+AUTHORISATION_CODE = "authorisation-code"
+FLOW_STEPS = {
+    PRE_AUTHORISED: ("offer", "credential-offer", "token", "credential"),
+    AUTHORISATION_CODE: (
+        "offer",
+        "credential-offer",
+        "authorize",
+        "direct_post",
+        "token",
+        "credential",
+    ),
+}
+DEFAULT_BASELINE = pathlib.Path(__file__).parent / "baselines" / "issuance_flow.json"
+# Seconds to wait for the issuer metadata discovered at startup
+DISCOVERY_TIMEOUT = 60
+USER_PIN = "1234"
+CREDENTIAL_TYPES = ["VerifiableCredential", "BenchmarkCredential"]
+
+
+class FlowError(Exception):
+    pass
+
+
+class Wallet:
+    """Holder wallet going through the issuance flows with one key"""
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        base_url: str,
+        organisation_id: str,
+        timings: typing.Dict[str, typing.List[float]],
+    ):
+        self.session = session
+        self.base_url = base_url
+        self.organisation_url = f"{base_url}/organisation/{organisation_id}"
+        self.timings = timings
+
+        self.key_did = KeyDid(seed=uuid.uuid4().bytes)
+        self.key_did.create_keypair()
+        self.key_did.generate_did(
+            PublicKeyJWK(
+                kty=self.key_did.public_key_jwk["kty"],
+                crv=self.key_did.public_key_jwk["crv"],
+                x=self.key_did.public_key_jwk["x"],
+                y=self.key_did.public_key_jwk["y"],
+            )
+        )
+
+    async def _request(
+        self, step: str, method: str, url: str, status: int, **kwargs
+    ) -> typing.Tuple[aiohttp.ClientResponse, bytes]:
+        started = time.perf_counter()
+        async with self.session.request(
+            method, url, allow_redirects=False, **kwargs
+        ) as response:
+            body = await response.read()
+        elapsed = time.perf_counter() - started
+
+        if response.status != status:
+            raise FlowError(f"{step} returned {response.status}: {body[:200]!r}")
+        self.timings[step].append(elapsed)
+        return response, body
+
+    async def _create_offer(self, is_pre_authorised: bool) -> dict:
+        _, body = await self._request(
+            "offer",
+            "POST",
+            f"{self.organisation_url}/config/issue-credential",
+            201,
+            json={
+                "issuanceMode": "InTime",
+                "isPreAuthorised": is_pre_authorised,
+                "userPin": USER_PIN,
+                "credential": {
+                    "type": CREDENTIAL_TYPES,
+                    "credentialSubject": {"name": "Benchmark"},
+                },
+            },
+        )
+        offer_id = json.loads(body)["id"]
+
+        _, body = await self._request(
+            "credential-offer",
+            "GET",
+            f"{self.organisation_url}/service/credential-offer/{offer_id}",
+            200,
+        )
+        return json.loads(body)
+
+    async def _receive_credential(
+        self, credential_offer: dict, token_request: dict
+    ) -> None:
+        _, body = await self._request(
+            "token",
+            "POST",
+            f"{self.organisation_url}/service/token",
+            200,
+            data=token_request,
+        )
+        token = json.loads(body)
+
+        proof = self.key_did.generate_credential_request(
+            issuer_uri=credential_offer["credential_issuer"], nonce=token["c_nonce"]
+        )
+        await self._request(
+            "credential",
+            "POST",
+            f"{self.organisation_url}/service/credential",
+            200,
+            headers={"Authorization": f"Bearer {token['access_token']}"},
+            json={
+                "format": "jwt_vc",
+                "types": CREDENTIAL_TYPES,
+                "proof": {"proof_type": "jwt", "jwt": proof},
+            },
+        )
+
+    async def run_pre_authorised(self) -> None:
+        credential_offer = await self._create_offer(is_pre_authorised=True)
+        grant = AuthorisationGrants.PreAuthorisedCode.value
+        pre_authorised_code = credential_offer["grants"][grant.grant_type][
+            grant.grant_data
+        ]
+        await self._receive_credential(
+            credential_offer,
+            {
+                "grant_type": grant.grant_type,
+                "user_pin": USER_PIN,
+                grant.grant_data: pre_authorised_code,
+            },
+        )
+
+    async def run_authorisation_code(self) -> None:
+        credential_offer = await self._create_offer(is_pre_authorised=False)
+        grant = AuthorisationGrants.AuthorisationCode.value
+        issuer_state = credential_offer["grants"][grant.grant_type][grant.grant_data]
+
+        code_verifier = generate_code_verifier()
+        state = str(uuid.uuid4())
+        redirect_uri = "openid://"
+        response, _ = await self._request(
+            "authorize",
+            "GET",
+            f"{self.organisation_url}/service/authorize",
+            302,
+            params={
+                "response_type": "code",
+                "scope": "openid",
+                "state": state,
+                "client_id": self.key_did.did,
+                "redirect_uri": redirect_uri,
+                "nonce": str(uuid.uuid4()),
+                "code_challenge": generate_code_challenge(code_verifier),
+                "code_challenge_method": "S256",
+                "issuer_state": issuer_state,
+                "client_metadata": json.dumps(
+                    {"authorization_endpoint": redirect_uri}
+                ),
+                "authorization_details": json.dumps(
+                    [
+                        {
+                            "type": "openid_credential",
+                            "format": "jwt_vc",
+                            "types": CREDENTIAL_TYPES,
+                        }
+                    ]
+                ),
+            },
+        )
+        id_token_request = _query(response.headers["Location"])
+        request_claims = decode_header_and_claims_in_jwt(
+            id_token_request["request"]
+        ).claims
+
+        id_token = self.key_did.generate_id_token(
+            auth_server_uri=id_token_request["client_id"],
+            nonce=request_claims["nonce"],
+        )
+        response, _ = await self._request(
+            "direct_post",
+            "POST",
+            id_token_request["redirect_uri"],
+            302,
+            data={"id_token": id_token, "state": request_claims["state"]},
+        )
+        authorisation_response = _query(response.headers["Location"])
+        if authorisation_response.get("state") != state:
+            raise FlowError("direct_post returned a different state")
+
+        await self._receive_credential(
+            credential_offer,
+            {
+                "grant_type": grant.grant_type,
+                "code": authorisation_response["code"],
+                "client_id": self.key_did.did,
+                "code_verifier": code_verifier,
+            },
+        )
+
+
+def _query(url: str) -> typing.Dict[str, str]:
+    return dict(urllib.parse.parse_qsl(urllib.parse.urlparse(url).query))
+
+
+def summarise(
+    timings: typing.Dict[str, typing.List[float]],
+    completed: int,
+    failed: int,
+    elapsed: float,
+) -> dict:
+    steps = {}
+    for step, values in timings.items():
+        if len(values) < 2:
+            continue
+        quantiles = statistics.quantiles(values, n=100, method="inclusive")
+        steps[step] = {
+            "p50": quantiles[49] * 1000,
+            "p95": quantiles[94] * 1000,
+            "p99": quantiles[98] * 1000,
+        }
+    return {
+        "steps": steps,
+        "flows": completed,
+        "errors": failed,
+        "throughput": completed / elapsed,
+    }
+
+
+async def run_level(
+    base_url: str, organisation_id: str, flow: str, concurrency: int, flows: int
+) -> dict:
+    timings: typing.Dict[str, typing.List[float]] = {
+        step: [] for step in FLOW_STEPS[flow]
+    }
+    errors: typing.List[Exception] = []
+    # Shared by the workers, each takes the next flow once it is done
+    remaining = iter(range(flows))
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        wallets = [
+            Wallet(session, base_url, organisation_id, timings)
+            for _ in range(concurrency)
+        ]
+
+        async def worker(wallet: Wallet):
+            run = (
+                wallet.run_pre_authorised
+                if flow == PRE_AUTHORISED
+                else wallet.run_authorisation_code
+            )
+            for _ in remaining:
+                try:
+                    await run()
+                except (FlowError, aiohttp.ClientError, KeyError, ValueError) as e:
+                    errors.append(e)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(wallet) for wallet in wallets))
+        elapsed = time.perf_counter() - started
+
+    if errors and len(errors) == flows:
+        raise click.ClickException(
+            f"All {flow} flows failed, the first with: {errors[0]!r}"
+        )
+    return summarise(timings, flows - len(errors), len(errors), elapsed)
+
+
+async def wait_for_discovery(app: web.Application) -> None:
+    deadline = time.monotonic() + DISCOVERY_TIMEOUT
+    while app["discovery"].credential_issuer_configuration is None:
+        if time.monotonic() > deadline:
+            raise click.ClickException(
+                "Issuer metadata was not discovered, the authorisation code flow "
+                f"needs the conformance service. Run with --flow {PRE_AUTHORISED} "
+                "when it is not reachable."
+            )
+        await asyncio.sleep(0.5)
+
+
+async def benchmark(
+    db_session,
+    async_db_session,
+    logger: logging.Logger,
+    organisation_id: str,
+    flow_names: typing.Sequence[str],
+    levels: typing.Sequence[int],
+    flows: int,
+    warmup: int,
+) -> dict:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    # Generated URLs such as the direct_post redirect must resolve locally
+    base_url = f"http://127.0.0.1:{port}"
+
+    app = ServerSetup(
+        db_session=db_session,
+        producer=None,
+        logger=logger,
+        domain=base_url,
+        debug=False,
+        async_db_session=async_db_session,
+    ).create_app()
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", port)
+    await site.start()
+
+    results = {}
+    try:
+        if AUTHORISATION_CODE in flow_names:
+            await wait_for_discovery(app)
+
+        for flow in flow_names:
+            for concurrency in levels:
+                if warmup:
+                    await run_level(
+                        base_url, organisation_id, flow, concurrency, warmup
+                    )
+                results[f"{flow}/{concurrency}"] = await run_level(
+                    base_url, organisation_id, flow, concurrency, flows
+                )
+    finally:
+        await site.stop()
+        await runner.cleanup()
+    return results
+
+
+def report(results: dict) -> None:
+    click.echo(
+        f"{'flow':<20} {'concurrency':>11} {'step':<18} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    )
+    for key, result in results.items():
+        flow, concurrency = key.split("/")
+        for step, latency in result["steps"].items():
+            click.echo(
+                f"{flow:<20} {concurrency:>11} {step:<18} {latency['p50']:>8.2f} "
+                f"{latency['p95']:>8.2f} {latency['p99']:>8.2f}"
+            )
+        click.echo(
+            f"{flow:<20} {concurrency:>11} {'flows/s':<18} "
+            f"{result['throughput']:>8.2f} ({result['flows']} flows, "
+            f"{result['errors']} errors)"
+        )
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> list:
+    """Print the change against a baseline, returns the regressions"""
+    regressions = []
+    click.echo(
+        f"\n{'flow':<20} {'concurrency':>11} {'step':<18} "
+        f"{'baseline':>9} {'current':>9} {'change':>8}"
+    )
+    for key, result in results.items():
+        expected = baseline.get(key)
+        if expected is None:
+            continue
+        flow, concurrency = key.split("/")
+
+        rows = [
+            (f"{step} p95", expected["steps"][step]["p95"], latency["p95"], False)
+            for step, latency in result["steps"].items()
+            if step in expected["steps"]
+        ]
+        rows.append(("flows/s", expected["throughput"], result["throughput"], True))
+        for name, before, after, higher_is_better in rows:
+            change = (after - before) / before if before else 0.0
+            regressed = (-change if higher_is_better else change) > max_regression
+            if regressed:
+                regressions.append(f"{key} {name}")
+            click.echo(
+                f"{flow:<20} {concurrency:>11} {name:<18} {before:>9.2f} "
+                f"{after:>9.2f} {change:>+8.1%}{'  regression' if regressed else ''}"
+            )
+    return regressions
+
+
+@click.command()
+@click.option("--database-user", envvar="DATABASE_USER")
+@click.option("--database-password", envvar="DATABASE_PASSWORD")
+@click.option("--database-host", envvar="DATABASE_HOST")
+@click.option("--database-port", envvar="DATABASE_PORT")
+@click.option("--database-db", envvar="DATABASE_DB")
+@click.option(
+    "--database-driver",
+    envvar="DATABASE_DRIVER",
+    default="psycopg2",
+    type=click.Choice(["psycopg2", "asyncpg"]),
+    help="Database driver used by the v2 endpoints",
+)
+@click.option(
+    "--flow",
+    "flow_names",
+    multiple=True,
+    type=click.Choice([PRE_AUTHORISED, AUTHORISATION_CODE]),
+    default=[PRE_AUTHORISED, AUTHORISATION_CODE],
+    help="Issuance flow to run, can be repeated",
+)
+@click.option(
+    "--concurrency",
+    "levels",
+    multiple=True,
+    type=click.IntRange(min=1),
+    default=[1, 8, 32],
+    help="Wallets running flows at the same time, can be repeated",
+)
+@click.option(
+    "--flows", default=200, type=click.IntRange(min=2), help="Flows per measurement"
+)
+@click.option(
+    "--warmup",
+    default=10,
+    type=click.IntRange(min=0),
+    help="Flows run and discarded before each measurement",
+)
+@click.option(
+    "--baseline",
+    "baseline_path",
+    default=str(DEFAULT_BASELINE),
+    type=click.Path(dir_okay=False, path_type=pathlib.Path),
+    help="Baseline file to save to or compare with",
+)
+@click.option(
+    "--save-baseline", is_flag=True, help="Store the results in the baseline file"
+)
+@click.option(
+    "--compare-baseline",
+    is_flag=True,
+    help="Compare with the baseline file, exits non-zero on regressions",
+)
+@click.option(
+    "--max-regression",
+    default=0.2,
+    type=click.FloatRange(min=0),
+    help="Allowed p95 increase or throughput decrease, as a fraction",
+)
+def main(
+    database_user,
+    database_password,
+    database_host,
+    database_port,
+    database_db,
+    database_driver,
+    flow_names,
+    levels,
+    flows,
+    warmup,
+    baseline_path,
+    save_baseline,
+    compare_baseline,
+    max_regression,
+):
+    logger = AppLogger(__name__, level=logging.WARNING).logger
+    database_url = f"postgresql+psycopg2://{database_user}:{database_password}@{database_host}:{database_port}/{database_db}"
+    db_session = DBSetup(database_url).setup_db()
+
+    async_db_session = None
+    if database_driver == "asyncpg":
+        async_database_url = f"postgresql+asyncpg://{database_user}:{database_password}@{database_host}:{database_port}/{database_db}"
+        async_db_session = DBSetup(async_database_url).setup_async_db()
+
+    organisation_id = str(uuid.uuid4())
+    with db_session() as session:
+        session.add(
+            OrganisationModel(
+                id=organisation_id,
+                name="Benchmark",
+                cryptographic_seed=str(uuid.uuid4()),
+                role=OrganisationRoles.Issuer.value,
+            )
+        )
+        session.commit()
+
+    results = asyncio.run(
+        benchmark(
+            db_session,
+            async_db_session,
+            logger,
+            organisation_id,
+            flow_names,
+            sorted(levels),
+            flows,
+            warmup,
+        )
+    )
+    report(results)
+
+    if compare_baseline:
+        if not baseline_path.exists():
+            raise click.ClickException(f"No baseline at {baseline_path}")
+        baseline = json.loads(baseline_path.read_text())["results"]
+        regressions = compare(results, baseline, max_regression)
+        if regressions:
+            raise click.ClickException(f"Regressed: {', '.join(regressions)}")
+
+    if save_baseline:
+        saved = {}
+        if baseline_path.exists():
+            saved = json.loads(baseline_path.read_text())["results"]
+        # Runs of other flows or concurrency levels are kept
+        saved.update(results)
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(
+            json.dumps({"database_driver": database_driver, "results": saved}, indent=2)
+            + "\n"
+        )
+        click.echo(f"\nBaseline saved to {baseline_path}")
+
+
+if __name__ == "__main__":
+    main()
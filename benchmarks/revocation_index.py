@@ -0,0 +1,124 @@
+"""Revocation index allocation throughput with concurrent issuers.
+
+Each worker is a thread with its own database session that allocates
+status list indexes as fast as it can, once taking the status list row
+lock per index and once through the block allocator. Per-index
+reservation stays flat as workers are added, since every allocation
+waits on the same row lock; block allocation should scale with the
+number of workers.
+
+Run against a disposable database, the reserved lists are not removed:
+
+    python -m benchmarks.revocation_index --workers 1 --workers 4 --workers 16
+"""
+import logging
+import threading
+import time
+
+import click
+
+from eudi_wallet.ebsi.entry_points.server.start import AppLogger, DBSetup
+from eudi_wallet.ebsi.repositories.credential_revocation_status_list import (
+    SqlAlchemyCredentialRevocationStatusListRepository,
+)
+from eudi_wallet.ebsi.services.domain.revocation_index import (
+    RevocationIndexAllocator,
+)
+
+
+def per_index(session_factory, logger):
+    def allocate():
+        with SqlAlchemyCredentialRevocationStatusListRepository(
+            session=session_factory, logger=logger
+        ) as revocation_repo:
+            revocation_list = revocation_repo.reserve_revocation_index()
+        return str(revocation_list.id), revocation_list.last_assigned_index
+
+    return allocate
+
+
+def per_block(session_factory, logger, block_size: int):
+    # One allocator per worker stands in for one allocator per process
+    allocators = threading.local()
+
+    def repository_factory():
+        return SqlAlchemyCredentialRevocationStatusListRepository(
+            session=session_factory, logger=logger
+        )
+
+    def allocate():
+        if not hasattr(allocators, "allocator"):
+            allocators.allocator = RevocationIndexAllocator(block_size=block_size)
+        revocation_index = allocators.allocator.allocate(repository_factory)
+        return revocation_index.status_list_id, revocation_index.status_list_index
+
+    return allocate
+
+
+def run(allocate, workers: int, duration: float) -> list:
+    allocated: list = []
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        indexes = []
+        while time.perf_counter() < deadline:
+            indexes.append(allocate())
+        allocated.extend(indexes)
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return allocated
+
+
+@click.command()
+@click.option("--database-user", envvar="DATABASE_USER")
+@click.option("--database-password", envvar="DATABASE_PASSWORD")
+@click.option("--database-host", envvar="DATABASE_HOST")
+@click.option("--database-port", envvar="DATABASE_PORT")
+@click.option("--database-db", envvar="DATABASE_DB")
+@click.option(
+    "--workers",
+    "worker_counts",
+    multiple=True,
+    type=int,
+    default=[1, 2, 4, 8, 16],
+    help="Concurrent issuers to measure with, can be repeated",
+)
+@click.option("--duration", default=5.0, type=float, help="Seconds per measurement")
+@click.option("--block-size", default=1024, type=int, help="Indexes per block")
+def main(
+    database_user,
+    database_password,
+    database_host,
+    database_port,
+    database_db,
+    worker_counts,
+    duration,
+    block_size,
+):
+    logger = AppLogger(__name__, level=logging.WARNING).logger
+    database_url = f"postgresql+psycopg2://{database_user}:{database_password}@{database_host}:{database_port}/{database_db}"
+    session_factory = DBSetup(database_url).setup_db()
+
+    allocators = [
+        ("per-index", per_index(session_factory, logger)),
+        ("per-block", per_block(session_factory, logger, block_size)),
+    ]
+
+    click.echo(f"{'workers':>8} {'allocator':<10} {'indexes/s':>12} {'per worker':>12}")
+    for workers in sorted(worker_counts):
+        for name, allocate in allocators:
+            allocated = run(allocate, workers, duration)
+            assert len(set(allocated)) == len(allocated), "Index assigned twice"
+            throughput = len(allocated) / duration
+            click.echo(
+                f"{workers:>8} {name:<10} {throughput:>12.0f} "
+                f"{throughput / workers:>12.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Token endpoint lookup latency against a growing issue_credential_record table.
+
+Seeds synthetic issue credential records in steps and, after each step,
+times the lookups done by the token and credential endpoints. With the
+indexes from revision cb04b42029b9 the latency should stay flat as the
+table grows; without them it grows linearly with the row count.
+
+Run against a disposable database, the seeded rows are not removed:
+
+    python -m benchmarks.token_lookup --rows 10000 --rows 100000 --rows 1000000
+"""
+import logging
+import random
+import statistics
+import time
+import uuid
+
+import click
+from sqlalchemy import insert, text
+
+from eudi_wallet.ebsi.entry_points.server.start import AppLogger, DBSetup
+from eudi_wallet.ebsi.models.organisation import OrganisationModel
+from eudi_wallet.ebsi.models.v2.issue_credential_record import (
+    IssueCredentialRecordModel,
+)
+from eudi_wallet.ebsi.repositories.v2.issue_credential_record import (
+    SqlAlchemyIssueCredentialRecordRepository,
+)
+from eudi_wallet.ebsi.value_objects.application.organisation import OrganisationRoles
+
+BATCH_SIZE = 10000
+
+
+def seed(session_factory, organisation_id: str, count: int) -> list:
+    tokens = []
+    with session_factory() as session:
+        for offset in range(0, count, BATCH_SIZE):
+            rows = []
+            for _ in range(min(BATCH_SIZE, count - offset)):
+                row = {
+                    "id": uuid.uuid4(),
+                    "organisationId": organisation_id,
+                    "issuanceMode": "InTime",
+                    "status": "credential_issued",
+                    "authorisationCode": str(uuid.uuid4()),
+                    "acceptanceToken": str(uuid.uuid4()),
+                    "idTokenRequestState": str(uuid.uuid4()),
+                }
+                rows.append(row)
+            session.execute(insert(IssueCredentialRecordModel), rows)
+            session.commit()
+            tokens.extend(random.sample(rows, min(100, len(rows))))
+    return tokens
+
+
+def measure(repo, method: str, column: str, samples: list) -> list:
+    timings = []
+    lookup = getattr(repo, method)
+    for row in samples:
+        started = time.perf_counter()
+        assert lookup(row[column]) is not None
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+@click.command()
+@click.option("--database-user", envvar="DATABASE_USER")
+@click.option("--database-password", envvar="DATABASE_PASSWORD")
+@click.option("--database-host", envvar="DATABASE_HOST")
+@click.option("--database-port", envvar="DATABASE_PORT")
+@click.option("--database-db", envvar="DATABASE_DB")
+@click.option(
+    "--rows",
+    "steps",
+    multiple=True,
+    type=int,
+    default=[10000, 100000, 1000000],
+    help="Table size to measure at, can be repeated",
+)
+@click.option("--samples", default=500, type=int, help="Lookups per measurement")
+def main(
+    database_user,
+    database_password,
+    database_host,
+    database_port,
+    database_db,
+    steps,
+    samples,
+):
+    logger = AppLogger(__name__, level=logging.WARNING).logger
+    database_url = f"postgresql+psycopg2://{database_user}:{database_password}@{database_host}:{database_port}/{database_db}"
+    session_factory = DBSetup(database_url).setup_db()
+
+    organisation_id = str(uuid.uuid4())
+    with session_factory() as session:
+        session.add(
+            OrganisationModel(
+                id=organisation_id,
+                name="Benchmark",
+                cryptographic_seed=str(uuid.uuid4()),
+                role=OrganisationRoles.Issuer.value,
+            )
+        )
+        session.commit()
+
+    repository = SqlAlchemyIssueCredentialRecordRepository(
+        session=session_factory, logger=logger
+    )
+    lookups = [
+        ("get_by_authorisation_code", "authorisationCode"),
+        ("get_by_acceptance_token", "acceptanceToken"),
+        ("get_by_id_token_request_state", "idTokenRequestState"),
+    ]
+
+    seeded = 0
+    tokens: list = []
+    click.echo(f"{'rows':>10} {'lookup':<32} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for target in sorted(steps):
+        tokens.extend(seed(session_factory, organisation_id, target - seeded))
+        seeded = target
+        with session_factory() as session:
+            session.execute(text("ANALYZE issue_credential_record"))
+            session.commit()
+
+        with repository as repo:
+            for method, column in lookups:
+                timings = measure(
+                    repo, method, column, random.choices(tokens, k=samples)
+                )
+                quantiles = statistics.quantiles(timings, n=20)
+                click.echo(
+                    f"{seeded:>10} {method:<32} {statistics.median(timings):>8.3f} "
+                    f"{quantiles[18]:>8.3f} {max(timings):>8.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -138,6 +138,8 @@ async def verify_jwt(jwt, config):
 
     did_resolution_result = await resolve(did, config)
 
+    assert did_resolution_result.get("didDocument") is not None, "DID not found"
+
     # FIXME: Only the first verification method is used to verify the signature.
     authenticator = did_resolution_result.get("didDocument").get("verificationMethod")[
         0
@@ -5,7 +5,6 @@ import logging
 import click
 import debugpy
 from aiokafka import AIOKafkaConsumer
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from eudi_wallet.ebsi.event_handlers.application.organisation import (
@@ -20,6 +19,12 @@ from eudi_wallet.ebsi.events.application.organisation import (
 )
 from eudi_wallet.ebsi.events.event_types import EventTypes
 from eudi_wallet.ebsi.events.wrapper import EventWrapper
+from eudi_wallet.ebsi.utils.db import (
+    DBPoolConfig,
+    create_db_engine,
+    database_pool_options,
+    get_db_pool_config,
+)
 
 
 class AppLogger:
@@ -47,6 +52,7 @@ class Consumer:
         database_host: str,
         database_port: str,
         database_db: str,
+        pool_config: DBPoolConfig,
     ):
         self.kafka_broker_address = kafka_broker_address
         self.kafka_topic = kafka_topic
@@ -56,6 +62,7 @@ class Consumer:
         self.database_host = database_host
         self.database_port = database_port
         self.database_db = database_db
+        self.pool_config = pool_config
 
     async def handle_event(
         self, event_type: str, event_wrapper: EventWrapper, db_session
@@ -89,7 +96,7 @@ class Consumer:
         await consumer.start()
 
         database_url = f"postgresql+psycopg2://{self.database_user}:{self.database_password}@{self.database_host}:{self.database_port}/{self.database_db}"
-        engine = create_engine(database_url)
+        engine = create_db_engine(database_url, self.pool_config)
         db_session = sessionmaker(bind=engine)
 
         try:
@@ -143,6 +150,7 @@ class Consumer:
 @click.option("--database-host", envvar="DATABASE_HOST")
 @click.option("--database-port", envvar="DATABASE_PORT")
 @click.option("--database-db", envvar="DATABASE_DB")
+@database_pool_options
 @click.option(
     "--log-level",
     default="DEBUG",
@@ -160,6 +168,12 @@ def main(
     database_host,
     database_port,
     database_db,
+    database_pool_size,
+    database_max_overflow,
+    database_pool_timeout,
+    database_pool_recycle,
+    database_pool_pre_ping,
+    database_statement_timeout,
     log_level,
 ):
     level = getattr(logging, log_level.upper(), None)
@@ -183,6 +197,14 @@ def main(
         database_host,
         database_port,
         database_db,
+        get_db_pool_config(
+            database_pool_size,
+            database_max_overflow,
+            database_pool_timeout,
+            database_pool_recycle,
+            database_pool_pre_ping,
+            database_statement_timeout,
+        ),
     )
 
     consume_task = loop.create_task(consumer.consume())
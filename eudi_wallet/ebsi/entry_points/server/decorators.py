@@ -1,10 +1,11 @@
 import dataclasses
 from functools import wraps
-from typing import Optional, Tuple
+from typing import Any, Optional, Tuple, Union
 import uuid
 
 from aiohttp import web
 
+from eudi_wallet.ebsi.entry_points.server.startup import DISCOVERY_RETRY_INTERVAL
 from eudi_wallet.ebsi.entry_points.server.utils import AppContext, get_app_context
 from eudi_wallet.ebsi.repositories.credential_offer import (
     SqlAlchemyCredentialOfferRepository,
@@ -15,15 +16,44 @@ from eudi_wallet.ebsi.repositories.credential_revocation_status_list import (
 from eudi_wallet.ebsi.repositories.data_agreement import (
     SqlAlchemyDataAgreementRepository,
 )
-from eudi_wallet.ebsi.repositories.organisation import SqlAlchemyOrganisationRepository
+from eudi_wallet.ebsi.repositories.organisation import (
+    AsyncSqlAlchemyOrganisationRepository,
+    SqlAlchemyOrganisationRepository,
+)
+from eudi_wallet.ebsi.repositories.threaded import ThreadedRepository
 from eudi_wallet.ebsi.services.application.organisation import OrganisationService
+from eudi_wallet.ebsi.repositories.v2.credential import (
+    AsyncSqlAlchemyCredentialRepository,
+    SqlAlchemyCredentialRepository,
+)
 from eudi_wallet.ebsi.repositories.v2.data_agreement import (
+    AsyncSqlAlchemyV2DataAgreementRepository,
     SqlAlchemyV2DataAgreementRepository,
 )
 from eudi_wallet.ebsi.repositories.v2.issue_credential_record import (
+    AsyncSqlAlchemyIssueCredentialRecordRepository,
     SqlAlchemyIssueCredentialRecordRepository,
 )
+from eudi_wallet.ebsi.repositories.v2.verification_record import (
+    AsyncSqlAlchemyVerificationRecordRepository,
+    SqlAlchemyVerificationRecordRepository,
+)
 from eudi_wallet.ebsi.services.application.v2_organisation import V2OrganisationService
+from eudi_wallet.ebsi.utils.db import AsyncRequestScopedSession, RequestScopedSession
+
+V2_REQUEST_SESSION_KEY = "v2_request_session"
+
+
+def ensure_discovery_completed(app_context: AppContext) -> None:
+    # Discovery runs in the background after startup, see `discovery_ctx`
+    if (
+        app_context.credential_issuer_configuration is None
+        or app_context.auth_server_configuration is None
+    ):
+        raise web.HTTPServiceUnavailable(
+            reason="Issuer and authorisation server metadata not discovered yet",
+            headers={"Retry-After": str(DISCOVERY_RETRY_INTERVAL)},
+        )
 
 
 async def get_legal_entity_service(
@@ -70,23 +100,55 @@ async def get_legal_entity_service(
     )
 
 
+def v2_get_repository(
+    app_context: AppContext, repository_cls: type, async_repository_cls: type
+) -> Any:
+    """Return the async repository, or the sync one run in a thread pool"""
+    if app_context.async_db_session is not None:
+        return async_repository_cls(
+            session=app_context.async_db_session, logger=app_context.logger
+        )
+    return ThreadedRepository(
+        repository_cls(session=app_context.db_session, logger=app_context.logger)
+    )
+
+
+def v2_get_request_session(
+    app_context: AppContext,
+) -> Union[RequestScopedSession, AsyncRequestScopedSession]:
+    # No connection is checked out until a repository runs a query
+    if app_context.async_db_session is not None:
+        return AsyncRequestScopedSession(app_context.async_db_session)
+    return RequestScopedSession(app_context.db_session)
+
+
+def v2_bind_request_session(
+    app_context: AppContext,
+    request_session: Union[RequestScopedSession, AsyncRequestScopedSession],
+) -> None:
+    if isinstance(request_session, AsyncRequestScopedSession):
+        app_context.async_db_session = request_session
+    else:
+        app_context.db_session = request_session
+
+
 async def v2_get_legal_entity_service(
     app_context: AppContext,
-) -> Tuple[
-    V2OrganisationService,
-    SqlAlchemyOrganisationRepository,
-    SqlAlchemyV2DataAgreementRepository,
-    SqlAlchemyIssueCredentialRecordRepository,
-]:
-    organisation_repository = SqlAlchemyOrganisationRepository(
-        session=app_context.db_session, logger=app_context.logger
+) -> Tuple[V2OrganisationService, Any, Any, Any]:
+    organisation_repository = v2_get_repository(
+        app_context,
+        SqlAlchemyOrganisationRepository,
+        AsyncSqlAlchemyOrganisationRepository,
     )
-
-    v2_data_agreement_repository = SqlAlchemyV2DataAgreementRepository(
-        session=app_context.db_session, logger=app_context.logger
+    v2_data_agreement_repository = v2_get_repository(
+        app_context,
+        SqlAlchemyV2DataAgreementRepository,
+        AsyncSqlAlchemyV2DataAgreementRepository,
     )
-    issue_credential_record_repository = SqlAlchemyIssueCredentialRecordRepository(
-        session=app_context.db_session, logger=app_context.logger
+    issue_credential_record_repository = v2_get_repository(
+        app_context,
+        SqlAlchemyIssueCredentialRecordRepository,
+        AsyncSqlAlchemyIssueCredentialRecordRepository,
     )
     legal_entity_service = V2OrganisationService(
         credential_issuer_configuration=app_context.credential_issuer_configuration,
@@ -119,8 +181,12 @@ class RequestContext:
 class V2RequestContext:
     app_context: AppContext
     legal_entity_service: Optional[V2OrganisationService] = None
-    organisation_repository: Optional[SqlAlchemyOrganisationRepository] = None
-    data_agreement_repository: Optional[SqlAlchemyV2DataAgreementRepository] = None
+    # Repositories implement the async interface, see `v2_get_repository`
+    organisation_repository: Optional[Any] = None
+    data_agreement_repository: Optional[Any] = None
+    issue_credential_record_repository: Optional[Any] = None
+    verification_record_repository: Optional[Any] = None
+    credential_repository: Optional[Any] = None
 
 
 def inject_request_context(raise_exception_if_legal_entity_not_found: bool = True):
@@ -128,6 +194,7 @@ def inject_request_context(raise_exception_if_legal_entity_not_found: bool = Tru
         @wraps(view_func)
         async def wrapper(request):
             app_context = get_app_context(request.app)
+            ensure_discovery_completed(app_context)
 
             (
                 legal_entity_service,
@@ -172,41 +239,69 @@ def v2_inject_request_context(
         @wraps(view_func)
         async def wrapper(request):
             app_context = get_app_context(request.app)
+            ensure_discovery_completed(app_context)
 
-            (
-                legal_entity_service,
-                organisation_repository,
-                v2_data_agreement_repository,
-                _,
-            ) = await v2_get_legal_entity_service(app_context)
-            if raise_exception_if_not_legal_entity_path_param:
-                organisation_id = request.match_info.get("organisationId")
-                if organisation_id is None:
-                    raise web.HTTPBadRequest(reason="Invalid organisation id")
-
-                legal_entity_entity = await legal_entity_service.get_legal_entity(
-                    organisation_id=organisation_id
-                )
-                if raise_exception_if_legal_entity_not_found:
-                    if legal_entity_entity is None:
-                        raise web.HTTPBadRequest(text="Legal entity not found")
-                    else:
-                        await legal_entity_service.set_cryptographic_seed(
-                            crypto_seed=legal_entity_entity.cryptographic_seed, salt = legal_entity_entity.cryptographic_salt  # type: ignore
-                        )
-                        await legal_entity_service.set_entity(
-                            legal_entity_entity=legal_entity_entity
-                        )
+            # Handlers calling other decorated handlers reuse the outer
+            # request session rather than checking out a second connection
+            request_session = request.get(V2_REQUEST_SESSION_KEY)
+            owns_request_session = request_session is None
+            if owns_request_session:
+                request_session = v2_get_request_session(app_context)
+                request[V2_REQUEST_SESSION_KEY] = request_session
+            v2_bind_request_session(app_context, request_session)
 
-            return await view_func(
-                request=request,
-                context=V2RequestContext(
-                    app_context=app_context,
-                    legal_entity_service=legal_entity_service,
-                    organisation_repository=organisation_repository,
-                    data_agreement_repository=v2_data_agreement_repository,
-                ),
-            )
+            try:
+                (
+                    legal_entity_service,
+                    organisation_repository,
+                    v2_data_agreement_repository,
+                    issue_credential_record_repository,
+                ) = await v2_get_legal_entity_service(app_context)
+                if raise_exception_if_not_legal_entity_path_param:
+                    organisation_id = request.match_info.get("organisationId")
+                    if organisation_id is None:
+                        raise web.HTTPBadRequest(reason="Invalid organisation id")
+
+                    legal_entity_entity = await legal_entity_service.get_legal_entity(
+                        organisation_id=organisation_id
+                    )
+                    if raise_exception_if_legal_entity_not_found:
+                        if legal_entity_entity is None:
+                            raise web.HTTPBadRequest(text="Legal entity not found")
+                        else:
+                            await legal_entity_service.set_cryptographic_seed(
+                                crypto_seed=legal_entity_entity.cryptographic_seed,  # type: ignore
+                                salt=legal_entity_entity.cryptographic_salt,  # type: ignore
+                                organisation_id=organisation_id,
+                            )
+                            await legal_entity_service.set_entity(
+                                legal_entity_entity=legal_entity_entity
+                            )
+
+                return await view_func(
+                    request=request,
+                    context=V2RequestContext(
+                        app_context=app_context,
+                        legal_entity_service=legal_entity_service,
+                        organisation_repository=organisation_repository,
+                        data_agreement_repository=v2_data_agreement_repository,
+                        issue_credential_record_repository=issue_credential_record_repository,
+                        verification_record_repository=v2_get_repository(
+                            app_context,
+                            SqlAlchemyVerificationRecordRepository,
+                            AsyncSqlAlchemyVerificationRecordRepository,
+                        ),
+                        credential_repository=v2_get_repository(
+                            app_context,
+                            SqlAlchemyCredentialRepository,
+                            AsyncSqlAlchemyCredentialRepository,
+                        ),
+                    ),
+                )
+            finally:
+                if owns_request_session:
+                    del request[V2_REQUEST_SESSION_KEY]
+                    await request_session.close()
 
         return wrapper
 
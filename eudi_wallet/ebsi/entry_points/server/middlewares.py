@@ -1,7 +1,43 @@
 from aiohttp import web
+import json
+import logging
+import time
 import traceback
 
 from eudi_wallet.ebsi.entry_points.server.utils import get_app_context
+from eudi_wallet.ebsi.utils.access_log import AccessLogConfig, format_body
+from eudi_wallet.ebsi.utils.metrics import (
+    RequestStats,
+    db_queries_per_request,
+    db_query_seconds_per_request,
+    http_request_duration_seconds,
+    http_requests_total,
+    request_stats,
+)
+
+
+async def _log_request_body(request, logger, config: AccessLogConfig) -> None:
+    query_params = request.rel_url.query
+    if query_params:
+        logger.debug(
+            f"Query parameters: {format_body(dict(query_params), config.max_body_length)}"
+        )
+
+    if not request.body_exists:
+        return
+
+    content_type = request.headers.get("Content-Type", "")
+    try:
+        if content_type.startswith("application/json"):
+            body = await request.json()
+        elif content_type.startswith("application/x-www-form-urlencoded"):
+            body = dict(await request.post())
+        else:
+            return
+    except Exception as e:
+        logger.debug(f"Unable to parse request payload: {e}")
+        return
+    logger.debug(f"Payload: {format_body(body, config.max_body_length)}")
 
 
 async def logging_middleware(app, handler):
@@ -11,34 +47,38 @@ async def logging_middleware(app, handler):
 
         assert logger is not None
 
-        # Log the request
-        logger.debug(f"Received request: {request.method} {request.path}")
-
-        # Log the query params
-        query_params = request.rel_url.query
-        if query_params:
-            logger.debug(f"Query parameters: {query_params}")
-
-        # Read and log the payload
-        if request.body_exists:
-            if request.headers.get("Content-Type") == "application/json":
-                try:
-                    body = await request.json()
-                    logger.debug(f"Payload: {body}")
-                except Exception as e:
-                    logger.error(f"Error parsing JSON payload: {e}")
-            elif (
-                request.headers.get("Content-Type")
-                == "application/x-www-form-urlencoded"
-            ):
-                try:
-                    body = await request.post()
-                    logger.debug(f"Form payload: {body}")
-                except Exception as e:
-                    logger.error(f"Error parsing form payload: {e}")
-        # Call the next middleware or route handler
-        response = await handler(request)
-        return response
+        config: AccessLogConfig = app.get("access_log_config") or AccessLogConfig()
+        sampled = config.is_sampled()
+
+        # The body is only parsed when it would be logged
+        if sampled and logger.isEnabledFor(logging.DEBUG):
+            await _log_request_body(request, logger, config)
+
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = await handler(request)
+            status = response.status
+            return response
+        except web.HTTPException as e:
+            status = e.status
+            raise
+        finally:
+            if (sampled or status >= 500) and logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    json.dumps(
+                        {
+                            "method": request.method,
+                            "path": request.path,
+                            "route": request.match_info.route.name,
+                            "status": status,
+                            "latency_ms": round(
+                                (time.perf_counter() - started) * 1000, 3
+                            ),
+                            "remote": request.remote,
+                        }
+                    )
+                )
 
     return middleware_handler
 
@@ -67,3 +107,29 @@ async def error_middleware(app, handler):
             )
 
     return middleware_handler
+
+
+async def metrics_middleware(app, handler):
+    async def middleware_handler(request):
+        route = request.match_info.route.name or "unnamed"
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = await handler(request)
+            status = response.status
+            return response
+        except web.HTTPException as e:
+            status = e.status
+            raise
+        finally:
+            request_stats.reset(token)
+            http_request_duration_seconds.observe(
+                time.perf_counter() - started, route
+            )
+            http_requests_total.inc(route, request.method, str(status))
+            db_queries_per_request.observe(stats.queries, route)
+            db_query_seconds_per_request.observe(stats.query_seconds, route)
+
+    return middleware_handler
@@ -1,7 +1,6 @@
-import dataclasses
 import json
 import time
-import typing
+import uuid
 from typing import List, Optional
 
 from aiohttp import web
@@ -13,6 +12,7 @@ from eudi_wallet.ebsi.entry_points.server.decorators import (
     RequestContext,
     inject_request_context,
 )
+from eudi_wallet.ebsi.entry_points.server.utils import cached_response
 from eudi_wallet.ebsi.entry_points.server.well_known import (
     get_well_known_authn_openid_config,
     get_well_known_openid_credential_issuer_config,
@@ -43,7 +43,12 @@ from eudi_wallet.ebsi.exceptions.domain.issuer import (
     CredentialOfferRevocationError,
     CredentialPendingError,
 )
-from eudi_wallet.ebsi.services.domain.utils.did import generate_and_store_did
+from eudi_wallet.ebsi.services.domain.status_list import CACHE_MAX_AGE
+from eudi_wallet.ebsi.services.domain.utils.did import (
+    JWKS_MAX_AGE,
+    generate_and_store_did,
+    get_jwks,
+)
 from eudi_wallet.ebsi.utils.jwt import decode_header_and_claims_in_jwt
 from eudi_wallet.ebsi.value_objects.application.organisation import (
     DataAgreementExchangeModes,
@@ -76,17 +81,18 @@ async def handle_get_index(request: Request, context: RequestContext):
     return web.json_response(resp)
 
 
-@dataclasses.dataclass
-class JWKSResponse:
-    keys: typing.List[dict]
-
-
 async def handle_get_jwks(request: Request, context: RequestContext):
-    eth, _, key_did = await generate_and_store_did(
+    # Fetched by every wallet and relying party verifying our credentials
+    jwks = await get_jwks(
         context.legal_entity_service.legal_entity_entity.cryptographic_seed
     )
-    resp = JWKSResponse(keys=[key_did.public_key_jwk, eth.public_key_to_jwk()])
-    return web.json_response(dataclasses.asdict(resp))
+    return cached_response(
+        request,
+        jwks.body,
+        jwks.etag,
+        max_age=JWKS_MAX_AGE,
+        content_type="application/json",
+    )
 
 
 @individual_routes.get("/jwks", name="handle_get_issuer_jwks")
@@ -354,11 +360,17 @@ async def handle_get_credential_status(request: Request, context: RequestContext
         credential_status_dict = await context.legal_entity_service.get_dummy_credential_status_for_insert_issuer_proxy(
             status_list_index
         )
-    else:
-        credential_status_dict = (
-            await context.legal_entity_service.get_credential_status(status_list_index)
-        )
-    return web.Response(text=credential_status_dict["credential"])
+        return web.Response(text=credential_status_dict["credential"])
+
+    signed_status_list = await context.legal_entity_service.get_credential_status(
+        status_list_index
+    )
+    return cached_response(
+        request,
+        signed_status_list.credential,
+        etag=signed_status_list.etag,
+        max_age=CACHE_MAX_AGE,
+    )
 
 
 @individual_routes.get(
@@ -701,6 +713,61 @@ async def handle_post_unrevoke_credential_offer(
         raise web.HTTPBadRequest(text=str(e))
 
 
+class UpdateRevocationStatusForCredentialOffersReq(BaseModel):
+    credential_offer_ids: List[uuid.UUID] = Field(..., min_length=1, max_length=10000)
+
+
+async def _update_revocation_status_for_credential_offers(
+    request: Request, context: RequestContext, is_revoked: bool
+):
+    data_agreement_id = request.match_info.get("data_agreement_id")
+
+    try:
+        data = await request.json()
+        update_revocation_status_req = (
+            UpdateRevocationStatusForCredentialOffersReq(**data)
+        )
+        result = await context.legal_entity_service.update_revocation_status_for_credential_offers(
+            data_agreement_id=data_agreement_id,
+            credential_offer_ids=[
+                str(credential_offer_id)
+                for credential_offer_id in update_revocation_status_req.credential_offer_ids
+            ],
+            is_revoked=is_revoked,
+        )
+        return web.json_response(result)
+    except ValidationError as e:
+        raise web.HTTPBadRequest(reason=json.dumps(e.errors()))
+    except json.decoder.JSONDecodeError:
+        raise web.HTTPBadRequest(reason="Invalid JSON")
+
+
+@individual_routes.post(
+    "/credential-schema/{data_agreement_id}/credential-offers/revoke",
+    name="handle_post_revoke_credential_offers",
+)
+@inject_request_context()
+async def handle_post_revoke_credential_offers(
+    request: Request, context: RequestContext
+):
+    return await _update_revocation_status_for_credential_offers(
+        request, context, is_revoked=True
+    )
+
+
+@individual_routes.post(
+    "/credential-schema/{data_agreement_id}/credential-offers/unrevoke",
+    name="handle_post_unrevoke_credential_offers",
+)
+@inject_request_context()
+async def handle_post_unrevoke_credential_offers(
+    request: Request, context: RequestContext
+):
+    return await _update_revocation_status_for_credential_offers(
+        request, context, is_revoked=False
+    )
+
+
 @individual_routes.delete(
     "/credential-schema/{data_agreement_id}/credential-offer/{credential_offer_id}",
     name="handle_delete_credential_offer",
@@ -0,0 +1,26 @@
+from aiohttp import web
+from aiohttp.web_request import Request
+
+from eudi_wallet.ebsi.utils.db import pool_metrics
+from eudi_wallet.ebsi.utils.metrics import Gauges, metrics
+from eudi_wallet.ebsi.utils.poller import poller_metrics
+from eudi_wallet.ebsi.utils.webhook import webhook_metrics
+
+metrics.register(
+    Gauges("db_pool", "Database connection pool checkouts", pool_metrics.snapshot)
+)
+metrics.register(
+    Gauges("webhook", "Webhook deliveries and queue depth", webhook_metrics.snapshot)
+)
+metrics.register(
+    Gauges("poller", "Polling attempts and time to completion", poller_metrics.snapshot)
+)
+
+metrics_routes = web.RouteTableDef()
+
+
+@metrics_routes.get("/metrics", name="handle_get_metrics")
+async def handle_get_metrics(request: Request):
+    return web.Response(
+        text=metrics.render(), content_type="text/plain", charset="utf-8"
+    )
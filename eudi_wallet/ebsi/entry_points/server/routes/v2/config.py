@@ -4,14 +4,17 @@ import uuid
 
 from aiohttp import web
 from aiohttp.web_request import Request
+from jsonschema import exceptions
 from pydantic import BaseModel, HttpUrl, ValidationError, conlist, constr
 
 from eudi_wallet.ebsi.entry_points.server.decorators import (
     V2RequestContext,
     v2_inject_request_context,
 )
-from eudi_wallet.ebsi.repositories.v2.verification_record import (
-    SqlAlchemyVerificationRecordRepository,
+from eudi_wallet.ebsi.entry_points.server.utils import (
+    get_page_query,
+    set_next_page_link,
+    stream_ndjson,
 )
 from eudi_wallet.ebsi.value_objects.application.organisation import (
     DataAgreementExchangeModes,
@@ -53,6 +56,7 @@ from sdjwt.adapter import DataAttributesAdapter, DataAttribute
 
 from eudi_wallet.ebsi.value_objects.domain.issuer import (
     CredentialIssuanceModes,
+    CredentialOfferRequest,
 )
 from eudi_wallet.ebsi.exceptions.application.organisation import (
     CreateDataAgreementUsecaseError,
@@ -62,7 +66,7 @@ from eudi_wallet.ebsi.exceptions.application.organisation import (
     CreateCredentialOfferError,
     UpdateCredentialOfferError,
 )
-from eudi_wallet.ebsi.services.domain.utils.did import generate_and_store_did_v2
+from eudi_wallet.ebsi.services.domain.utils.did import get_or_generate_did_v2
 from eudi_wallet.ebsi.utils.common import (
     validate_data_attribute_schema_against_data_attribute_values,
 )
@@ -104,11 +108,11 @@ from eudi_wallet.ebsi.usecases.v2.organisation.delete_credential_usecase import
 from eudi_wallet.ebsi.usecases.v2.organisation.list_credential_usecase import (
     ListCredentialUsecase,
 )
-from eudi_wallet.ebsi.repositories.v2.credential import (
-    SqlAlchemyCredentialRepository,
+from eudi_wallet.ebsi.usecases.v2.organisation.export_credential_usecase import (
+    ExportCredentialUsecase,
 )
-from eudi_wallet.ebsi.repositories.v2.issue_credential_record import (
-    SqlAlchemyIssueCredentialRecordRepository,
+from eudi_wallet.ebsi.usecases.v2.organisation.export_verification_request_usecase import (
+    ExportVerificationRequestUsecase,
 )
 from eudi_wallet.ebsi.exceptions.domain.issuer import (
     CredentialPendingError,
@@ -134,13 +138,14 @@ async def handle_config_get_organisation_identifier(
             organisation_repository=context.organisation_repository,
             logger=context.app_context.logger,
         )
-        organisation = usecase.execute(
+        organisation = await usecase.execute(
             organisation_id=organisation_id,
             name=context.legal_entity_service.legal_entity_entity.name,
             cryptographic_salt=uuid.uuid4().hex,
         )
-    _, ebsi_did, key_did = await generate_and_store_did_v2(
-        context.legal_entity_service.legal_entity_entity.cryptographic_seed,
+    _, ebsi_did, key_did = await get_or_generate_did_v2(
+        organisation_id=organisation_id,
+        crypto_seed=context.legal_entity_service.legal_entity_entity.cryptographic_seed,
         salt=context.legal_entity_service.legal_entity_entity.cryptographic_salt,
     )
 
@@ -190,7 +195,7 @@ async def handle_config_post_register_organisation(
         logo_url = str(register_organisation_req.logoUrl)
         cover_image_url = str(register_organisation_req.coverImageUrl)
         webhook_url = str(register_organisation_req.webhookUrl)
-        organisation = usecase.execute(
+        organisation = await usecase.execute(
             name=register_organisation_req.name,
             description=register_organisation_req.description,
             logo_url=logo_url,
@@ -227,7 +232,7 @@ async def handle_config_get_read_organisation(
             logger=context.app_context.logger,
         )
 
-        organisation = usecase.execute(
+        organisation = await usecase.execute(
             id=organisation_id,
         )
         if not organisation:
@@ -280,7 +285,7 @@ async def handle_config_put_update_organisation(
         cover_image_url = str(update_organisation_req.coverImageUrl)
         webhook_url = str(update_organisation_req.webhookUrl)
         cryptographic_seed = update_organisation_req.cryptographicSeed
-        organisation = usecase.execute(
+        organisation = await usecase.execute(
             organisation_id=organisation_id,
             name=update_organisation_req.name,
             description=update_organisation_req.description,
@@ -320,7 +325,7 @@ async def handle_config_delete_delete_organisation(
         logger=context.app_context.logger,
     )
 
-    is_deleted = usecase.execute(
+    is_deleted = await usecase.execute(
         id=organisation_id,
     )
 
@@ -361,7 +366,7 @@ async def handle_post_create_v2_data_agreement(
             logger=context.app_context.logger,
         )
 
-        data_agreement = usecase.execute(
+        data_agreement = await usecase.execute(
             organisation_id=organisation_id,
             purpose=create_data_agreement_req.purpose,
             data_attributes=create_data_agreement_req.dataAttributes,
@@ -402,7 +407,7 @@ async def handle_config_get_read_data_agreement(
         dataagreement_repository=context.data_agreement_repository,
         logger=context.app_context.logger,
     )
-    data_agreement = usecase.execute(
+    data_agreement = await usecase.execute(
         organisation_id=organisation_id, data_agreement_id=data_agreement_id
     )
     if not data_agreement:
@@ -449,7 +454,7 @@ async def handle_config_put_update_data_agreement(
             logger=context.app_context.logger,
         )
 
-        data_agreement = usecase.execute(
+        data_agreement = await usecase.execute(
             id=data_agreement_id,
             organisation_id=organisation_id,
             purpose=update_data_agreement_req.purpose,
@@ -491,7 +496,7 @@ async def handle_config_delete_delete_data_agreement(
         dataagreement_repository=context.data_agreement_repository,
         logger=context.app_context.logger,
     )
-    is_deleted = usecase.execute(
+    is_deleted = await usecase.execute(
         organisation_id=organisation_id, data_agreement_id=data_agreement_id
     )
     if not is_deleted:
@@ -518,7 +523,7 @@ async def handle_config_get_list_all_data_agreements(
         dataagreement_repository=context.data_agreement_repository,
         logger=context.app_context.logger,
     )
-    data_agreements = usecase.execute(organisation_id=organisation_id)
+    data_agreements = await usecase.execute(organisation_id=organisation_id)
     return web.json_response(
         [data_agreement.to_dict() for data_agreement in data_agreements]
     )
@@ -559,8 +564,8 @@ async def handle_post_issue_credential(request: Request, context: V2RequestConte
 
     try:
         if data_agreement_id:
-            with context.data_agreement_repository as repo:
-                data_agreement_model = repo.get_by_id_and_organisation_id(
+            async with context.data_agreement_repository as repo:
+                data_agreement_model = await repo.get_by_id_and_organisation_id(
                     organisation_id=organisation_id, id=data_agreement_id
                 )
                 if not data_agreement_model:
@@ -644,6 +649,69 @@ async def handle_post_issue_credential(request: Request, context: V2RequestConte
         raise web.HTTPBadRequest(reason="Invalid JSON")
 
 
+class IssueCredentialBatchItemReq(BaseModel):
+    issuanceMode: CredentialIssuanceModes
+    isPreAuthorised: bool = False
+    dataAttributeValues: Optional[list] = None
+    userPin: Optional[
+        constr(min_length=4, max_length=4, pattern="^[0-9]{4}$", strip_whitespace=True)  # type: ignore
+    ] = None
+    limitedDisclosure: Optional[bool] = None
+
+
+class CreateDataSourceIssueCredentialBatchReq(BaseModel):
+    dataAgreementId: constr(min_length=3, strip_whitespace=True)  # type: ignore
+    credentials: conlist(IssueCredentialBatchItemReq, min_length=1, max_length=10000)  # type: ignore
+
+
+@config_routes.post(
+    "/organisation/{organisationId}/config/issue-credentials",
+    name="handle_post_issue_credentials",
+)  # type: ignore
+@v2_inject_request_context()
+async def handle_post_issue_credentials(request: Request, context: V2RequestContext):
+    organisation_id = request.match_info.get("organisationId")
+    if organisation_id is None:
+        raise web.HTTPBadRequest(reason="Invalid organisation id")
+
+    try:
+        data = await request.json()
+        issue_credentials_req = CreateDataSourceIssueCredentialBatchReq(**data)
+        credential_offers = await context.legal_entity_service.issue_credential_records(
+            data_agreement_id=issue_credentials_req.dataAgreementId,
+            organisation_id=organisation_id,
+            credential_offer_requests=[
+                CredentialOfferRequest(
+                    issuance_mode=credential.issuanceMode,
+                    is_pre_authorised=credential.isPreAuthorised,
+                    user_pin=credential.userPin,
+                    data_attribute_values=credential.dataAttributeValues,
+                    limited_disclosure=(
+                        credential.limitedDisclosure
+                        if credential.limitedDisclosure
+                        else False
+                    ),
+                )
+                for credential in issue_credentials_req.credentials
+            ],
+        )
+        issuer_domain = context.legal_entity_service.issuer_domain
+        for credential_offer in credential_offers:
+            credentialExchangeId = credential_offer["id"]
+            credential_offer["credentialOffer"] = f"openid-credential-offer://?credential_offer_uri={issuer_domain}/organisation/{organisation_id}/service/credential-offer/{credentialExchangeId}"
+        return web.json_response({"credentialOffers": credential_offers}, status=201)
+    except UserPinRequiredError as e:
+        raise web.HTTPBadRequest(text=str(e))
+    except CreateCredentialOfferError as e:
+        raise web.HTTPBadRequest(text=str(e))
+    except exceptions.ValidationError as e:
+        raise web.HTTPBadRequest(text=e.message)
+    except ValidationError as e:
+        raise web.HTTPBadRequest(reason=json.dumps(e.errors()))
+    except json.decoder.JSONDecodeError:
+        raise web.HTTPBadRequest(reason="Invalid JSON")
+
+
 class UpdateCredentialOfferReq(BaseModel):
     dataAttributeValues: Optional[list] = None
     dataAgreementId: Optional[constr(min_length=3, strip_whitespace=True)] = None  # type: ignore
@@ -686,8 +754,8 @@ async def handle_service_put_update_credential_offer(
             )
             return web.json_response(credential_offer)
         else:
-            with context.data_agreement_repository as repo:
-                data_agreement_model = repo.get_by_id_and_organisation_id(
+            async with context.data_agreement_repository as repo:
+                data_agreement_model = await repo.get_by_id_and_organisation_id(
                     organisation_id=organisation_id, id=data_agreement_id
                 )
                 if not data_agreement_model:
@@ -766,6 +834,17 @@ async def handle_config_get_credential_offer_by_id_and_credential_schema_id(
     return web.json_response(credential_offer)
 
 
+def credential_offer_to_dict(credential_offer_entity) -> dict:
+    credential_offer = credential_offer_entity.to_dict()
+    # FIXME: Dyanmically create credential label from credential type
+    credential_offer["credentialLabel"] = (
+        credential_offer.get("credential", {})
+        .get("type", [])[-1]
+        .removesuffix("SdJwt")
+    )
+    return credential_offer
+
+
 @config_routes.get(
     "/organisation/{organisationId}/config/credential-offers",
     name="handle_config_get_all_credential_offers",
@@ -778,30 +857,49 @@ async def handle_config_get_all_credential_offers(
     if organisation_id is None:
         raise web.HTTPBadRequest(reason="Invalid organisation id")
 
-    data_agreement_id = request.query.get("dataAgreementId")
-    if data_agreement_id:
-        credential_offers = await context.legal_entity_service.get_all_credential_offers_by_data_agreement_id(
-            data_agreement_id=data_agreement_id
-        )
-    else:
-        credential_offers = await context.legal_entity_service.get_all_credential_offers_by_organisation_id(
-            organisation_id=organisation_id
-        )
+    page = await context.legal_entity_service.get_credential_offers_page(
+        organisation_id=organisation_id,
+        page_query=get_page_query(request),
+        data_agreement_id=request.query.get("dataAgreementId") or None,
+    )
 
-    # FIXME: Dyanmically create credential label from credential type
-    return web.json_response(
-        [
-            {
-                **credential_offer_entity.to_dict(),
-                "credentialLabel": credential_offer_entity.to_dict().get("credential", {})
-                .get("type", [])[-1]
-                .removesuffix("SdJwt"),
-            }
-            for credential_offer_entity in credential_offers
-        ]
+    return set_next_page_link(
+        web.json_response(
+            [
+                credential_offer_to_dict(credential_offer_entity)
+                for credential_offer_entity in page.items
+            ]
+        ),
+        request,
+        page.next_cursor,
     )
 
 
+@config_routes.get(
+    "/organisation/{organisationId}/config/export/credential-offers",
+    name="handle_config_export_credential_offers",
+)
+@v2_inject_request_context()
+async def handle_config_export_credential_offers(
+    request: Request, context: V2RequestContext
+):
+    organisation_id = request.match_info.get("organisationId")
+    if organisation_id is None:
+        raise web.HTTPBadRequest(reason="Invalid organisation id")
+
+    page_query = get_page_query(request)
+
+    async def records():
+        async for credential_offer_entity in (
+            context.legal_entity_service.stream_credential_offers(
+                organisation_id=organisation_id, page_query=page_query
+            )
+        ):
+            yield credential_offer_to_dict(credential_offer_entity)
+
+    return await stream_ndjson(request, records(), "credential-offers.ndjson")
+
+
 @config_routes.delete(
     "/organisation/{organisationId}/config/credential-offer/{credentialOfferId}",
     name="handle_config_delete_credential_offer",
@@ -842,9 +940,7 @@ async def handle_post_create_verification_request(
     assert context.app_context.logger is not None
     assert context.app_context.domain is not None
     assert context.legal_entity_service is not None
-    repository = SqlAlchemyVerificationRecordRepository(
-        session=context.app_context.db_session, logger=context.app_context.logger
-    )
+    repository = context.verification_record_repository
 
     # Validate organisation ID in the path parameter
     organisation_id = request.match_info.get("organisationId")
@@ -865,7 +961,7 @@ async def handle_post_create_verification_request(
             logger=context.app_context.logger,
         )
 
-        _, verification_record = usecase.execute(
+        _, verification_record = await usecase.execute(
             key_did=context.legal_entity_service.key_did,
             domain=context.app_context.domain,
             organisation_id=organisation_id,
@@ -892,9 +988,7 @@ async def handle_get_read_verification_history(
     assert context.app_context.logger is not None
     assert context.app_context.domain is not None
     assert context.legal_entity_service is not None
-    repository = SqlAlchemyVerificationRecordRepository(
-        session=context.app_context.db_session, logger=context.app_context.logger
-    )
+    repository = context.verification_record_repository
     organisation_id = request.match_info.get("organisationId")
     if organisation_id is None:
         raise web.HTTPBadRequest(reason="Invalid organisation ID")
@@ -909,7 +1003,7 @@ async def handle_get_read_verification_history(
             logger=context.app_context.logger,
         )
 
-        verification_record = usecase.execute(
+        verification_record = await usecase.execute(
             verification_record_id=verification_record_id
         )
         return web.json_response(verification_record.to_dict())
@@ -933,9 +1027,7 @@ async def handle_delete_verification_history(
     assert context.app_context.logger is not None
     assert context.app_context.domain is not None
     assert context.legal_entity_service is not None
-    repository = SqlAlchemyVerificationRecordRepository(
-        session=context.app_context.db_session, logger=context.app_context.logger
-    )
+    repository = context.verification_record_repository
     organisation_id = request.match_info.get("organisationId")
     if organisation_id is None:
         raise web.HTTPBadRequest(reason="Invalid organisation ID")
@@ -950,7 +1042,7 @@ async def handle_delete_verification_history(
             logger=context.app_context.logger,
         )
 
-        usecase.execute(
+        await usecase.execute(
             organisation_id=organisation_id,
             verification_record_id=verification_record_id,
         )
@@ -973,9 +1065,7 @@ async def handle_list_verification_history(request: Request, context: V2RequestC
     assert context.app_context.logger is not None
     assert context.app_context.domain is not None
     assert context.legal_entity_service is not None
-    repository = SqlAlchemyVerificationRecordRepository(
-        session=context.app_context.db_session, logger=context.app_context.logger
-    )
+    repository = context.verification_record_repository
     organisation_id = request.match_info.get("organisationId")
     if organisation_id is None:
         raise web.HTTPBadRequest(reason="Invalid organisation ID")
@@ -986,14 +1076,16 @@ async def handle_list_verification_history(request: Request, context: V2RequestC
             logger=context.app_context.logger,
         )
 
-        verification_records = usecase.execute(
+        page = await usecase.execute(
             organisation_id=organisation_id,
+            page_query=get_page_query(request),
         )
-        return web.json_response(
-            [
-                verification_record.to_dict()
-                for verification_record in verification_records
-            ]
+        return set_next_page_link(
+            web.json_response(
+                [verification_record.to_dict() for verification_record in page.items]
+            ),
+            request,
+            page.next_cursor,
         )
     except ValidationError as e:
         raise web.HTTPBadRequest(reason=json.dumps(e.errors()))
@@ -1001,6 +1093,32 @@ async def handle_list_verification_history(request: Request, context: V2RequestC
         raise web.HTTPBadRequest(reason=str(e))
 
 
+@config_routes.get(
+    "/organisation/{organisationId}/config/export/verification-history",
+    name="handle_config_export_verification_history",
+)
+@v2_inject_request_context()
+async def handle_config_export_verification_history(
+    request: Request, context: V2RequestContext
+):
+    assert context.app_context.logger is not None
+    organisation_id = request.match_info.get("organisationId")
+    if organisation_id is None:
+        raise web.HTTPBadRequest(reason="Invalid organisation ID")
+
+    usecase = ExportVerificationRequestUsecase(
+        repository=context.verification_record_repository,
+        logger=context.app_context.logger,
+    )
+    return await stream_ndjson(
+        request,
+        usecase.execute(
+            organisation_id=organisation_id, page_query=get_page_query(request)
+        ),
+        "verification-history.ndjson",
+    )
+
+
 @config_routes.post(
     "/config/digital-wallet/openid", name="handle_config_post_deploy_openid"
 )  # type: ignore
@@ -1176,9 +1294,7 @@ async def handle_config_send_verification_request(
     assert context.app_context.logger is not None
     assert context.app_context.domain is not None
     assert context.legal_entity_service is not None
-    repository = SqlAlchemyVerificationRecordRepository(
-        session=context.app_context.db_session, logger=context.app_context.logger
-    )
+    repository = context.verification_record_repository
 
     # Validate organisation ID in the path parameter
     organisation_id = request.match_info.get("organisationId")
@@ -1199,7 +1315,7 @@ async def handle_config_send_verification_request(
             logger=context.app_context.logger,
         )
 
-        _, verification_record = usecase.execute(
+        _, verification_record = await usecase.execute(
             key_did=context.legal_entity_service.key_did,
             domain=context.app_context.domain,
             organisation_id=organisation_id,
@@ -1282,12 +1398,8 @@ async def handle_config_receive_credential(request: Request, context: V2RequestC
     assert context.app_context.logger is not None
     assert context.app_context.domain is not None
     assert context.legal_entity_service is not None
-    repository = SqlAlchemyCredentialRepository(
-        session=context.app_context.db_session, logger=context.app_context.logger
-    )
-    issue_credential_repository = SqlAlchemyIssueCredentialRecordRepository(
-        session=context.app_context.db_session, logger=context.app_context.logger
-    )
+    repository = context.credential_repository
+    issue_credential_repository = context.issue_credential_record_repository
     organisation_id = request.match_info.get("organisationId")
     if organisation_id is None:
         raise web.HTTPBadRequest(reason="Invalid organisation id")
@@ -1326,12 +1438,8 @@ async def handle_config_receive_credential_deferred(
     assert context.app_context.logger is not None
     assert context.app_context.domain is not None
     assert context.legal_entity_service is not None
-    repository = SqlAlchemyCredentialRepository(
-        session=context.app_context.db_session, logger=context.app_context.logger
-    )
-    issue_credential_repository = SqlAlchemyIssueCredentialRecordRepository(
-        session=context.app_context.db_session, logger=context.app_context.logger
-    )
+    repository = context.credential_repository
+    issue_credential_repository = context.issue_credential_record_repository
     organisation_id = request.match_info.get("organisationId")
     if organisation_id is None:
         raise web.HTTPBadRequest(reason="Invalid organisation id")
@@ -1374,9 +1482,7 @@ async def handle_config_read_credential(request: Request, context: V2RequestCont
     assert context.app_context.logger is not None
     assert context.app_context.domain is not None
     assert context.legal_entity_service is not None
-    repository = SqlAlchemyCredentialRepository(
-        session=context.app_context.db_session, logger=context.app_context.logger
-    )
+    repository = context.credential_repository
     organisation_id = request.match_info.get("organisationId")
     if organisation_id is None:
         raise web.HTTPBadRequest(reason="Invalid organisation ID")
@@ -1393,7 +1499,7 @@ async def handle_config_read_credential(request: Request, context: V2RequestCont
             logger=context.app_context.logger,
         )
 
-        credential = usecase.execute(credential_id=credential_id)
+        credential = await usecase.execute(credential_id=credential_id)
         return web.json_response(credential.to_dict())
     except ReadCredentialUsecaseError as e:
         raise web.HTTPBadRequest(reason=str(e))
@@ -1411,9 +1517,7 @@ async def handle_config_delete_credential(request: Request, context: V2RequestCo
     assert context.app_context.logger is not None
     assert context.app_context.domain is not None
     assert context.legal_entity_service is not None
-    repository = SqlAlchemyCredentialRepository(
-        session=context.app_context.db_session, logger=context.app_context.logger
-    )
+    repository = context.credential_repository
     organisation_id = request.match_info.get("organisationId")
     if organisation_id is None:
         raise web.HTTPBadRequest(reason="Invalid organisation ID")
@@ -1430,7 +1534,7 @@ async def handle_config_delete_credential(request: Request, context: V2RequestCo
             logger=context.app_context.logger,
         )
 
-        usecase.execute(
+        await usecase.execute(
             organisation_id=organisation_id,
             credential_id=credential_id,
         )
@@ -1451,9 +1555,7 @@ async def handle_config_list_credentials(request: Request, context: V2RequestCon
     assert context.app_context.logger is not None
     assert context.app_context.domain is not None
     assert context.legal_entity_service is not None
-    repository = SqlAlchemyCredentialRepository(
-        session=context.app_context.db_session, logger=context.app_context.logger
-    )
+    repository = context.credential_repository
     organisation_id = request.match_info.get("organisationId")
     if organisation_id is None:
         raise web.HTTPBadRequest(reason="Invalid organisation ID")
@@ -1464,9 +1566,38 @@ async def handle_config_list_credentials(request: Request, context: V2RequestCon
             logger=context.app_context.logger,
         )
 
-        credentials = usecase.execute(
+        page = await usecase.execute(
             organisation_id=organisation_id,
+            page_query=get_page_query(request),
+        )
+        return set_next_page_link(
+            web.json_response([credential.to_dict() for credential in page.items]),
+            request,
+            page.next_cursor,
         )
-        return web.json_response([credentials.to_dict() for credentials in credentials])
     except ValidationError as e:
         raise web.HTTPBadRequest(reason=json.dumps(e.errors()))
+
+
+@config_routes.get(
+    "/organisation/{organisationId}/config/export/credentials",
+    name="handle_config_export_credentials",
+)
+@v2_inject_request_context()
+async def handle_config_export_credentials(request: Request, context: V2RequestContext):
+    assert context.app_context.logger is not None
+    organisation_id = request.match_info.get("organisationId")
+    if organisation_id is None:
+        raise web.HTTPBadRequest(reason="Invalid organisation ID")
+
+    usecase = ExportCredentialUsecase(
+        repository=context.credential_repository,
+        logger=context.app_context.logger,
+    )
+    return await stream_ndjson(
+        request,
+        usecase.execute(
+            organisation_id=organisation_id, page_query=get_page_query(request)
+        ),
+        "credentials.ndjson",
+    )
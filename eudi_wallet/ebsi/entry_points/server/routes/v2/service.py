@@ -9,12 +9,18 @@ from eudi_wallet.ebsi.entry_points.server.decorators import (
     V2RequestContext,
     v2_inject_request_context,
 )
+from eudi_wallet.ebsi.entry_points.server.utils import (
+    cached_response,
+    json_cached_response,
+)
 from eudi_wallet.ebsi.entry_points.server.v2_well_known import (
+    render_static_document,
     service_get_well_known_openid_credential_issuer_config,
     service_get_well_known_authn_openid_config,
     service_get_well_known_openid_credential_issuer_config_v2,
     service_get_well_known_authn_openid_config_v2,
 )
+from eudi_wallet.ebsi.services.domain.utils.did import JWKS_MAX_AGE, get_jwks_v2
 from eudi_wallet.ebsi.utils.jwt import decode_header_and_claims_in_jwt
 from eudi_wallet.ebsi.exceptions.application.organisation import (
     CreateAccessTokenError,
@@ -34,9 +40,6 @@ from eudi_wallet.ebsi.exceptions.domain.authn import (
 from eudi_wallet.ebsi.exceptions.domain.issuer import (
     CredentialPendingError,
 )
-from eudi_wallet.ebsi.repositories.v2.verification_record import (
-    SqlAlchemyVerificationRecordRepository,
-)
 from eudi_wallet.ebsi.usecases.v2.organisation.receive_vp_token_usecase import (
     ReceiveVpTokenUsecase,
 )
@@ -48,6 +51,25 @@ from eudi_wallet.holder.core import process_credential_offer_and_receive_credent
 
 service_routes = web.RouteTableDef()
 
+# Seconds clients may reuse a static well-known document
+STATIC_DOCUMENT_MAX_AGE = 3600
+
+
+def static_well_known_response(request: Request, render) -> web.Response:
+    # Static documents need neither the legal entity nor a database session
+    organisation_id = request.match_info.get("organisationId")
+    if organisation_id is None:
+        raise web.HTTPBadRequest(reason="Invalid organisation id")
+
+    document = render_static_document(render, request.app["domain"], organisation_id)
+    return cached_response(
+        request,
+        document.body,
+        document.etag,
+        max_age=STATIC_DOCUMENT_MAX_AGE,
+        content_type="application/json",
+    )
+
 
 @service_routes.get(
     "/organisation/{organisationId}/service/credential-offer/{credential_offer_id}",
@@ -85,9 +107,7 @@ async def handle_get_verification_request_by_reference(
     assert context.app_context.logger is not None
     assert context.app_context.domain is not None
     assert context.legal_entity_service is not None
-    repository = SqlAlchemyVerificationRecordRepository(
-        session=context.app_context.db_session, logger=context.app_context.logger
-    )
+    repository = context.verification_record_repository
 
     verification_record_id = request.match_info.get("verification_record_id")
     if verification_record_id is None:
@@ -102,7 +122,7 @@ async def handle_get_verification_request_by_reference(
             logger=context.app_context.logger,
         )
 
-        verification_record = usecase.execute(
+        verification_record = await usecase.execute(
             verification_record_id=verification_record_id,
             webhook_url=context.legal_entity_service.legal_entity_entity.webhook_url,
         )
@@ -127,50 +147,70 @@ async def handle_service_get_well_known_openid_credential_issuer_configuration(
     if organisation_id is None:
         raise web.HTTPBadRequest(reason="Invalid organisation id")
     
-    res = service_get_well_known_openid_credential_issuer_config(
+    res = await service_get_well_known_openid_credential_issuer_config(
         wallet_domain=context.app_context.domain,
         organisation_id=organisation_id,
-        logger=context.app_context.logger,
-        session=context.app_context.db_session,
         legal_entity_repository=context.organisation_repository,
+        issue_credential_repository=context.issue_credential_record_repository,
     )
-    return web.json_response(res)
+    # Clients revalidate with the ETag instead of downloading it again
+    return json_cached_response(request, res)
 
 
 @service_routes.get(
     "/organisation/{organisationId}/service/.well-known/oauth-authorization-server",
     name="handle_service_get_well_known_oauth_authorization_server",
 )
-@v2_inject_request_context(raise_exception_if_legal_entity_not_found=False)
-async def handle_service_get_well_known_oauth_authorization_server(
-    request: Request, context: V2RequestContext
-):
-    organisation_id = request.match_info.get("organisationId")
-    if organisation_id is None:
-        raise web.HTTPBadRequest(reason="Invalid organisation id")
-
-    res = service_get_well_known_authn_openid_config(
-        context.app_context.domain, organisation_id=organisation_id
+async def handle_service_get_well_known_oauth_authorization_server(request: Request):
+    return static_well_known_response(
+        request, service_get_well_known_authn_openid_config
     )
-    return web.json_response(res)
 
 
 @service_routes.get(
     "/organisation/{organisationId}/service/.well-known/openid-configuration",
     name="handle_service_get_well_known_openid_configuration",
 )
-@v2_inject_request_context(raise_exception_if_legal_entity_not_found=False)
-async def handle_service_get_well_known_openid_configuration(
-    request: Request, context: V2RequestContext
-):
-    organisation_id = request.match_info.get("organisationId")
-    if organisation_id is None:
-        raise web.HTTPBadRequest(reason="Invalid organisation id")
+async def handle_service_get_well_known_openid_configuration(request: Request):
+    return static_well_known_response(
+        request, service_get_well_known_authn_openid_config
+    )
 
-    res = service_get_well_known_authn_openid_config(
-        context.app_context.domain, organisation_id=organisation_id
+
+async def jwks_response(request: Request, context: V2RequestContext) -> web.Response:
+    organisation_id = request.match_info.get("organisationId")
+    legal_entity_entity = context.legal_entity_service.legal_entity_entity
+    # Fetched by every wallet and relying party verifying our credentials
+    jwks = await get_jwks_v2(
+        organisation_id=organisation_id,
+        crypto_seed=legal_entity_entity.cryptographic_seed,
+        salt=legal_entity_entity.cryptographic_salt,
     )
-    return web.json_response(res)
+    return cached_response(
+        request,
+        jwks.body,
+        jwks.etag,
+        max_age=JWKS_MAX_AGE,
+        content_type="application/json",
+    )
+
+
+@service_routes.get(
+    "/organisation/{organisationId}/service/jwks",
+    name="handle_service_get_jwks",
+)
+@v2_inject_request_context()
+async def handle_service_get_jwks(request: Request, context: V2RequestContext):
+    return await jwks_response(request, context)
+
+
+@service_routes.get(
+    "/organisation/{organisationId}/service/digital-wallet/openid/jwks",
+    name="handle_service_read_jwks_v2",
+)
+@v2_inject_request_context()
+async def handle_service_read_jwks_v2(request: Request, context: V2RequestContext):
+    return await jwks_response(request, context)
 
 
 @service_routes.get(
@@ -270,10 +310,7 @@ async def handle_service_post_direct_post(request: Request, context: V2RequestCo
             assert context.app_context.logger is not None
             assert context.app_context.domain is not None
             assert context.legal_entity_service is not None
-            repository = SqlAlchemyVerificationRecordRepository(
-                session=context.app_context.db_session,
-                logger=context.app_context.logger,
-            )
+            repository = context.verification_record_repository
 
             organisation_id = request.match_info.get("organisationId")
             if organisation_id is None:
@@ -284,7 +321,7 @@ async def handle_service_post_direct_post(request: Request, context: V2RequestCo
                 logger=context.app_context.logger,
             )
 
-            verification_record = usecase.execute(
+            verification_record = await usecase.execute(
                 organisation_id=organisation_id,
                 state=id_token_response_req.state,
                 vp_token=id_token_response_req.vp_token,
@@ -510,50 +547,38 @@ async def handle_service_read_well_known_openid_credential_issuer_configuration_
     if organisation_id is None:
         raise web.HTTPBadRequest(reason="Invalid organisation id")
 
-    res = service_get_well_known_openid_credential_issuer_config_v2(
+    res = await service_get_well_known_openid_credential_issuer_config_v2(
         wallet_domain=context.app_context.domain,
         organisation_id=organisation_id,
-        logger=context.app_context.logger,
-        session=context.app_context.db_session,
         legal_entity_repository=context.organisation_repository,
+        issue_credential_repository=context.issue_credential_record_repository,
     )
-    return web.json_response(res)
+    # Clients revalidate with the ETag instead of downloading it again
+    return json_cached_response(request, res)
 
 
 @service_routes.get(
     "/organisation/{organisationId}/service/digital-wallet/openid/.well-known/oauth-authorization-server",
     name="handle_service_read_well_known_oauth_authorization_server_v2",
 )
-@v2_inject_request_context(raise_exception_if_legal_entity_not_found=False)
 async def handle_service_read_well_known_oauth_authorization_server_v2(
-    request: Request, context: V2RequestContext
+    request: Request,
 ):
-    organisation_id = request.match_info.get("organisationId")
-    if organisation_id is None:
-        raise web.HTTPBadRequest(reason="Invalid organisation id")
-
-    res = service_get_well_known_authn_openid_config_v2(
-        context.app_context.domain, organisation_id=organisation_id
+    return static_well_known_response(
+        request, service_get_well_known_authn_openid_config_v2
     )
-    return web.json_response(res)
 
 
 @service_routes.get(
     "/organisation/{organisationId}/service/digital-wallet/openid/.well-known/openid-configuration",
     name="handle_service_read_well_known_openid_configuration_v2",
 )
-@v2_inject_request_context(raise_exception_if_legal_entity_not_found=False)
 async def handle_service_read_well_known_openid_configuration_v2(
-    request: Request, context: V2RequestContext
+    request: Request,
 ):
-    organisation_id = request.match_info.get("organisationId")
-    if organisation_id is None:
-        raise web.HTTPBadRequest(reason="Invalid organisation id")
-
-    res = service_get_well_known_authn_openid_config_v2(
-        context.app_context.domain, organisation_id=organisation_id
+    return static_well_known_response(
+        request, service_get_well_known_authn_openid_config_v2
     )
-    return web.json_response(res)
 
 
 @service_routes.get(
@@ -1,5 +1,6 @@
 import asyncio
 import logging
+import signal
 from typing import Optional
 
 import click
@@ -9,19 +10,62 @@ from aiohttp.web_request import Request
 from aiokafka import AIOKafkaProducer
 from aiokafka.errors import KafkaConnectionError
 from pyngrok import ngrok
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 
 from eudi_wallet.ebsi.entry_points.server.middlewares import (
     error_middleware,
     logging_middleware,
+    metrics_middleware,
 )
 from eudi_wallet.ebsi.entry_points.server.routes.individual import individual_routes
+from eudi_wallet.ebsi.entry_points.server.routes.metrics import metrics_routes
 from eudi_wallet.ebsi.entry_points.server.routes.organisation import organisation_routes
 from eudi_wallet.ebsi.entry_points.server.routes.v2.config import config_routes
 from eudi_wallet.ebsi.entry_points.server.routes.v2.service import service_routes
-from eudi_wallet.ebsi.entry_points.server.startup import app_startup
+from eudi_wallet.ebsi.entry_points.server.startup import (
+    did_document_store_ctx,
+    discovery_ctx,
+    http_client_pool_ctx,
+    organisation_cache_ctx,
+    signing_executor_ctx,
+    webhook_dispatcher_ctx,
+)
+from eudi_wallet.ebsi.entry_points.server.workers import WorkerSupervisor
 from eudi_wallet.ebsi.models.base import Base, import_models
+from eudi_wallet.ebsi.utils.access_log import (
+    AccessLogConfig,
+    access_log_options,
+    get_access_log_config,
+)
+from eudi_wallet.ebsi.utils.db import (
+    DBPoolConfig,
+    create_async_db_engine,
+    create_db_engine,
+    database_pool_options,
+    get_db_pool_config,
+)
+from eudi_wallet.ebsi.utils.httpx_client import (
+    HttpClientPoolConfig,
+    get_http_client_pool_config,
+    http_client_pool_options,
+)
+from eudi_wallet.ebsi.utils.metrics import metrics
+from eudi_wallet.ebsi.utils.organisation_cache import (
+    OrganisationCacheConfig,
+    get_organisation_cache_config,
+    organisation_cache_options,
+)
+from eudi_wallet.ebsi.utils.signing import (
+    SigningExecutorConfig,
+    get_signing_executor_config,
+    signing_executor_options,
+)
+from eudi_wallet.ebsi.utils.webhook import (
+    WebhookConfig,
+    get_webhook_config,
+    webhook_options,
+)
 
 
 class AppLogger:
@@ -39,11 +83,12 @@ class AppLogger:
 
 
 class DBSetup:
-    def __init__(self, db_uri):
+    def __init__(self, db_uri, pool_config: Optional[DBPoolConfig] = None):
         self.db_uri = db_uri
+        self.pool_config = pool_config or DBPoolConfig()
 
     def setup_db(self):
-        engine = create_engine(self.db_uri)
+        engine = create_db_engine(self.db_uri, self.pool_config)
         Session = sessionmaker(bind=engine)
 
         # It creates a table if it does not exist.
@@ -52,6 +97,21 @@ class DBSetup:
 
         return Session
 
+    def create_tables(self):
+        # Run once before forking workers, so that they do not race to
+        # create the same tables
+        engine = create_db_engine(self.db_uri, self.pool_config)
+        import_models()
+        Base.metadata.create_all(engine)
+        engine.dispose()
+
+    def setup_async_db(self):
+        engine = create_async_db_engine(self.db_uri, self.pool_config)
+        # Objects are read after the session is closed, so attributes must
+        # not be expired on commit.
+        AsyncSession = async_sessionmaker(bind=engine, expire_on_commit=False)
+        return AsyncSession
+
 
 class NgrokSetup:
     def __init__(self, auth_token):
@@ -76,24 +136,52 @@ class ServerSetup:
         domain: str,
         debug: bool,
         add_route: str = None,
+        async_db_session: object = None,
+        webhook_config: Optional[WebhookConfig] = None,
+        http_client_pool_config: Optional[HttpClientPoolConfig] = None,
+        signing_executor_config: Optional[SigningExecutorConfig] = None,
+        access_log_config: Optional[AccessLogConfig] = None,
+        organisation_cache_config: Optional[OrganisationCacheConfig] = None,
+        serve_metrics: bool = True,
     ):
         self.db_session = db_session
+        self.async_db_session = async_db_session
         self.producer = producer
         self.logger = logger
         self.domain = domain
         self.add_route = add_route
-
-    async def start_server(self, port: int):
-        app = web.Application(middlewares=[error_middleware, logging_middleware])
+        self.webhook_config = webhook_config
+        self.http_client_pool_config = http_client_pool_config
+        self.signing_executor_config = signing_executor_config
+        self.access_log_config = access_log_config
+        self.organisation_cache_config = organisation_cache_config
+        self.serve_metrics = serve_metrics
+        self.metrics_runner: Optional[web.AppRunner] = None
+
+    def create_app(self) -> web.Application:
+        app = web.Application(
+            middlewares=[metrics_middleware, error_middleware, logging_middleware]
+        )
 
         # app["kafka_producer"] = self.producer
         # app["kafka_topic"] = self.kafka_topic
         app["logger"] = self.logger
         app["db_session"] = self.db_session
+        app["async_db_session"] = self.async_db_session
         app["domain"] = self.domain
+        app["webhook_config"] = self.webhook_config
+        app["http_client_pool_config"] = self.http_client_pool_config
+        app["signing_executor_config"] = self.signing_executor_config
+        app["access_log_config"] = self.access_log_config
+        app["organisation_cache_config"] = self.organisation_cache_config
 
         # Add startup functions
-        app.on_startup.append(app_startup)
+        app.cleanup_ctx.append(signing_executor_ctx)
+        app.cleanup_ctx.append(http_client_pool_ctx)
+        app.cleanup_ctx.append(webhook_dispatcher_ctx)
+        app.cleanup_ctx.append(discovery_ctx)
+        app.cleanup_ctx.append(did_document_store_ctx)
+        app.cleanup_ctx.append(organisation_cache_ctx)
         
         # Add routes
         if self.add_route == "config":
@@ -106,20 +194,43 @@ class ServerSetup:
 
         app.add_routes(individual_routes)
         app.add_routes(organisation_routes)
+        if self.serve_metrics:
+            app.add_routes(metrics_routes)
 
         app.add_routes([web.route("*", "/{tail:.*}", handle_404, name="handle_404")])
 
-        runner = web.AppRunner(app)
+        return app
+
+    async def start_server(
+        self,
+        port: int,
+        reuse_port: bool = False,
+        metrics_port: Optional[int] = None,
+    ):
+        runner = web.AppRunner(self.create_app())
         await runner.setup()
 
-        site = web.TCPSite(runner, "0.0.0.0", port)
+        # With workers, each one listens on the port and the kernel
+        # balances connections between them
+        site = web.TCPSite(runner, "0.0.0.0", port, reuse_port=reuse_port)
         await site.start()
 
+        if metrics_port is not None:
+            # A port of its own, so that a scrape reaches this process and
+            # not whichever worker the kernel picks
+            metrics_app = web.Application()
+            metrics_app.add_routes(metrics_routes)
+            self.metrics_runner = web.AppRunner(metrics_app, access_log=None)
+            await self.metrics_runner.setup()
+            await web.TCPSite(self.metrics_runner, "0.0.0.0", metrics_port).start()
+
         return runner, site
 
     async def stop_server(self, runner, site):
         await site.stop()
         await runner.cleanup()
+        if self.metrics_runner is not None:
+            await self.metrics_runner.cleanup()
 
 
 @click.command()
@@ -127,7 +238,8 @@ class ServerSetup:
 @click.option("--domain", envvar="DOMAIN")
 @click.option(
     "--log-level",
-    default="DEBUG",
+    envvar="LOG_LEVEL",
+    default="INFO",
     type=click.Choice(["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]),
     help="Set the log level",
 )
@@ -150,7 +262,40 @@ class ServerSetup:
 @click.option("--database-host", envvar="DATABASE_HOST")
 @click.option("--database-port", envvar="DATABASE_PORT")
 @click.option("--database-db", envvar="DATABASE_DB")
+@click.option(
+    "--database-driver",
+    envvar="DATABASE_DRIVER",
+    default="psycopg2",
+    type=click.Choice(["psycopg2", "asyncpg"]),
+    help="Database driver used by the v2 endpoints",
+)
+@database_pool_options
+@webhook_options
+@http_client_pool_options
+@signing_executor_options
+@access_log_options
+@organisation_cache_options
 @click.option("--add-route", envvar="ROUTE_PERMITTED")
+@click.option(
+    "--workers",
+    envvar="WORKERS",
+    default=1,
+    type=click.IntRange(min=1),
+    help=(
+        "Server processes sharing the port. Each has its own database pool, so "
+        "up to workers x (pool size + max overflow) connections are opened"
+    ),
+)
+@click.option(
+    "--metrics-port",
+    envvar="METRICS_PORT",
+    default=None,
+    type=int,
+    help=(
+        "Serve /metrics on this port instead of the server port. Worker N "
+        "listens on metrics port + N and labels its series with worker=N"
+    ),
+)
 def main(
     port,
     domain,
@@ -163,7 +308,31 @@ def main(
     database_host,
     database_port,
     database_db,
+    database_driver,
+    database_pool_size,
+    database_max_overflow,
+    database_pool_timeout,
+    database_pool_recycle,
+    database_pool_pre_ping,
+    database_statement_timeout,
+    webhook_queue_size,
+    webhook_concurrency,
+    webhook_connections_per_host,
+    webhook_timeout,
+    webhook_max_attempts,
+    http_max_connections,
+    http_max_connections_per_host,
+    http2,
+    signing_executor,
+    signing_workers,
+    log_sample_rate,
+    log_body_max_length,
+    organisation_cache_ttl,
+    organisation_cache_size,
+    organisation_cache_notify,
     add_route,
+    workers,
+    metrics_port,
 ):
     level: int = getattr(logging, log_level.upper())
     logger = AppLogger(__name__, level=level).logger
@@ -176,56 +345,130 @@ def main(
     #     logger.debug("Debugger attached!")
 
     database_url = f"postgresql+psycopg2://{database_user}:{database_password}@{database_host}:{database_port}/{database_db}"
-    db_session = DBSetup(database_url).setup_db()
+    pool_config = get_db_pool_config(
+        database_pool_size,
+        database_max_overflow,
+        database_pool_timeout,
+        database_pool_recycle,
+        database_pool_pre_ping,
+        database_statement_timeout,
+    )
 
-    loop = asyncio.get_event_loop()
+    webhook_config = get_webhook_config(
+        webhook_queue_size,
+        webhook_concurrency,
+        webhook_connections_per_host,
+        webhook_timeout,
+        webhook_max_attempts,
+    )
+
+    http_client_pool_config = get_http_client_pool_config(
+        http_max_connections, http_max_connections_per_host, http2
+    )
 
-    producer: Optional[AIOKafkaProducer] = None
-    # try:
-    #     if kafka_broker_address:
-    #         producer = AIOKafkaProducer(
-    #             bootstrap_servers=kafka_broker_address, loop=loop
-    #         )
-    #         loop.run_until_complete(producer.start())
-    # except KafkaConnectionError as e:
-    #     logger.error(f"Unable to connect to Kafka broker: {e}")
+    signing_executor_config = get_signing_executor_config(
+        signing_executor, signing_workers
+    )
 
-    # assert producer is not None
+    access_log_config = get_access_log_config(log_sample_rate, log_body_max_length)
 
-    server = ServerSetup(
-        db_session, producer, logger, domain, debug, add_route
+    organisation_cache_config = get_organisation_cache_config(
+        organisation_cache_ttl, organisation_cache_size, organisation_cache_notify
     )
 
-    runner, site = loop.run_until_complete(server.start_server(port))
-
-    # Only set up ngrok if auth token is provided
-    # ngrok_tunnel = None
-    # tunnel: Optional[ngrok.NgrokTunnel] = None
-    # if ngrok_auth_token:
-    #     ngrok_tunnel = NgrokSetup(ngrok_auth_token)
-    #     try:
-    #         tunnel = ngrok_tunnel.configure_ngrok(port, ngrok_subdomain)
-    #         logger.info(f"ngrok tunnel URL: {tunnel.public_url}")
-    #     except Exception as e:
-    #         logger.error(f"Error while setting up ngrok: {e}")
-    # else:
-    #     logger.info("Starting without ngrok...")
-
-    try:
-        loop.run_forever()
-
-    except KeyboardInterrupt:
-        print("CTRL+C Pressed. Shutting down gracefully...")
-        pass
-
-    finally:
-        loop.run_until_complete(server.stop_server(runner, site))
-        loop.run_until_complete(producer.stop())
-        loop.close()
-
-        # if ngrok_tunnel and "tunnel" in locals():
-        #     ngrok.disconnect(tunnel.public_url)
-        #     ngrok.kill()
+    def serve(worker: Optional[int] = None):
+        # Engines and their pools are created in the serving process, a
+        # pool must not be shared across a fork
+        db_session = DBSetup(database_url, pool_config).setup_db()
+
+        async_db_session = None
+        if database_driver == "asyncpg":
+            async_database_url = f"postgresql+asyncpg://{database_user}:{database_password}@{database_host}:{database_port}/{database_db}"
+            async_db_session = DBSetup(async_database_url, pool_config).setup_async_db()
+
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+        producer: Optional[AIOKafkaProducer] = None
+        # try:
+        #     if kafka_broker_address:
+        #         producer = AIOKafkaProducer(
+        #             bootstrap_servers=kafka_broker_address, loop=loop
+        #         )
+        #         loop.run_until_complete(producer.start())
+        # except KafkaConnectionError as e:
+        #     logger.error(f"Unable to connect to Kafka broker: {e}")
+
+        # assert producer is not None
+
+        server = ServerSetup(
+            db_session,
+            producer,
+            logger,
+            domain,
+            debug,
+            add_route,
+            async_db_session,
+            webhook_config,
+            http_client_pool_config,
+            signing_executor_config,
+            access_log_config,
+            organisation_cache_config,
+            # Each worker keeps its own metrics, the server port would
+            # answer a scrape from a random one of them
+            serve_metrics=workers == 1 and metrics_port is None,
+        )
+
+        worker_metrics_port = metrics_port
+        if worker is not None:
+            metrics.labels["worker"] = str(worker)
+            if metrics_port is not None:
+                worker_metrics_port = metrics_port + worker
+
+        runner, site = loop.run_until_complete(
+            server.start_server(
+                port, reuse_port=workers > 1, metrics_port=worker_metrics_port
+            )
+        )
+        loop.add_signal_handler(signal.SIGTERM, loop.stop)
+
+        # Only set up ngrok if auth token is provided
+        # ngrok_tunnel = None
+        # tunnel: Optional[ngrok.NgrokTunnel] = None
+        # if ngrok_auth_token:
+        #     ngrok_tunnel = NgrokSetup(ngrok_auth_token)
+        #     try:
+        #         tunnel = ngrok_tunnel.configure_ngrok(port, ngrok_subdomain)
+        #         logger.info(f"ngrok tunnel URL: {tunnel.public_url}")
+        #     except Exception as e:
+        #         logger.error(f"Error while setting up ngrok: {e}")
+        # else:
+        #     logger.info("Starting without ngrok...")
+
+        try:
+            loop.run_forever()
+
+        except KeyboardInterrupt:
+            print("CTRL+C Pressed. Shutting down gracefully...")
+            pass
+
+        finally:
+            loop.run_until_complete(server.stop_server(runner, site))
+            if producer is not None:
+                loop.run_until_complete(producer.stop())
+            loop.close()
+
+            # if ngrok_tunnel and "tunnel" in locals():
+            #     ngrok.disconnect(tunnel.public_url)
+            #     ngrok.kill()
+
+    if workers > 1:
+        if metrics_port is None:
+            logger.warning("Metrics are not served, set --metrics-port with --workers")
+        DBSetup(database_url, pool_config).create_tables()
+        WorkerSupervisor(workers, serve, logger).run()
+    else:
+        serve()
 
 
 if __name__ == "__main__":
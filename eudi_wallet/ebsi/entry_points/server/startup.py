@@ -1,13 +1,163 @@
+import asyncio
+import functools
+
+from eudi_wallet.ebsi.entry_points.server.utils import DiscoveryState
+from eudi_wallet.ebsi.repositories.threaded import ThreadedRepository
+from eudi_wallet.ebsi.repositories.v2.did_document import (
+    AsyncSqlAlchemyDIDDocumentRepository,
+    RepositoryDIDDocumentStore,
+    SqlAlchemyDIDDocumentRepository,
+)
+from eudi_wallet.ebsi.repositories.v2.webhook_delivery import (
+    AsyncSqlAlchemyWebhookDeliveryRepository,
+    SqlAlchemyWebhookDeliveryRepository,
+)
 from eudi_wallet.ebsi.services.domain.utils.discovery import (
     discover_credential_issuer_and_authn_server,
 )
+from eudi_wallet.ebsi.utils.discovery_cache import discovery_cache
+from eudi_wallet.ebsi.utils.httpx_client import (
+    HttpClientPool,
+    set_shared_http_client_pool,
+)
+from eudi_wallet.ebsi.utils.organisation_cache import (
+    OrganisationCacheConfig,
+    OrganisationCacheListener,
+    organisation_cache,
+)
+from eudi_wallet.ebsi.utils.signing import SigningExecutor, set_signing_executor
+from eudi_wallet.ebsi.utils.webhook import WebhookDispatcher, set_webhook_dispatcher
+from eudi_wallet.ebsi_did_resolver.cache import set_did_document_store
+
+
+# Seconds between discovery refreshes, and after a failed one
+DISCOVERY_REFRESH_INTERVAL = 60
+DISCOVERY_RETRY_INTERVAL = 5
+
+
+async def _refresh_discovery(app):
+    discovery: DiscoveryState = app["discovery"]
+    logger = app["logger"]
+    while True:
+        try:
+            # Served from the discovery cache, which revalidates in the
+            # background once the documents expire
+            (
+                discovery.credential_issuer_configuration,
+                discovery.auth_server_configuration,
+            ) = await discover_credential_issuer_and_authn_server(logger)
+            await discovery_cache.refresh_expiring(DISCOVERY_REFRESH_INTERVAL)
+            await asyncio.sleep(DISCOVERY_REFRESH_INTERVAL)
+        except Exception as e:
+            logger.error(f"Exception occurred during discovery: {e}")
+            await asyncio.sleep(DISCOVERY_RETRY_INTERVAL)
+
+
+async def discovery_ctx(app):
+    # Discovery runs in the background so that the server does not wait on
+    # the remote metadata to start
+    app["discovery"] = DiscoveryState()
+    task = asyncio.create_task(_refresh_discovery(app))
+
+    yield
+
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+async def http_client_pool_ctx(app):
+    pool = HttpClientPool(app.get("http_client_pool_config"))
+    # Also used by services that are constructed without an app context
+    set_shared_http_client_pool(pool)
+    app["http_client_pool"] = pool
+
+    yield
+
+    set_shared_http_client_pool(None)
+    await pool.aclose()
+
+
+async def signing_executor_ctx(app):
+    executor = SigningExecutor(app.get("signing_executor_config"))
+    set_signing_executor(executor)
+
+    yield
+
+    set_signing_executor(None)
+    # Waits for signing in progress without blocking the loop
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, executor.shutdown)
+
+
+def _threaded_repository(repository_cls, db_session, logger):
+    return ThreadedRepository(repository_cls(session=db_session, logger=logger))
+
+
+def _repository_factory(app, repository_cls, async_repository_cls):
+    """Factory for repositories used outside of a request"""
+    if app["async_db_session"] is not None:
+        return functools.partial(
+            async_repository_cls,
+            session=app["async_db_session"],
+            logger=app["logger"],
+        )
+    return functools.partial(
+        _threaded_repository, repository_cls, app["db_session"], app["logger"]
+    )
+
+
+async def webhook_dispatcher_ctx(app):
+    repository_factory = _repository_factory(
+        app,
+        SqlAlchemyWebhookDeliveryRepository,
+        AsyncSqlAlchemyWebhookDeliveryRepository,
+    )
+    dispatcher = WebhookDispatcher(
+        repository_factory, app["logger"], app.get("webhook_config")
+    )
+    await dispatcher.start()
+    set_webhook_dispatcher(dispatcher)
+    app["webhook_dispatcher"] = dispatcher
+
+    yield
+
+    set_webhook_dispatcher(None)
+    await dispatcher.stop()
+
+
+async def did_document_store_ctx(app):
+    set_did_document_store(
+        RepositoryDIDDocumentStore(
+            _repository_factory(
+                app,
+                SqlAlchemyDIDDocumentRepository,
+                AsyncSqlAlchemyDIDDocumentRepository,
+            )
+        )
+    )
+
+    yield
+
+    set_did_document_store(None)
+
+
+async def organisation_cache_ctx(app):
+    config: OrganisationCacheConfig = (
+        app.get("organisation_cache_config") or OrganisationCacheConfig()
+    )
+    organisation_cache.configure(config)
+    organisation_cache.logger = app["logger"]
 
+    listener = None
+    if config.notify and config.ttl > 0:
+        engine = app["db_session"].kw["bind"]
+        dsn = engine.url.set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+        listener = OrganisationCacheListener(organisation_cache, dsn, app["logger"])
+        await listener.start()
 
-async def app_startup(app):
-    (
-        credential_issuer_configuration,
-        auth_server_configuration,
-    ) = await discover_credential_issuer_and_authn_server()
+    yield
 
-    app["credential_issuer_configuration"] = credential_issuer_configuration
-    app["auth_server_configuration"] = auth_server_configuration
+    if listener is not None:
+        await listener.stop()
@@ -1,9 +1,22 @@
 import dataclasses
+import datetime
+import email.utils
+import hashlib
+import json
 import typing
 from logging import Logger
 
+from aiohttp import web
 from aiokafka import AIOKafkaProducer
 
+from eudi_wallet.ebsi.repositories.pagination import (
+    MAX_PAGE_LIMIT,
+    InvalidCursorError,
+    PageQuery,
+    decode_cursor,
+)
+
+from eudi_wallet.ebsi.utils.httpx_client import HttpClientPool
 from eudi_wallet.ebsi.value_objects.domain.discovery import (
     OpenIDAuthServerConfig,
     OpenIDCredentialIssuerConfig,
@@ -20,18 +33,33 @@ class AppContext:
     kafka_producer: typing.Optional[AIOKafkaProducer] = None
     kafka_topic: typing.Optional[str] = None
     db_session: typing.Optional[typing.Callable] = None
+    async_db_session: typing.Optional[typing.Callable] = None
     domain: typing.Optional[str] = None
+    http_client_pool: typing.Optional[HttpClientPool] = None
+
+
+@dataclasses.dataclass
+class DiscoveryState:
+    """Latest discovery documents, replaced in place when refreshed"""
+
+    credential_issuer_configuration: typing.Optional[
+        OpenIDCredentialIssuerConfig
+    ] = None
+    auth_server_configuration: typing.Optional[OpenIDAuthServerConfig] = None
 
 
 def get_app_context(app) -> AppContext:
+    discovery: DiscoveryState = app["discovery"]
     return AppContext(
-        credential_issuer_configuration=app["credential_issuer_configuration"],
-        auth_server_configuration=app["auth_server_configuration"],
+        credential_issuer_configuration=discovery.credential_issuer_configuration,
+        auth_server_configuration=discovery.auth_server_configuration,
         logger=app["logger"],
         kafka_producer=None,
         kafka_topic=None,
         db_session=app["db_session"],
+        async_db_session=app["async_db_session"],
         domain=app["domain"],
+        http_client_pool=app.get("http_client_pool"),
     )
 
 
@@ -43,3 +71,124 @@ def get_endpoint_url_by_name(app, endpoint_name):
         return endpoint_url
     else:
         return None
+
+
+def _get_timestamp_query_param(
+    request: web.Request, name: str
+) -> typing.Optional[datetime.datetime]:
+    value = request.query.get(name)
+    if value is None:
+        return None
+    try:
+        # Inverse of the conversion done by the models `to_dict`
+        return datetime.datetime.fromtimestamp(int(value))
+    except (ValueError, OverflowError, OSError):
+        raise web.HTTPBadRequest(reason=f"Invalid {name}")
+
+
+def get_page_query(request: web.Request) -> PageQuery:
+    page_query = PageQuery()
+    limit = request.query.get("limit")
+    if limit is not None:
+        if not limit.isdigit() or not 1 <= int(limit) <= MAX_PAGE_LIMIT:
+            raise web.HTTPBadRequest(
+                reason=f"Limit must be between 1 and {MAX_PAGE_LIMIT}"
+            )
+        page_query.limit = int(limit)
+
+    page_query.after = request.query.get("after")
+    if page_query.after is not None:
+        try:
+            decode_cursor(page_query.after)
+        except InvalidCursorError:
+            raise web.HTTPBadRequest(reason="Invalid cursor")
+
+    page_query.status = request.query.get("status")
+    page_query.created_after = _get_timestamp_query_param(request, "createdAfter")
+    page_query.created_before = _get_timestamp_query_param(request, "createdBefore")
+    return page_query
+
+
+def set_next_page_link(
+    response: web.Response, request: web.Request, next_cursor: typing.Optional[str]
+) -> web.Response:
+    if next_cursor is not None:
+        next_url = request.rel_url.update_query({"after": next_cursor})
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return response
+
+
+# Flush the NDJSON buffer to the client once it grows past this size
+NDJSON_FLUSH_BYTES = 64 * 1024
+
+
+async def stream_ndjson(
+    request: web.Request, records: typing.AsyncIterator[dict], filename: str
+) -> web.StreamResponse:
+    response = web.StreamResponse(
+        headers={
+            "Content-Type": "application/x-ndjson",
+            "Content-Disposition": f'attachment; filename="{filename}"',
+        }
+    )
+    response.enable_chunked_encoding()
+    await response.prepare(request)
+
+    buffer = bytearray()
+    async for record in records:
+        buffer += json.dumps(record).encode("utf-8") + b"\n"
+        if len(buffer) >= NDJSON_FLUSH_BYTES:
+            await response.write(bytes(buffer))
+            buffer.clear()
+    if buffer:
+        await response.write(bytes(buffer))
+
+    await response.write_eof()
+    return response
+
+
+def is_not_modified(
+    request: web.Request, etag: str, last_modified: typing.Optional[str] = None
+) -> bool:
+    """True when the client's copy matches, so a 304 can be returned"""
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        # If-Modified-Since is ignored when If-None-Match is present
+        # Weak comparison, as If-None-Match requires
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag.removeprefix("W/") in tags
+
+    if last_modified is not None and request.if_modified_since is not None:
+        modified = email.utils.parsedate_to_datetime(last_modified)
+        return modified <= request.if_modified_since
+    return False
+
+
+def cached_response(
+    request: web.Request,
+    body: typing.Union[str, bytes],
+    etag: str,
+    last_modified: typing.Optional[str] = None,
+    max_age: int = 0,
+    content_type: str = "text/plain",
+) -> web.Response:
+    """Response with validators, or 304 if the client's copy is current"""
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+    if last_modified is not None:
+        headers["Last-Modified"] = last_modified
+    if is_not_modified(request, etag, last_modified):
+        return web.Response(status=304, headers=headers)
+    if isinstance(body, bytes):
+        return web.Response(body=body, headers=headers, content_type=content_type)
+    return web.Response(text=body, headers=headers, content_type=content_type)
+
+
+def json_cached_response(
+    request: web.Request, document: typing.Any, max_age: int = 0
+) -> web.Response:
+    """JSON response with an ETag derived from its content"""
+    body = json.dumps(document)
+    etag = f'"{hashlib.sha256(body.encode()).hexdigest()[:32]}"'
+    return cached_response(
+        request, body, etag, max_age=max_age, content_type="application/json"
+    )
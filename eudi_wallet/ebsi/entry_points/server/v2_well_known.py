@@ -1,47 +1,74 @@
-from eudi_wallet.ebsi.repositories.organisation import SqlAlchemyOrganisationRepository
-from logging import Logger
+import dataclasses
+import hashlib
+import json
 import re
-from sqlalchemy.orm import Session
+from typing import Any, Callable
 from eudi_wallet.ebsi.exceptions.application.organisation import (
     LegalEntityNotFoundError,
 )
-from eudi_wallet.ebsi.repositories.v2.issue_credential_record import (
-    SqlAlchemyIssueCredentialRecordRepository,
-)
+from eudi_wallet.ebsi.utils.cache import LRUCache
+
+# Organisations whose static documents are kept rendered
+STATIC_DOCUMENT_CACHE_SIZE = 4096
+
+# (render function, wallet domain, organisation id) -> RenderedDocument
+_static_documents = LRUCache(maxsize=STATIC_DOCUMENT_CACHE_SIZE)
+
+
+@dataclasses.dataclass(frozen=True)
+class RenderedDocument:
+    body: bytes
+    etag: str
+
+
+def render_static_document(
+    render: Callable[..., dict], wallet_domain: str, organisation_id: str
+) -> RenderedDocument:
+    """Serialise a document that only depends on the domain and organisation.
+
+    The result never changes while the server runs, so it is rendered once
+    and served as is, with a strong ETag over its bytes.
+    """
+    key = (render.__name__, wallet_domain, organisation_id)
+    document = _static_documents.get(key)
+    if document is None:
+        body = json.dumps(
+            render(wallet_domain, organisation_id=organisation_id)
+        ).encode("utf-8")
+        document = RenderedDocument(
+            body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        )
+        _static_documents.set(key, document)
+    return document
 
 
-def service_get_well_known_openid_credential_issuer_config(
+async def service_get_well_known_openid_credential_issuer_config(
     wallet_domain: str,
     organisation_id: str,
-    logger: Logger,
-    session: Session,
-    legal_entity_repository: SqlAlchemyOrganisationRepository,
+    legal_entity_repository: Any,
+    issue_credential_repository: Any,
 ):
     # For additional fields like logo, background color, text color e.t.c
     # Check https://openid.net/specs/openid-4-verifiable-credential-issuance-1_0.html#name-credential-issuer-metadata
 
-    issue_credential_repository = SqlAlchemyIssueCredentialRecordRepository(
-        session=session, logger=logger
-    )
-
     assert issue_credential_repository is not None
 
-    with issue_credential_repository as credential_repo:
-        credential_offers = (
-            credential_repo.get_all_by_organisation_id_and_with_credential(
+    async with issue_credential_repository as credential_repo:
+        credentials_supported_entries = (
+            await credential_repo.get_credentials_supported_by_organisation_id(
                 organisation_id=organisation_id
             )
         )
 
-    with legal_entity_repository as repo:
-        legal_entity = repo.get_by_id(id=organisation_id)
+    async with legal_entity_repository as repo:
+        legal_entity = await repo.get_by_id(id=organisation_id)
 
         if legal_entity is None:
             raise LegalEntityNotFoundError(
                 f"Legal entity with id {organisation_id} not found"
             )
-        credentials_supported = create_credential_supported_from_credential_offers(
-            credential_offers=credential_offers
+        credentials_supported = create_credential_supported_from_catalogue(
+            credentials_supported_entries
         )
 
         openid_credential_issuer_config = {
@@ -147,73 +174,44 @@ def split_camel_case_and_concatenate_by_space(s):
         return s
 
 
-def create_credential_supported_from_credential_offers(credential_offers: list) -> dict:
-    credentials_supported = {}
-    for credential_offer in credential_offers:
-        credential_types = credential_offer.credential.get("type", [])
-        if credential_types:
-            # credential = validate_credential_type_based_on_disclosure_mapping(
-            #     credential=credential_offer.credential,
-            #     disclosure_mapping=credential_offer.disclosureMapping,
-            # )
-            credential_types = credential_offer.credential.get("type", [])
-
-            if credential_offer.disclosureMapping:
-                format = "vc+sd-jwt"
-            else:
-                format = "jwt_vc"
-            credential_supported = {
-                "format": format,
-                "scope": credential_types[-1],
-                "cryptographic_binding_methods_supported": ["jwk"],
-                "cryptographic_suites_supported": ["ES256"],
-                "display": [
-                    {
-                        "name": credential_types[-1],
-                        "locale": "en-GB",
-                        "background_color": "#12107c",
-                        "text_color": "#FFFFFF",
-                    }
-                ],
-            }
-
-            credentials_supported[credential_types[-1]] = credential_supported
-
-    return credentials_supported
-
-
-def service_get_well_known_openid_credential_issuer_config_v2(
+def create_credential_supported_from_catalogue(
+    credentials_supported_entries: list,
+) -> dict:
+    # Entries are ordered by when a record was last added, so the latest
+    # format wins for a credential type offered in more than one format
+    return {
+        entry.scope: entry.to_credential_supported()
+        for entry in credentials_supported_entries
+    }
+
+
+async def service_get_well_known_openid_credential_issuer_config_v2(
     wallet_domain: str,
     organisation_id: str,
-    logger: Logger,
-    session: Session,
-    legal_entity_repository: SqlAlchemyOrganisationRepository,
+    legal_entity_repository: Any,
+    issue_credential_repository: Any,
 ):
     # For additional fields like logo, background color, text color e.t.c
     # Check https://openid.net/specs/openid-4-verifiable-credential-issuance-1_0.html#name-credential-issuer-metadata
 
-    issue_credential_repository = SqlAlchemyIssueCredentialRecordRepository(
-        session=session, logger=logger
-    )
-
     assert issue_credential_repository is not None
 
-    with issue_credential_repository as credential_repo:
-        credential_offers = (
-            credential_repo.get_all_by_organisation_id_and_with_credential(
+    async with issue_credential_repository as credential_repo:
+        credentials_supported_entries = (
+            await credential_repo.get_credentials_supported_by_organisation_id(
                 organisation_id=organisation_id
             )
         )
 
-    with legal_entity_repository as repo:
-        legal_entity = repo.get_by_id(id=organisation_id)
+    async with legal_entity_repository as repo:
+        legal_entity = await repo.get_by_id(id=organisation_id)
 
         if legal_entity is None:
             raise LegalEntityNotFoundError(
                 f"Legal entity with id {organisation_id} not found"
             )
-        credentials_supported = create_credential_supported_from_credential_offers(
-            credential_offers=credential_offers
+        credentials_supported = create_credential_supported_from_catalogue(
+            credentials_supported_entries
         )
 
         openid_credential_issuer_config = {
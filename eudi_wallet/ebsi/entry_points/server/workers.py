@@ -0,0 +1,116 @@
+import logging
+import multiprocessing
+import os
+import signal
+import time
+import typing
+
+# Seconds a worker must run for its exit to count as a crash after startup
+MIN_UPTIME = 5.0
+# Upper bound in seconds on the delay before restarting a crashing worker
+MAX_RESTART_DELAY = 30.0
+# Seconds between checks on the worker processes
+SUPERVISOR_INTERVAL = 0.5
+
+
+class WorkerSupervisor:
+    """Runs the server in a number of forked worker processes.
+
+    Every worker binds its own listening socket with SO_REUSEPORT and the
+    kernel spreads connections between them. Workers that exit are
+    restarted, with an increasing delay if they keep exiting right after
+    startup. On SIGTERM or SIGINT workers are stopped one at a time, so
+    the others keep accepting connections while each one drains. The target
+    is called with the worker index, which a restarted worker keeps.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        target: typing.Callable[[int], None],
+        logger: logging.Logger,
+        # Longer than a worker takes to drain its connections
+        shutdown_timeout: float = 90.0,
+    ):
+        self.workers = workers
+        self.target = target
+        self.logger = logger
+        self.shutdown_timeout = shutdown_timeout
+        self.context = multiprocessing.get_context("fork")
+        self.processes: typing.Dict[int, multiprocessing.process.BaseProcess] = {}
+        self.started_at: typing.Dict[int, float] = {}
+        self.restart_delays: typing.Dict[int, float] = {}
+        self.restart_at: typing.Dict[int, float] = {}
+        self.stopping = False
+
+    def _run_worker(self, index: int) -> None:
+        # The supervisor decides when workers stop
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        self.target(index)
+
+    def _spawn(self, index: int) -> None:
+        process = self.context.Process(
+            target=self._run_worker, args=(index,), name=f"worker-{index}"
+        )
+        process.start()
+        self.processes[index] = process
+        self.started_at[index] = time.monotonic()
+        self.logger.info(f"Started worker {index} with pid {process.pid}")
+
+    def _stop(self, signum, frame) -> None:
+        self.stopping = True
+
+    def _check_workers(self) -> None:
+        now = time.monotonic()
+        for index, process in list(self.processes.items()):
+            if process.is_alive():
+                continue
+
+            if index not in self.restart_at:
+                uptime = now - self.started_at[index]
+                if uptime < MIN_UPTIME:
+                    delay = min(
+                        self.restart_delays.get(index, 0.5) * 2, MAX_RESTART_DELAY
+                    )
+                    self.restart_delays[index] = delay
+                else:
+                    # A worker that ran for a while starts its backoff over
+                    delay = 0.0
+                    self.restart_delays.pop(index, None)
+                self.restart_at[index] = now + delay
+                self.logger.error(
+                    f"Worker {index} with pid {process.pid} exited with code {process.exitcode}, restarting in {delay:.1f}s"
+                )
+
+            if now >= self.restart_at[index]:
+                del self.restart_at[index]
+                self._spawn(index)
+
+    def _shutdown(self) -> None:
+        for index, process in sorted(self.processes.items()):
+            if not process.is_alive():
+                continue
+            self.logger.info(f"Stopping worker {index} with pid {process.pid}")
+            process.terminate()
+            process.join(self.shutdown_timeout)
+            if process.is_alive():
+                self.logger.error(
+                    f"Worker {index} did not stop in {self.shutdown_timeout}s, killing it"
+                )
+                process.kill()
+                process.join()
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        self.logger.info(f"Supervisor {os.getpid()} starting {self.workers} workers")
+        for index in range(self.workers):
+            self._spawn(index)
+
+        while not self.stopping:
+            self._check_workers()
+            time.sleep(SUPERVISOR_INTERVAL)
+
+        self._shutdown()
@@ -19,3 +19,12 @@ def import_models():
         IssueCredentialRecordModel,
     )  # noqa: F401
     from eudi_wallet.ebsi.models.v2.verification_record import VerificationRecordModel  # noqa: F401
+    from eudi_wallet.ebsi.models.v2.webhook_delivery import (  # noqa: F401
+        WebhookDeliveryModel,
+    )
+    from eudi_wallet.ebsi.models.v2.did_document import (  # noqa: F401
+        DIDDocumentModel,
+    )
+    from eudi_wallet.ebsi.models.v2.credential_supported import (  # noqa: F401
+        CredentialSupportedModel,
+    )
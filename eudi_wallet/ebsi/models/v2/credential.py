@@ -1,7 +1,7 @@
 import datetime
 import uuid
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.dialects.postgresql import JSON, UUID
 from sqlalchemy.orm import relationship
 
@@ -44,6 +44,11 @@ class CredentialModel(Base):
         DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow
     )
 
+    # Keyset pagination of the credential list, newest first
+    __table_args__ = (
+        Index("ix_credential_organisationId_createdAt", organisationId, createdAt, id),
+    )
+
     def to_dict(self):
         result = {c.name: getattr(self, c.name) for c in self.__table__.columns}
 
@@ -0,0 +1,56 @@
+import datetime
+import typing
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+
+from eudi_wallet.ebsi.models.base import Base
+
+
+class CredentialSupportedModel(Base):
+    """Credential types offered by an organisation's issuer metadata.
+
+    Maintained alongside the issue credential records without a data
+    agreement, with the number of records per type and format.
+    """
+
+    __tablename__ = "credential_supported"
+
+    organisationId = Column(
+        UUID(as_uuid=True),
+        ForeignKey("organisation.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    # Last entry of the credential type
+    scope = Column(String, primary_key=True)
+    format = Column(String, primary_key=True)
+    recordCount = Column(Integer, nullable=False, default=0)
+    createdAt = Column(DateTime, default=datetime.datetime.utcnow)
+    # Set when a record is added, the latest format of a type is offered
+    updatedAt = Column(DateTime, default=datetime.datetime.utcnow)
+
+    def to_credential_supported(self) -> dict:
+        return {
+            "format": self.format,
+            "scope": self.scope,
+            "cryptographic_binding_methods_supported": ["jwk"],
+            "cryptographic_suites_supported": ["ES256"],
+            "display": [
+                {
+                    "name": self.scope,
+                    "locale": "en-GB",
+                    "background_color": "#12107c",
+                    "text_color": "#FFFFFF",
+                }
+            ],
+        }
+
+
+def get_credential_supported_key(
+    credential: typing.Optional[dict], disclosure_mapping: typing.Optional[dict]
+) -> typing.Optional[typing.Tuple[str, str]]:
+    """Scope and format a record contributes to credentials_supported"""
+    credential_types = (credential or {}).get("type", [])
+    if not credential_types:
+        return None
+    return credential_types[-1], "vc+sd-jwt" if disclosure_mapping else "jwt_vc"
@@ -1,7 +1,7 @@
 import datetime
 import uuid
 
-from sqlalchemy import Column, DateTime, ForeignKey, String, Boolean
+from sqlalchemy import Column, DateTime, ForeignKey, Index, String, Boolean
 from sqlalchemy.dialects.postgresql import JSON, UUID
 from sqlalchemy.orm import relationship
 
@@ -57,6 +57,10 @@ class V2DataAgreementModel(Base):
         DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow
     )
 
+    __table_args__ = (
+        Index("ix_v2_data_agreement_organisationId_purpose", organisationId, purpose),
+    )
+
     def to_dict(self):
         result = {c.name: getattr(self, c.name) for c in self.__table__.columns}
 
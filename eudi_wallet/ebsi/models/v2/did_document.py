@@ -0,0 +1,21 @@
+import datetime
+
+from sqlalchemy import Column, DateTime, Text
+from sqlalchemy.dialects.postgresql import JSON
+
+from eudi_wallet.ebsi.models.base import Base
+
+
+class DIDDocumentModel(Base):
+    """DID resolution results persisted by the resolver cache"""
+
+    __tablename__ = "did_document"
+
+    # Registry URL and DID
+    key = Column(Text, primary_key=True, nullable=False)
+    result = Column(JSON, nullable=False)
+    expiresAt = Column(DateTime, nullable=False)
+    createdAt = Column(DateTime, default=datetime.datetime.utcnow)
+    updatedAt = Column(
+        DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow
+    )
@@ -1,7 +1,7 @@
 import datetime
 import uuid
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.dialects.postgresql import JSON, UUID
 from sqlalchemy.orm import relationship
 
@@ -71,6 +71,44 @@ class IssueCredentialRecordModel(Base):
         DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow
     )
 
+    # Token lookups in the issuance flow, values are generated uuids
+    __table_args__ = (
+        Index(
+            "ix_issue_credential_record_authorisationCode",
+            authorisationCode,
+            unique=True,
+            postgresql_where=authorisationCode.isnot(None),
+        ),
+        Index(
+            "ix_issue_credential_record_acceptanceToken",
+            acceptanceToken,
+            unique=True,
+            postgresql_where=acceptanceToken.isnot(None),
+        ),
+        Index(
+            "ix_issue_credential_record_idTokenRequestState",
+            idTokenRequestState,
+            unique=True,
+            postgresql_where=idTokenRequestState.isnot(None),
+        ),
+        Index(
+            "ix_issue_credential_record_clientId",
+            clientId,
+            postgresql_where=clientId.isnot(None),
+        ),
+        Index(
+            "ix_issue_credential_record_organisationId_createdAt",
+            organisationId,
+            createdAt,
+            id,
+        ),
+        Index(
+            "ix_issue_credential_record_dataAgreementId",
+            dataAgreementId,
+            postgresql_where=dataAgreementId.isnot(None),
+        ),
+    )
+
     def to_dict(self):
         result = {c.name: getattr(self, c.name) for c in self.__table__.columns}
 
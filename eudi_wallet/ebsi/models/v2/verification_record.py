@@ -1,7 +1,7 @@
 import datetime
 import uuid
 
-from sqlalchemy import Column, DateTime, ForeignKey, String, Boolean
+from sqlalchemy import Column, DateTime, ForeignKey, Index, String, Boolean
 from sqlalchemy.dialects.postgresql import JSON, UUID
 
 from eudi_wallet.ebsi.models.base import Base
@@ -36,6 +36,21 @@ class VerificationRecordModel(Base):
         DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow
     )
 
+    __table_args__ = (
+        Index(
+            "ix_verification_record_vp_token_request_state",
+            vp_token_request_state,
+            unique=True,
+            postgresql_where=vp_token_request_state.isnot(None),
+        ),
+        Index(
+            "ix_verification_record_organisationId_createdAt",
+            organisationId,
+            createdAt,
+            id,
+        ),
+    )
+
     def to_dict(self):
         result = {c.name: getattr(self, c.name) for c in self.__table__.columns}
 
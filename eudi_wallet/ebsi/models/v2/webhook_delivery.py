@@ -0,0 +1,55 @@
+import datetime
+import uuid
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import JSON, UUID
+
+from eudi_wallet.ebsi.models.base import Base
+
+
+class WebhookDeliveryModel(Base):
+    __tablename__ = "webhook_delivery"
+
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+        unique=True,
+        nullable=False,
+    )
+
+    webhookUrl = Column(Text, nullable=False)
+    topic = Column(String, nullable=False)
+    payload = Column(JSON, nullable=True)
+    status = Column(String, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    nextAttemptAt = Column(DateTime, nullable=False, default=datetime.datetime.utcnow)
+    lastError = Column(Text, nullable=True)
+    deliveredAt = Column(DateTime, nullable=True)
+    createdAt = Column(DateTime, default=datetime.datetime.utcnow)
+    updatedAt = Column(
+        DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_webhook_delivery_pending_nextAttemptAt",
+            nextAttemptAt,
+            postgresql_where=status == "pending",
+        ),
+    )
+
+    def to_dict(self):
+        result = {c.name: getattr(self, c.name) for c in self.__table__.columns}
+
+        # Convert datetime objects to seconds since epoch (Unix timestamp)
+        for attr in ["nextAttemptAt", "deliveredAt", "createdAt", "updatedAt"]:
+            if attr in result and isinstance(result[attr], datetime.datetime):
+                result[attr] = int(result[attr].timestamp())
+
+        # Convert UUID to string
+        for attr in ["id"]:
+            if attr in result and isinstance(result[attr], uuid.UUID):
+                result[attr] = str(result[attr])
+
+        return result
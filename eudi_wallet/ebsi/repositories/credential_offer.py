@@ -59,6 +59,19 @@ class SqlAlchemyCredentialOfferRepository:
             .all()
         )
 
+    def get_all_by_ids_and_credential_schema_id(
+        self, ids: List[str], data_agreement_id: str
+    ) -> List[CredentialOfferModel]:
+        assert self.session is not None
+        return (
+            self.session.query(CredentialOfferModel)
+            .filter(
+                CredentialOfferModel.id.in_(ids),
+                CredentialOfferModel.data_agreement_id == data_agreement_id,
+            )
+            .all()
+        )
+
     def get_by_id(self, id: str) -> Union[CredentialOfferModel, None]:
         assert self.session is not None
         assert self.logger is not None
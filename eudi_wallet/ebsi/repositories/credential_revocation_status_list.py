@@ -1,18 +1,25 @@
+import datetime
 from logging import Logger
-from typing import Callable, Optional, Union
+from typing import Callable, Dict, List, Optional, Tuple, Union
 import uuid
 
 from sqlalchemy import exc
 from sqlalchemy.orm import Session
 
+from eudi_wallet.ebsi.models.credential_offer import CredentialOfferModel
 from eudi_wallet.ebsi.models.credential_revocation_status_list import (
     CredentialRevocationStatusListModel,
 )
 from eudi_wallet.ebsi.services.domain.utils.credential import (
     CredentialStatus,
+    decode_bitstring,
     generate_w3c_vc_statuslist_encoded_bitstring,
+    revoke_credentials_create_encoded_bitstring,
 )
 
+# Highest index in a 16KB status list
+MAX_STATUS_LIST_INDEX = 131071
+
 
 class SqlAlchemyCredentialRevocationStatusListRepository:
     def __init__(self, session: Optional[Callable], logger: Optional[Logger]):
@@ -64,7 +71,10 @@ class SqlAlchemyCredentialRevocationStatusListRepository:
         revocation_list: CredentialRevocationStatusListModel = (
             self.session.query(CredentialRevocationStatusListModel)
             .order_by(CredentialRevocationStatusListModel.created_at.desc())
-            .filter(CredentialRevocationStatusListModel.last_assigned_index < 131071)
+            .filter(
+                CredentialRevocationStatusListModel.last_assigned_index
+                < MAX_STATUS_LIST_INDEX
+            )
             .with_for_update()
             .first()
         )
@@ -92,6 +102,49 @@ class SqlAlchemyCredentialRevocationStatusListRepository:
 
         return revocation_list
 
+    def reserve_revocation_index_block(self, size: int) -> Tuple[str, int, int]:
+        """Reserve up to `size` consecutive indexes in the newest open list.
+
+        Returns the list id and the first and last reserved index. The row
+        lock is held only for the single update, callers hand the indexes
+        out from memory.
+        """
+        assert self.session is not None
+        assert self.logger is not None
+        revocation_list: Optional[CredentialRevocationStatusListModel] = (
+            self.session.query(CredentialRevocationStatusListModel)
+            .order_by(CredentialRevocationStatusListModel.created_at.desc())
+            .filter(
+                CredentialRevocationStatusListModel.last_assigned_index
+                < MAX_STATUS_LIST_INDEX
+            )
+            .with_for_update()
+            .first()
+        )
+        if revocation_list:
+            first_index = revocation_list.last_assigned_index + 1
+            last_index = min(first_index + size - 1, MAX_STATUS_LIST_INDEX)
+            revocation_list.last_assigned_index = last_index  # type: ignore
+        else:
+            self.logger.debug(
+                f"No credential revocation status list found with last assigned index < {MAX_STATUS_LIST_INDEX}; Creating new list"
+            )
+            first_index = 0
+            last_index = min(size - 1, MAX_STATUS_LIST_INDEX)
+            revocation_list = CredentialRevocationStatusListModel(
+                id=str(uuid.uuid4()),
+                encoded_status_list=generate_w3c_vc_statuslist_encoded_bitstring(
+                    credential_statuses=[]
+                ),
+                last_assigned_index=last_index,
+            )
+            self.session.add(revocation_list)
+
+        revocation_list_id = str(revocation_list.id)
+        self.session.commit()
+
+        return revocation_list_id, first_index, last_index
+
     def get_by_id(self, id: str) -> Union[CredentialRevocationStatusListModel, None]:
         assert self.session is not None
         assert self.logger is not None
@@ -107,6 +160,15 @@ class SqlAlchemyCredentialRevocationStatusListRepository:
             )
             return None
 
+    def get_updated_at_by_id(self, id: str) -> Optional[datetime.datetime]:
+        """Version of a status list, without loading the encoded list"""
+        assert self.session is not None
+        return (
+            self.session.query(CredentialRevocationStatusListModel.updated_at)
+            .filter(CredentialRevocationStatusListModel.id == id)
+            .scalar()
+        )
+
     def update(
         self, id: str, **kwargs
     ) -> Union[CredentialRevocationStatusListModel, None]:
@@ -131,3 +193,66 @@ class SqlAlchemyCredentialRevocationStatusListRepository:
                 f"No credential revocation status list found with id {id}"
             )
             return None
+
+    def update_encoded_status_list(
+        self,
+        id: str,
+        encode: Callable[[CredentialRevocationStatusListModel], str],
+    ) -> Union[CredentialRevocationStatusListModel, None]:
+        """Re-encode a status list while holding its row lock.
+
+        `encode` receives the current row, so changes committed by another
+        process since it was last read are not overwritten.
+        """
+        assert self.session is not None
+        assert self.logger is not None
+        credential_revocation_status_list_entity = (
+            self.session.query(CredentialRevocationStatusListModel)
+            .filter(CredentialRevocationStatusListModel.id == id)
+            .with_for_update()
+            .one_or_none()
+        )
+        if credential_revocation_status_list_entity is None:
+            self.logger.debug(
+                f"No credential revocation status list found with id {id}"
+            )
+            return None
+
+        credential_revocation_status_list_entity.encoded_status_list = encode(
+            credential_revocation_status_list_entity
+        )
+        self.session.commit()
+        self.session.refresh(credential_revocation_status_list_entity)
+        return credential_revocation_status_list_entity
+
+    def update_revocation_statuses(
+        self,
+        credential_offer_ids: List[str],
+        credential_statuses_by_status_list_id: Dict[str, List[CredentialStatus]],
+        is_revoked: bool,
+    ) -> None:
+        """Update credential offers and their status lists in one transaction"""
+        assert self.session is not None
+        self.session.query(CredentialOfferModel).filter(
+            CredentialOfferModel.id.in_(credential_offer_ids)
+        ).update({"is_revoked": is_revoked}, synchronize_session=False)
+
+        # Lists are locked in a fixed order so that concurrent bulk updates
+        # do not deadlock
+        for status_list_id in sorted(credential_statuses_by_status_list_id):
+            credential_revocation_status_list_entity = (
+                self.session.query(CredentialRevocationStatusListModel)
+                .filter(CredentialRevocationStatusListModel.id == status_list_id)
+                .with_for_update()
+                .one()
+            )
+            credential_revocation_status_list_entity.encoded_status_list = (
+                revoke_credentials_create_encoded_bitstring(
+                    decode_bitstring(
+                        credential_revocation_status_list_entity.encoded_status_list
+                    ),
+                    credential_statuses_by_status_list_id[status_list_id],
+                )
+            )
+
+        self.session.commit()
@@ -2,7 +2,8 @@ from logging import Logger
 from typing import Callable, Optional, Union
 import uuid
 
-from sqlalchemy import exc
+from sqlalchemy import exc, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from eudi_wallet.ebsi.models.organisation import OrganisationModel
@@ -99,3 +100,92 @@ class SqlAlchemyOrganisationRepository:
         except exc.NoResultFound:
             self.logger.debug(f"No legal entity found with id {id}")
             return None
+
+
+class AsyncSqlAlchemyOrganisationRepository:
+    def __init__(self, session: Optional[Callable], logger: Optional[Logger]):
+        self.session_factory = session
+        self.logger = logger
+        self.session: Optional[AsyncSession] = None
+
+    async def __aenter__(self):
+        assert self.session_factory is not None
+        self.session = self.session_factory()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        assert self.session is not None
+        assert self.logger is not None
+        if exc_tb is not None:
+            await self.session.rollback()
+            await self.session.close()
+            self.session = None
+            self.logger.error(f"Exception occurred: {exc_type}, {exc_val}")
+            return False
+
+        await self.session.close()
+        self.session = None
+        return True
+
+    async def get_first(self) -> Union[OrganisationModel, None]:
+        assert self.session is not None
+        result = await self.session.execute(select(OrganisationModel).limit(1))
+        return result.scalars().first()
+
+    async def update(self, id: str, **kwargs) -> Union[OrganisationModel, None]:
+        assert self.session is not None
+        assert self.logger is not None
+        try:
+            result = await self.session.execute(
+                select(OrganisationModel).where(OrganisationModel.id == id)
+            )
+            legal_entity: OrganisationModel = result.scalar_one()
+
+            for attribute, value in kwargs.items():
+                if value is not None:
+                    setattr(legal_entity, attribute, value)
+
+            await self.session.commit()
+            await self.session.refresh(legal_entity)
+            return legal_entity
+        except exc.NoResultFound:
+            self.logger.debug(f"No legal entity found with id {id}")
+            return None
+
+    async def delete(self, id: str) -> bool:
+        assert self.session is not None
+        assert self.logger is not None
+        try:
+            result = await self.session.execute(
+                select(OrganisationModel).where(OrganisationModel.id == id)
+            )
+            legal_entity = result.scalar_one()
+            # Cascades to the data agreements are loaded by the async session
+            await self.session.delete(legal_entity)
+            await self.session.commit()
+            self.logger.debug(f"Legal entity with id {id} has been deleted.")
+            return True
+        except exc.NoResultFound:
+            self.logger.debug(f"No legal entity found with id {id}")
+            return False
+
+    async def create(self, **kwargs) -> OrganisationModel:
+        assert self.session is not None
+        id = str(uuid.uuid4())
+        legal_entity = OrganisationModel(id=id, **kwargs)
+        self.session.add(legal_entity)
+        await self.session.commit()
+        await self.session.refresh(legal_entity)
+        return legal_entity
+
+    async def get_by_id(self, id: str) -> Union[OrganisationModel, None]:
+        assert self.session is not None
+        assert self.logger is not None
+        try:
+            result = await self.session.execute(
+                select(OrganisationModel).where(OrganisationModel.id == id)
+            )
+            return result.scalar_one()
+        except exc.NoResultFound:
+            self.logger.debug(f"No legal entity found with id {id}")
+            return None
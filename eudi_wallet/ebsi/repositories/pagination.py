@@ -0,0 +1,97 @@
+import base64
+import dataclasses
+import datetime
+import typing
+import uuid
+
+from sqlalchemy import Select, tuple_
+
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 500
+# Rows fetched per round trip from the server side cursor when exporting
+EXPORT_BATCH_SIZE = 500
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+@dataclasses.dataclass
+class PageQuery:
+    limit: int = DEFAULT_PAGE_LIMIT
+    after: typing.Optional[str] = None
+    status: typing.Optional[str] = None
+    created_after: typing.Optional[datetime.datetime] = None
+    created_before: typing.Optional[datetime.datetime] = None
+
+
+@dataclasses.dataclass
+class Page:
+    items: list
+    next_cursor: typing.Optional[str] = None
+
+
+def encode_cursor(created_at: datetime.datetime, id: uuid.UUID) -> str:
+    raw = f"{created_at.isoformat()}|{id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("utf-8").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> typing.Tuple[datetime.datetime, uuid.UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = base64.urlsafe_b64decode(padded).decode("utf-8").split("|")
+        return datetime.datetime.fromisoformat(created_at), uuid.UUID(id)
+    except ValueError as e:
+        raise InvalidCursorError(f"Invalid cursor {cursor}") from e
+
+
+def filter_page_query(
+    stmt: Select, model: typing.Any, page_query: PageQuery, status_column: typing.Any
+) -> Select:
+    if page_query.status is not None:
+        stmt = stmt.where(status_column == page_query.status)
+    if page_query.created_after is not None:
+        stmt = stmt.where(model.createdAt >= page_query.created_after)
+    if page_query.created_before is not None:
+        stmt = stmt.where(model.createdAt < page_query.created_before)
+    return stmt
+
+
+def paginate(
+    stmt: Select, model: typing.Any, page_query: PageQuery, status_column: typing.Any
+) -> Select:
+    """Apply filters and keyset pagination, newest first.
+
+    Selects one row more than the page size so that `to_page` can tell
+    whether a next page exists without a count query.
+    """
+    stmt = filter_page_query(stmt, model, page_query, status_column)
+    if page_query.after is not None:
+        stmt = stmt.where(
+            tuple_(model.createdAt, model.id) < decode_cursor(page_query.after)
+        )
+    return stmt.order_by(model.createdAt.desc(), model.id.desc()).limit(
+        page_query.limit + 1
+    )
+
+
+def to_page(rows: typing.Sequence, page_query: PageQuery) -> Page:
+    items = list(rows[: page_query.limit])
+    next_cursor = None
+    if len(rows) > page_query.limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last.createdAt, last.id)
+    return Page(items=items, next_cursor=next_cursor)
+
+
+def export_query(
+    stmt: Select, model: typing.Any, page_query: PageQuery, status_column: typing.Any
+) -> Select:
+    """Apply filters, oldest first, streamed from a server side cursor.
+
+    Only the filters of the page query are used, the export is not paged.
+    """
+    stmt = filter_page_query(stmt, model, page_query, status_column)
+    return stmt.order_by(model.createdAt, model.id).execution_options(
+        yield_per=EXPORT_BATCH_SIZE
+    )
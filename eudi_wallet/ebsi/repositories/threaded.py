@@ -0,0 +1,75 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import itertools
+from typing import Any, AsyncIterator, Iterator
+
+# Items pulled from a sync generator per executor round trip
+STREAM_BATCH_SIZE = 500
+
+
+class ThreadedRepository:
+    """Expose a synchronous repository through the async repository interface.
+
+    Used when the server runs on the blocking psycopg2 driver, so that v2
+    usecases and services can `async with` and `await` every repository
+    regardless of the driver. Each call is run in the default executor to
+    keep database I/O off the event loop, in the caller's context so that
+    per request state such as query metrics follows it.
+    """
+
+    def __init__(self, repository: Any):
+        self.repository = repository
+
+    async def __aenter__(self):
+        # Creating the session does not touch the database
+        self.repository.__enter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            contextvars.copy_context().run,
+            self.repository.__exit__,
+            exc_type,
+            exc_val,
+            exc_tb,
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self.repository, name)
+        if not callable(attribute):
+            return attribute
+
+        if inspect.isgeneratorfunction(attribute):
+
+            def stream(*args, **kwargs):
+                return self._iterate(attribute(*args, **kwargs))
+
+            return stream
+
+        async def call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None,
+                contextvars.copy_context().run,
+                functools.partial(attribute, *args, **kwargs),
+            )
+
+        return call
+
+    async def _iterate(self, iterator: Iterator) -> AsyncIterator:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await loop.run_in_executor(
+                None,
+                contextvars.copy_context().run,
+                list,
+                itertools.islice(iterator, STREAM_BATCH_SIZE),
+            )
+            if not batch:
+                return
+            for item in batch:
+                yield item
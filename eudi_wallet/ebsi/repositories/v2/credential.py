@@ -1,13 +1,21 @@
 import uuid
 from logging import Logger
-from typing import Callable, List, Optional, Union
+from typing import AsyncIterator, Callable, Iterator, List, Optional, Union
 
-from sqlalchemy import exc
+from sqlalchemy import exc, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from eudi_wallet.ebsi.models.v2.credential import (
     CredentialModel,
 )
+from eudi_wallet.ebsi.repositories.pagination import (
+    Page,
+    PageQuery,
+    export_query,
+    paginate,
+    to_page,
+)
 
 
 class SqlAlchemyCredentialRepository:
@@ -162,3 +170,218 @@ class SqlAlchemyCredentialRepository:
         except exc.NoResultFound:
             self.logger.debug(f"No credential found with id {id}")
             return False
+
+    def get_page_by_organisation_id(
+        self,
+        organisation_id: str,
+        page_query: PageQuery,
+    ) -> Page:
+        assert self.session is not None
+        stmt = select(CredentialModel).where(
+            CredentialModel.organisationId == organisation_id
+        )
+        result = self.session.execute(
+            paginate(
+                stmt, CredentialModel, page_query, CredentialModel.credentialStatus
+            )
+        )
+        return to_page(result.scalars().all(), page_query)
+
+    def stream_by_organisation_id(
+        self, organisation_id: str, page_query: PageQuery
+    ) -> Iterator[CredentialModel]:
+        assert self.session is not None
+        stmt = select(CredentialModel).where(
+            CredentialModel.organisationId == organisation_id
+        )
+        result = self.session.execute(
+            export_query(
+                stmt, CredentialModel, page_query, CredentialModel.credentialStatus
+            )
+        )
+        yield from result.scalars()
+
+
+class AsyncSqlAlchemyCredentialRepository:
+    def __init__(self, session: Optional[Callable], logger: Optional[Logger]):
+        self.session_factory = session
+        self.logger = logger
+        self.session: Optional[AsyncSession] = None
+
+    async def __aenter__(self):
+        assert self.session_factory is not None
+        self.session = self.session_factory()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        assert self.logger is not None, "Logger not available"
+        assert self.session is not None, "DB session not available"
+        if exc_tb is not None:
+            await self.session.rollback()
+            await self.session.close()
+            self.session = None
+            self.logger.error(f"Exception occurred: {exc_type}, {exc_val}")
+            return False
+
+        await self.session.close()
+        self.session = None
+        return True
+
+    async def create(
+        self,
+        credential_exchange_id: str,
+        organisation_id: str,
+        status: str,
+        acceptance_token: Optional[str] = None,
+        credential_token: Optional[bool] = False,
+        credential_token_decoded: Optional[dict] = None,
+        deferred_endpoint: Optional[str] = None,
+        **kwargs,
+    ) -> CredentialModel:
+        assert self.session is not None
+        id = str(uuid.uuid4())
+        credential = CredentialModel(
+            id=id,
+            organisationId=organisation_id,
+            credentialExchangeId=credential_exchange_id,
+            credentialToken=credential_token,
+            credential=credential_token_decoded,
+            credentialStatus=status,
+            acceptanceToken=acceptance_token,
+            deferredEndpoint=deferred_endpoint,
+            **kwargs,
+        )
+        self.session.add(credential)
+        await self.session.commit()
+        await self.session.refresh(credential)
+        return credential
+
+    async def update(self, id: str, **kwargs) -> Union[CredentialModel, None]:
+        assert self.session is not None
+        assert self.logger is not None
+        try:
+            result = await self.session.execute(
+                select(CredentialModel).where(CredentialModel.id == id)
+            )
+            credential: CredentialModel = result.scalar_one()
+
+            for attribute, value in kwargs.items():
+                if value is not None:
+                    setattr(credential, attribute, value)
+
+            await self.session.commit()
+            await self.session.refresh(credential)
+            return credential
+        except exc.NoResultFound:
+            self.logger.debug(f"No credential found with id {id}")
+            return None
+
+    async def get_by_id(self, id: str) -> Union[CredentialModel, None]:
+        assert self.session is not None
+        assert self.logger is not None
+        try:
+            result = await self.session.execute(
+                select(CredentialModel).where(CredentialModel.id == id)
+            )
+            return result.scalar_one()
+        except exc.NoResultFound:
+            self.logger.debug(f"No credential found with id {id}")
+            return None
+
+    async def get_by_acceptance_token(
+        self, acceptance_token: str
+    ) -> Union[CredentialModel, None]:
+        assert self.session is not None
+        assert self.logger is not None
+        try:
+            result = await self.session.execute(
+                select(CredentialModel).where(
+                    CredentialModel.acceptanceToken == acceptance_token
+                )
+            )
+            return result.scalar_one()
+        except exc.NoResultFound:
+            self.logger.debug(
+                f"No credential found with acceptance_token {acceptance_token}"
+            )
+            return None
+
+    async def get_all_by_organisation_id(
+        self, organisation_id: str
+    ) -> List[CredentialModel]:
+        assert self.session is not None
+        result = await self.session.execute(
+            select(CredentialModel).where(
+                CredentialModel.organisationId == organisation_id,
+            )
+        )
+        return list(result.scalars().all())
+
+    async def get_by_organisation_id_and_credential_id(
+        self, organisation_id: str, credential_id: str
+    ) -> Union[CredentialModel, None]:
+        assert self.session is not None
+        assert self.logger is not None
+        try:
+            result = await self.session.execute(
+                select(CredentialModel).where(
+                    CredentialModel.organisationId == organisation_id,
+                    CredentialModel.id == credential_id,
+                )
+            )
+            return result.scalar_one()
+        except exc.NoResultFound:
+            self.logger.debug(
+                f"No Credential found with organisation id {organisation_id} and credential id {credential_id}"
+            )
+            return None
+
+    async def delete(self, id: str, organisation_id: str) -> bool:
+        assert self.session is not None
+        assert self.logger is not None
+        try:
+            result = await self.session.execute(
+                select(CredentialModel).where(
+                    CredentialModel.id == id,
+                    CredentialModel.organisationId == organisation_id,
+                )
+            )
+            credential = result.scalar_one()
+            await self.session.delete(credential)
+            await self.session.commit()
+            self.logger.debug(f"Credential with id {id} has been deleted.")
+            return True
+        except exc.NoResultFound:
+            self.logger.debug(f"No credential found with id {id}")
+            return False
+
+    async def get_page_by_organisation_id(
+        self,
+        organisation_id: str,
+        page_query: PageQuery,
+    ) -> Page:
+        assert self.session is not None
+        stmt = select(CredentialModel).where(
+            CredentialModel.organisationId == organisation_id
+        )
+        result = await self.session.execute(
+            paginate(
+                stmt, CredentialModel, page_query, CredentialModel.credentialStatus
+            )
+        )
+        return to_page(result.scalars().all(), page_query)
+
+    async def stream_by_organisation_id(
+        self, organisation_id: str, page_query: PageQuery
+    ) -> AsyncIterator[CredentialModel]:
+        assert self.session is not None
+        stmt = select(CredentialModel).where(
+            CredentialModel.organisationId == organisation_id
+        )
+        result = await self.session.stream(
+            export_query(
+                stmt, CredentialModel, page_query, CredentialModel.credentialStatus
+            )
+        )
+        async for row in result.scalars():
+            yield row
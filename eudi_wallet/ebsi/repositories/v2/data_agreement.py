@@ -2,7 +2,8 @@ import uuid
 from logging import Logger
 from typing import List, Union, Optional, Callable
 
-from sqlalchemy import exc
+from sqlalchemy import exc, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from eudi_wallet.ebsi.models.v2.data_agreement import V2DataAgreementModel
@@ -151,3 +152,147 @@ class SqlAlchemyV2DataAgreementRepository:
         except exc.NoResultFound:
             self.logger.debug(f"No data agreement found with id {id}")
             return False
+
+
+class AsyncSqlAlchemyV2DataAgreementRepository:
+    def __init__(self, session: Optional[Callable], logger: Optional[Logger]):
+        self.session_factory = session
+        self.logger = logger
+        self.session: Optional[AsyncSession] = None
+
+    async def __aenter__(self):
+        assert self.session_factory is not None
+        self.session = self.session_factory()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        assert self.session is not None
+        assert self.logger is not None
+        if exc_tb is not None:
+            await self.session.rollback()
+            await self.session.close()
+            self.session = None
+            self.logger.error(f"Exception occurred: {exc_type}, {exc_val}")
+            return False
+
+        await self.session.close()
+        self.session = None
+        return True
+
+    async def create(
+        self,
+        organisation_id: str,
+        purpose: str,
+        credential_types: List[str],
+        data_attributes: List[dict],
+        exchange_mode: str,
+        purpose_description: str,
+        limited_disclosure: bool,
+        **kwargs,
+    ) -> V2DataAgreementModel:
+        assert self.session is not None
+        id = str(uuid.uuid4())
+        legal_entity = V2DataAgreementModel(
+            id=id,
+            organisationId=organisation_id,
+            purpose=purpose,
+            purposeDescription=purpose_description,
+            dataAttributes=data_attributes,
+            methodOfUse=exchange_mode,
+            limitedDisclosure=limited_disclosure,
+            credentialTypes=credential_types,
+            **kwargs,
+        )
+        self.session.add(legal_entity)
+        await self.session.commit()
+        await self.session.refresh(legal_entity)
+        return legal_entity
+
+    async def get_all_by_organisation_id(
+        self, organisation_id: str
+    ) -> List[V2DataAgreementModel]:
+        assert self.session is not None
+        result = await self.session.execute(
+            select(V2DataAgreementModel).where(
+                V2DataAgreementModel.organisationId == organisation_id
+            )
+        )
+        return list(result.scalars().all())
+
+    async def get_by_id_and_organisation_id(
+        self, organisation_id: str, id: str
+    ) -> Union[V2DataAgreementModel, None]:
+        assert self.session is not None
+        assert self.logger is not None
+        try:
+            result = await self.session.execute(
+                select(V2DataAgreementModel).where(
+                    V2DataAgreementModel.id == id,
+                    V2DataAgreementModel.organisationId == organisation_id,
+                )
+            )
+            return result.scalar_one()
+        except exc.NoResultFound:
+            self.logger.debug(f"No DataAgreementModel found with id {id}")
+            return None
+
+    async def get_by_purpose_and_organisation_id(
+        self, organisation_id: str, purpose: str
+    ) -> Union[V2DataAgreementModel, None]:
+        assert self.session is not None
+        assert self.logger is not None
+        try:
+            result = await self.session.execute(
+                select(V2DataAgreementModel).where(
+                    V2DataAgreementModel.purpose == purpose,
+                    V2DataAgreementModel.organisationId == organisation_id,
+                )
+            )
+            return result.scalar_one()
+        except exc.NoResultFound:
+            self.logger.debug(f"No DataAgreementModel found with purpose {purpose}")
+            return None
+
+    async def update(
+        self, id: str, organisation_id: str, **kwargs
+    ) -> Union[V2DataAgreementModel, None]:
+        assert self.session is not None
+        assert self.logger is not None
+        try:
+            result = await self.session.execute(
+                select(V2DataAgreementModel).where(
+                    V2DataAgreementModel.id == id,
+                    V2DataAgreementModel.organisationId == organisation_id,
+                )
+            )
+            legal_entity: V2DataAgreementModel = result.scalar_one()
+
+            for attribute, value in kwargs.items():
+                if value is not None:
+                    setattr(legal_entity, attribute, value)
+
+            await self.session.commit()
+            await self.session.refresh(legal_entity)
+            return legal_entity
+        except exc.NoResultFound:
+            self.logger.debug(f"No data agreement found with id {id}")
+            return None
+
+    async def delete_by_organisation_id(self, id: str, organisation_id: str) -> bool:
+        assert self.session is not None
+        assert self.logger is not None
+        try:
+            result = await self.session.execute(
+                select(V2DataAgreementModel).where(
+                    V2DataAgreementModel.id == id,
+                    V2DataAgreementModel.organisationId == organisation_id,
+                )
+            )
+            legal_entity = result.scalar_one()
+            await self.session.delete(legal_entity)
+            await self.session.commit()
+            self.logger.debug(f"Data agreement with id {id} has been deleted.")
+            return True
+        except exc.NoResultFound:
+            self.logger.debug(f"No data agreement found with id {id}")
+            return False
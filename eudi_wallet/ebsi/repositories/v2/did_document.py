@@ -0,0 +1,123 @@
+import datetime
+from logging import Logger
+from typing import Callable, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from eudi_wallet.ebsi.models.v2.did_document import DIDDocumentModel
+
+
+def _upsert_statement(key: str, result: dict, expires_at: datetime.datetime):
+    stmt = insert(DIDDocumentModel).values(
+        key=key,
+        result=result,
+        expiresAt=expires_at,
+        createdAt=datetime.datetime.utcnow(),
+        updatedAt=datetime.datetime.utcnow(),
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[DIDDocumentModel.key],
+        set_={
+            "result": stmt.excluded.result,
+            "expiresAt": stmt.excluded.expiresAt,
+            "updatedAt": stmt.excluded.updatedAt,
+        },
+    )
+
+
+class SqlAlchemyDIDDocumentRepository:
+    def __init__(self, session: Optional[Callable], logger: Optional[Logger]):
+        self.session_factory = session
+        self.logger = logger
+        self.session = None
+
+    def __enter__(self):
+        assert self.session_factory is not None
+        self.session = self.session_factory()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        assert self.session is not None, "DB session not available"
+        if exc_tb is not None:
+            assert self.logger is not None, "Logger not available"
+            self.logger.error(f"Exception occurred: {exc_type}, {exc_val}")
+            self.session.rollback()
+            return False
+
+        self.session.close()
+        self.session = None
+        return True
+
+    def get(self, key: str) -> Optional[DIDDocumentModel]:
+        assert self.session is not None
+        return self.session.get(DIDDocumentModel, key)
+
+    def upsert(self, key: str, result: dict, expires_at: datetime.datetime) -> None:
+        assert self.session is not None
+        self.session.execute(_upsert_statement(key, result, expires_at))
+        self.session.commit()
+
+
+class AsyncSqlAlchemyDIDDocumentRepository:
+    def __init__(self, session: Optional[Callable], logger: Optional[Logger]):
+        self.session_factory = session
+        self.logger = logger
+        self.session: Optional[AsyncSession] = None
+
+    async def __aenter__(self):
+        assert self.session_factory is not None
+        self.session = self.session_factory()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        assert self.logger is not None, "Logger not available"
+        assert self.session is not None, "DB session not available"
+        if exc_tb is not None:
+            await self.session.rollback()
+            await self.session.close()
+            self.session = None
+            self.logger.error(f"Exception occurred: {exc_type}, {exc_val}")
+            return False
+
+        await self.session.close()
+        self.session = None
+        return True
+
+    async def get(self, key: str) -> Optional[DIDDocumentModel]:
+        assert self.session is not None
+        result = await self.session.execute(
+            select(DIDDocumentModel).where(DIDDocumentModel.key == key)
+        )
+        return result.scalars().first()
+
+    async def upsert(
+        self, key: str, result: dict, expires_at: datetime.datetime
+    ) -> None:
+        assert self.session is not None
+        await self.session.execute(_upsert_statement(key, result, expires_at))
+        await self.session.commit()
+
+
+class RepositoryDIDDocumentStore:
+    """Backs the DID resolution cache with the did_document table"""
+
+    def __init__(self, repository_factory: Callable):
+        self.repository_factory = repository_factory
+
+    async def get(self, key: str) -> Optional[Tuple[dict, float]]:
+        async with self.repository_factory() as repo:
+            did_document = await repo.get(key)
+        if did_document is None:
+            return None
+        expires_at = did_document.expiresAt.replace(tzinfo=datetime.timezone.utc)
+        return did_document.result, expires_at.timestamp()
+
+    async def set(self, key: str, result: dict, expires_at: float) -> None:
+        async with self.repository_factory() as repo:
+            await repo.upsert(
+                key,
+                result,
+                datetime.datetime.utcfromtimestamp(expires_at),
+            )
@@ -1,13 +1,104 @@
+import datetime
 import uuid
 from logging import Logger
-from typing import Callable, List, Optional, Union
+from typing import AsyncIterator, Callable, Iterator, List, Optional, Tuple, Union
 
-from sqlalchemy import exc
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, exc, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
+from eudi_wallet.ebsi.models.v2.credential_supported import (
+    CredentialSupportedModel,
+    get_credential_supported_key,
+)
 from eudi_wallet.ebsi.models.v2.issue_credential_record import (
     IssueCredentialRecordModel,
 )
+from eudi_wallet.ebsi.repositories.pagination import (
+    Page,
+    PageQuery,
+    export_query,
+    paginate,
+    to_page,
+)
+
+# Rows per INSERT, keeps each statement under the bind parameter limit
+INSERT_BATCH_SIZE = 1000
+
+
+def _count_credential_supported(
+    organisation_id: str, key: Tuple[str, str], delta: int
+) -> list:
+    scope, format = key
+    if delta > 0:
+        now = datetime.datetime.utcnow()
+        statement = pg_insert(CredentialSupportedModel).values(
+            organisationId=organisation_id,
+            scope=scope,
+            format=format,
+            recordCount=delta,
+            createdAt=now,
+            updatedAt=now,
+        )
+        return [
+            statement.on_conflict_do_update(
+                index_elements=[
+                    CredentialSupportedModel.organisationId,
+                    CredentialSupportedModel.scope,
+                    CredentialSupportedModel.format,
+                ],
+                set_={
+                    "recordCount": CredentialSupportedModel.recordCount
+                    + statement.excluded.recordCount,
+                    "updatedAt": now,
+                },
+            )
+        ]
+
+    match = (
+        CredentialSupportedModel.organisationId == organisation_id,
+        CredentialSupportedModel.scope == scope,
+        CredentialSupportedModel.format == format,
+    )
+    return [
+        update(CredentialSupportedModel)
+        .where(*match)
+        .values(recordCount=CredentialSupportedModel.recordCount + delta),
+        delete(CredentialSupportedModel).where(
+            *match, CredentialSupportedModel.recordCount <= 0
+        ),
+    ]
+
+
+def credential_supported_changes(
+    organisation_id: str,
+    before: Optional[Tuple[str, str]],
+    after: Optional[Tuple[str, str]],
+) -> list:
+    """Statements moving a record between credentials_supported entries.
+
+    Run in the transaction that creates, updates or deletes a record
+    without a data agreement, so the catalogue never drifts from them.
+    """
+    if before == after:
+        return []
+    statements = []
+    if before is not None:
+        statements.extend(_count_credential_supported(organisation_id, before, -1))
+    if after is not None:
+        statements.extend(_count_credential_supported(organisation_id, after, 1))
+    return statements
+
+
+def _credential_supported_key(
+    credential_offer: IssueCredentialRecordModel,
+) -> Optional[Tuple[str, str]]:
+    if credential_offer.dataAgreementId is not None:
+        return None
+    return get_credential_supported_key(
+        credential_offer.credential, credential_offer.disclosureMapping
+    )
 
 
 class SqlAlchemyIssueCredentialRecordRepository:
@@ -62,6 +153,10 @@ class SqlAlchemyIssueCredentialRecordRepository:
             **kwargs,
         )
         self.session.add(credential_offer)
+        for statement in credential_supported_changes(
+            organisation_id, None, _credential_supported_key(credential_offer)
+        ):
+            self.session.execute(statement)
         self.session.commit()
         self.session.refresh(credential_offer)
         return credential_offer
@@ -103,6 +198,26 @@ class SqlAlchemyIssueCredentialRecordRepository:
         self.session.refresh(credential_offer)
         return credential_offer
 
+    def create_many(self, records: List[dict]) -> List[IssueCredentialRecordModel]:
+        """Insert records in multi-row statements and commit once.
+
+        Every record must have the same keys, ids are generated if missing.
+        """
+        assert self.session is not None
+        credential_offers = []
+        for offset in range(0, len(records), INSERT_BATCH_SIZE):
+            credential_offers.extend(
+                self.session.scalars(
+                    insert(IssueCredentialRecordModel)
+                    .values(records[offset : offset + INSERT_BATCH_SIZE])
+                    .returning(IssueCredentialRecordModel)
+                ).all()
+            )
+        # Detached so that the commit does not expire every returned row
+        self.session.expunge_all()
+        self.session.commit()
+        return credential_offers
+
     def update(self, id: str, **kwargs) -> Union[IssueCredentialRecordModel, None]:
         assert self.session is not None
         assert self.logger is not None
@@ -112,11 +227,18 @@ class SqlAlchemyIssueCredentialRecordRepository:
                 .filter(IssueCredentialRecordModel.id == id)
                 .one()
             )
+            before = _credential_supported_key(credential_offer)
 
             for attribute, value in kwargs.items():
                 if value is not None:
                     setattr(credential_offer, attribute, value)
 
+            for statement in credential_supported_changes(
+                credential_offer.organisationId,
+                before,
+                _credential_supported_key(credential_offer),
+            ):
+                self.session.execute(statement)
             self.session.commit()
             self.session.refresh(credential_offer)
             return credential_offer
@@ -243,6 +365,17 @@ class SqlAlchemyIssueCredentialRecordRepository:
             .all()
         )
 
+    def get_credentials_supported_by_organisation_id(
+        self, organisation_id: str
+    ) -> List[CredentialSupportedModel]:
+        assert self.session is not None
+        return (
+            self.session.query(CredentialSupportedModel)
+            .filter(CredentialSupportedModel.organisationId == organisation_id)
+            .order_by(CredentialSupportedModel.updatedAt)
+            .all()
+        )
+
     def get_all_by_data_agreement_id(
         self, data_agreement_id: str
     ) -> List[IssueCredentialRecordModel]:
@@ -267,6 +400,10 @@ class SqlAlchemyIssueCredentialRecordRepository:
                 )
                 .one()
             )
+            for statement in credential_supported_changes(
+                organisation_id, _credential_supported_key(credential_offer), None
+            ):
+                self.session.execute(statement)
             self.session.delete(credential_offer)
             self.session.commit()
             self.logger.debug(f"Credential offer with id {id} has been deleted.")
@@ -274,3 +411,391 @@ class SqlAlchemyIssueCredentialRecordRepository:
         except exc.NoResultFound:
             self.logger.debug(f"No credential offer found with id {id}")
             return False
+
+    def get_page_by_organisation_id(
+        self,
+        organisation_id: str,
+        page_query: PageQuery,
+        data_agreement_id: Optional[str] = None,
+    ) -> Page:
+        assert self.session is not None
+        stmt = select(IssueCredentialRecordModel).where(
+            IssueCredentialRecordModel.organisationId == organisation_id
+        )
+        if data_agreement_id is not None:
+            stmt = stmt.where(
+                IssueCredentialRecordModel.dataAgreementId == data_agreement_id
+            )
+        result = self.session.execute(
+            paginate(
+                stmt, IssueCredentialRecordModel, page_query, IssueCredentialRecordModel.status
+            )
+        )
+        return to_page(result.scalars().all(), page_query)
+
+    def stream_by_organisation_id(
+        self, organisation_id: str, page_query: PageQuery
+    ) -> Iterator[IssueCredentialRecordModel]:
+        assert self.session is not None
+        stmt = select(IssueCredentialRecordModel).where(
+            IssueCredentialRecordModel.organisationId == organisation_id
+        )
+        result = self.session.execute(
+            export_query(
+                stmt, IssueCredentialRecordModel, page_query, IssueCredentialRecordModel.status
+            )
+        )
+        yield from result.scalars()
+
+
+class AsyncSqlAlchemyIssueCredentialRecordRepository:
+    def __init__(self, session: Optional[Callable], logger: Optional[Logger]):
+        self.session_factory = session
+        self.logger = logger
+        self.session: Optional[AsyncSession] = None
+
+    async def __aenter__(self):
+        assert self.session_factory is not None
+        self.session = self.session_factory()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        assert self.logger is not None, "Logger not available"
+        assert self.session is not None, "DB session not available"
+        if exc_tb is not None:
+            await self.session.rollback()
+            await self.session.close()
+            self.session = None
+            self.logger.error(f"Exception occurred: {exc_type}, {exc_val}")
+            return False
+
+        await self.session.close()
+        self.session = None
+        return True
+
+    def _select(self):
+        # The data agreement is read outside of the session by the service
+        # layer, and lazy loading is not available on an async session.
+        return select(IssueCredentialRecordModel).options(
+            selectinload(IssueCredentialRecordModel.dataAgreement)
+        )
+
+    async def _get_by_id(self, id: str) -> IssueCredentialRecordModel:
+        assert self.session is not None
+        result = await self.session.execute(
+            self._select()
+            .where(IssueCredentialRecordModel.id == id)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one()
+
+    async def create_without_data_agreement(
+        self,
+        organisation_id: str,
+        issuance_mode: str,
+        status: str,
+        is_pre_authorised: Optional[bool] = False,
+        credential_status: Optional[str] = None,
+        acceptance_token: Optional[str] = None,
+        authorisation_code: Optional[str] = None,
+        pre_authorised_code: Optional[str] = None,
+        user_pin: Optional[str] = None,
+        **kwargs,
+    ) -> IssueCredentialRecordModel:
+        assert self.session is not None
+        id = str(uuid.uuid4())
+        credential_offer = IssueCredentialRecordModel(
+            id=id,
+            organisationId=organisation_id,
+            issuanceMode=issuance_mode,
+            isPreAuthorised=is_pre_authorised,
+            credentialStatus=credential_status,
+            acceptanceToken=acceptance_token,
+            authorisationCode=authorisation_code,
+            preAuthorisedCode=pre_authorised_code,
+            userPin=user_pin,
+            status=status,
+            **kwargs,
+        )
+        self.session.add(credential_offer)
+        for statement in credential_supported_changes(
+            organisation_id, None, _credential_supported_key(credential_offer)
+        ):
+            await self.session.execute(statement)
+        await self.session.commit()
+        return await self._get_by_id(id)
+
+    async def create(
+        self,
+        data_agreement_id: str,
+        organisation_id: str,
+        issuance_mode: str,
+        status: str,
+        data_attribute_values: Optional[str] = None,
+        is_pre_authorised: Optional[bool] = False,
+        credential_status: Optional[str] = None,
+        acceptance_token: Optional[str] = None,
+        authorisation_code: Optional[str] = None,
+        pre_authorised_code: Optional[str] = None,
+        user_pin: Optional[str] = None,
+        **kwargs,
+    ) -> IssueCredentialRecordModel:
+        assert self.session is not None
+        id = str(uuid.uuid4())
+        credential_offer = IssueCredentialRecordModel(
+            id=id,
+            dataAgreementId=data_agreement_id,
+            organisationId=organisation_id,
+            dataAttributeValues=data_attribute_values,
+            issuanceMode=issuance_mode,
+            isPreAuthorised=is_pre_authorised,
+            credentialStatus=credential_status,
+            acceptanceToken=acceptance_token,
+            authorisationCode=authorisation_code,
+            preAuthorisedCode=pre_authorised_code,
+            userPin=user_pin,
+            status=status,
+            **kwargs,
+        )
+        self.session.add(credential_offer)
+        await self.session.commit()
+        return await self._get_by_id(id)
+
+    async def create_many(
+        self, records: List[dict]
+    ) -> List[IssueCredentialRecordModel]:
+        """Insert records in multi-row statements and commit once.
+
+        Every record must have the same keys, ids are generated if missing.
+        """
+        assert self.session is not None
+        credential_offers = []
+        for offset in range(0, len(records), INSERT_BATCH_SIZE):
+            result = await self.session.scalars(
+                insert(IssueCredentialRecordModel)
+                .values(records[offset : offset + INSERT_BATCH_SIZE])
+                .returning(IssueCredentialRecordModel)
+            )
+            credential_offers.extend(result.all())
+        await self.session.commit()
+        return credential_offers
+
+    async def update(
+        self, id: str, **kwargs
+    ) -> Union[IssueCredentialRecordModel, None]:
+        assert self.session is not None
+        assert self.logger is not None
+        try:
+            credential_offer = await self._get_by_id(id)
+            before = _credential_supported_key(credential_offer)
+
+            for attribute, value in kwargs.items():
+                if value is not None:
+                    setattr(credential_offer, attribute, value)
+
+            for statement in credential_supported_changes(
+                credential_offer.organisationId,
+                before,
+                _credential_supported_key(credential_offer),
+            ):
+                await self.session.execute(statement)
+            await self.session.commit()
+            return await self._get_by_id(id)
+        except exc.NoResultFound:
+            self.logger.debug(f"No credential offer found with id {id}")
+            return None
+
+    async def get_by_id(self, id: str) -> Union[IssueCredentialRecordModel, None]:
+        assert self.session is not None
+        assert self.logger is not None
+        try:
+            return await self._get_by_id(id)
+        except exc.NoResultFound:
+            self.logger.debug(f"No CredentialOfferModel found with id {id}")
+            return None
+
+    async def get_all_by_client_id(
+        self, client_id: str
+    ) -> List[IssueCredentialRecordModel]:
+        assert self.session is not None
+        result = await self.session.execute(
+            self._select().where(IssueCredentialRecordModel.clientId == client_id)
+        )
+        return list(result.scalars().all())
+
+    async def get_by_id_token_request_state(
+        self, state: str
+    ) -> Union[IssueCredentialRecordModel, None]:
+        assert self.session is not None
+        assert self.logger is not None
+        try:
+            result = await self.session.execute(
+                self._select().where(
+                    IssueCredentialRecordModel.idTokenRequestState == state
+                )
+            )
+            return result.scalar_one()
+        except exc.NoResultFound:
+            self.logger.debug(
+                f"No CredentialOfferModel found with id token state {state}"
+            )
+            return None
+
+    async def get_by_authorisation_code(
+        self, authorisation_code: str
+    ) -> Union[IssueCredentialRecordModel, None]:
+        assert self.session is not None
+        assert self.logger is not None
+        try:
+            result = await self.session.execute(
+                self._select().where(
+                    IssueCredentialRecordModel.authorisationCode == authorisation_code
+                )
+            )
+            return result.scalar_one()
+        except exc.NoResultFound:
+            self.logger.debug(
+                f"No CredentialOfferModel found with authorisation code {authorisation_code}"
+            )
+            return None
+
+    async def get_by_acceptance_token(
+        self, acceptance_token: str
+    ) -> Union[IssueCredentialRecordModel, None]:
+        assert self.session is not None
+        assert self.logger is not None
+        try:
+            result = await self.session.execute(
+                self._select().where(
+                    IssueCredentialRecordModel.acceptanceToken == acceptance_token
+                )
+            )
+            return result.scalar_one()
+        except exc.NoResultFound:
+            self.logger.debug(
+                f"No CredentialOfferModel found with acceptance_token {acceptance_token}"
+            )
+            return None
+
+    async def get_by_id_and_data_agreement_id(
+        self, id: str, data_agreement_id: str
+    ) -> Union[IssueCredentialRecordModel, None]:
+        assert self.session is not None
+        assert self.logger is not None
+        try:
+            result = await self.session.execute(
+                self._select().where(
+                    IssueCredentialRecordModel.id == id,
+                    IssueCredentialRecordModel.dataAgreementId == data_agreement_id,
+                )
+            )
+            return result.scalar_one()
+        except exc.NoResultFound:
+            self.logger.debug(
+                f"No CredentialOfferModel found with id {id} and credential schema id {data_agreement_id}"
+            )
+            return None
+
+    async def get_all_by_organisation_id(
+        self, organisation_id: str
+    ) -> List[IssueCredentialRecordModel]:
+        assert self.session is not None
+        result = await self.session.execute(
+            self._select().where(
+                IssueCredentialRecordModel.organisationId == organisation_id,
+            )
+        )
+        return list(result.scalars().all())
+
+    async def get_all_by_organisation_id_and_with_credential(
+        self, organisation_id: str
+    ) -> List[IssueCredentialRecordModel]:
+        assert self.session is not None
+        result = await self.session.execute(
+            self._select().where(
+                IssueCredentialRecordModel.organisationId == organisation_id,
+                IssueCredentialRecordModel.dataAgreementId.is_(None),
+            )
+        )
+        return list(result.scalars().all())
+
+    async def get_credentials_supported_by_organisation_id(
+        self, organisation_id: str
+    ) -> List[CredentialSupportedModel]:
+        assert self.session is not None
+        result = await self.session.execute(
+            select(CredentialSupportedModel)
+            .where(CredentialSupportedModel.organisationId == organisation_id)
+            .order_by(CredentialSupportedModel.updatedAt)
+        )
+        return list(result.scalars().all())
+
+    async def get_all_by_data_agreement_id(
+        self, data_agreement_id: str
+    ) -> List[IssueCredentialRecordModel]:
+        assert self.session is not None
+        result = await self.session.execute(
+            self._select().where(
+                IssueCredentialRecordModel.dataAgreementId == data_agreement_id,
+            )
+        )
+        return list(result.scalars().all())
+
+    async def delete(self, id: str, organisation_id: str) -> bool:
+        assert self.session is not None
+        assert self.logger is not None
+        try:
+            result = await self.session.execute(
+                select(IssueCredentialRecordModel).where(
+                    IssueCredentialRecordModel.id == id,
+                    IssueCredentialRecordModel.organisationId == organisation_id,
+                )
+            )
+            credential_offer = result.scalar_one()
+            for statement in credential_supported_changes(
+                organisation_id, _credential_supported_key(credential_offer), None
+            ):
+                await self.session.execute(statement)
+            await self.session.delete(credential_offer)
+            await self.session.commit()
+            self.logger.debug(f"Credential offer with id {id} has been deleted.")
+            return True
+        except exc.NoResultFound:
+            self.logger.debug(f"No credential offer found with id {id}")
+            return False
+
+    async def get_page_by_organisation_id(
+        self,
+        organisation_id: str,
+        page_query: PageQuery,
+        data_agreement_id: Optional[str] = None,
+    ) -> Page:
+        assert self.session is not None
+        stmt = select(IssueCredentialRecordModel).where(
+            IssueCredentialRecordModel.organisationId == organisation_id
+        )
+        if data_agreement_id is not None:
+            stmt = stmt.where(
+                IssueCredentialRecordModel.dataAgreementId == data_agreement_id
+            )
+        result = await self.session.execute(
+            paginate(
+                stmt, IssueCredentialRecordModel, page_query, IssueCredentialRecordModel.status
+            )
+        )
+        return to_page(result.scalars().all(), page_query)
+
+    async def stream_by_organisation_id(
+        self, organisation_id: str, page_query: PageQuery
+    ) -> AsyncIterator[IssueCredentialRecordModel]:
+        assert self.session is not None
+        stmt = select(IssueCredentialRecordModel).where(
+            IssueCredentialRecordModel.organisationId == organisation_id
+        )
+        result = await self.session.stream(
+            export_query(
+                stmt, IssueCredentialRecordModel, page_query, IssueCredentialRecordModel.status
+            )
+        )
+        async for row in result.scalars():
+            yield row
@@ -1,13 +1,21 @@
 import uuid
 from logging import Logger
-from typing import Callable, List, Optional, Union
+from typing import AsyncIterator, Callable, Iterator, List, Optional, Union
 
-from sqlalchemy import exc
+from sqlalchemy import exc, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from eudi_wallet.ebsi.models.v2.verification_record import (
     VerificationRecordModel,
 )
+from eudi_wallet.ebsi.repositories.pagination import (
+    Page,
+    PageQuery,
+    export_query,
+    paginate,
+    to_page,
+)
 
 
 class SqlAlchemyVerificationRecordRepository:
@@ -151,3 +159,195 @@ class SqlAlchemyVerificationRecordRepository:
         except exc.NoResultFound:
             self.logger.debug(f"No verification record found with id {id}")
             return False
+
+    def get_page_by_organisation_id(
+        self,
+        organisation_id: str,
+        page_query: PageQuery,
+    ) -> Page:
+        assert self.session is not None
+        stmt = select(VerificationRecordModel).where(
+            VerificationRecordModel.organisationId == organisation_id
+        )
+        result = self.session.execute(
+            paginate(
+                stmt, VerificationRecordModel, page_query, VerificationRecordModel.status
+            )
+        )
+        return to_page(result.scalars().all(), page_query)
+
+    def stream_by_organisation_id(
+        self, organisation_id: str, page_query: PageQuery
+    ) -> Iterator[VerificationRecordModel]:
+        assert self.session is not None
+        stmt = select(VerificationRecordModel).where(
+            VerificationRecordModel.organisationId == organisation_id
+        )
+        result = self.session.execute(
+            export_query(
+                stmt, VerificationRecordModel, page_query, VerificationRecordModel.status
+            )
+        )
+        yield from result.scalars()
+
+
+class AsyncSqlAlchemyVerificationRecordRepository:
+    def __init__(self, session: Optional[Callable], logger: Optional[Logger]):
+        self.session_factory = session
+        self.logger = logger
+        self.session: Optional[AsyncSession] = None
+
+    async def __aenter__(self):
+        assert self.session_factory is not None
+        self.session = self.session_factory()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        assert self.logger is not None, "Logger not available"
+        assert self.session is not None, "DB session not available"
+        if exc_tb is not None:
+            await self.session.rollback()
+            await self.session.close()
+            self.session = None
+            self.logger.error(f"Exception occurred: {exc_type}, {exc_val}")
+            return False
+
+        await self.session.close()
+        self.session = None
+        return True
+
+    async def create(
+        self,
+        id: str,
+        organisation_id: str,
+        status: str,
+        vp_token_request_state: Optional[str] = None,
+        vp_token_request: Optional[str] = None,
+        vp_token_qr_code: Optional[str] = None,
+        vp_token_response: Optional[str] = None,
+        presentationSubmission: Optional[dict] = None,
+        **kwargs,
+    ) -> VerificationRecordModel:
+        assert self.session is not None
+        verification_record = VerificationRecordModel(
+            id=id,
+            organisationId=organisation_id,
+            vp_token_request_state=vp_token_request_state,
+            vp_token_request=vp_token_request,
+            vp_token_qr_code=vp_token_qr_code,
+            vp_token_response=vp_token_response,
+            presentationSubmission=presentationSubmission,
+            status=status,
+            **kwargs,
+        )
+        self.session.add(verification_record)
+        await self.session.commit()
+        await self.session.refresh(verification_record)
+        return verification_record
+
+    async def update(self, id: str, **kwargs) -> Union[VerificationRecordModel, None]:
+        assert self.session is not None
+        assert self.logger is not None
+        try:
+            result = await self.session.execute(
+                select(VerificationRecordModel).where(VerificationRecordModel.id == id)
+            )
+            verification_record: VerificationRecordModel = result.scalar_one()
+
+            for attribute, value in kwargs.items():
+                if value is not None:
+                    setattr(verification_record, attribute, value)
+
+            await self.session.commit()
+            await self.session.refresh(verification_record)
+            return verification_record
+        except exc.NoResultFound:
+            self.logger.debug(f"No verification record found with ID: {id}")
+            return None
+
+    async def get_by_id(self, id: str) -> Union[VerificationRecordModel, None]:
+        assert self.session is not None
+        result = await self.session.execute(
+            select(VerificationRecordModel).where(VerificationRecordModel.id == id)
+        )
+        return result.scalars().first()
+
+    async def get_by_vp_token_request_state(
+        self, vp_token_request_state: str
+    ) -> Union[VerificationRecordModel, None]:
+        assert self.session is not None
+        assert self.logger is not None
+        try:
+            result = await self.session.execute(
+                select(VerificationRecordModel).where(
+                    VerificationRecordModel.vp_token_request_state
+                    == vp_token_request_state
+                )
+            )
+            return result.scalar_one()
+        except exc.NoResultFound:
+            self.logger.debug(
+                f"No verification record found with vp token request state {vp_token_request_state}"
+            )
+            return None
+
+    async def get_all_by_organisation_id(
+        self, organisation_id: str
+    ) -> List[VerificationRecordModel]:
+        assert self.session is not None
+        result = await self.session.execute(
+            select(VerificationRecordModel).where(
+                VerificationRecordModel.organisationId == organisation_id,
+            )
+        )
+        return list(result.scalars().all())
+
+    async def delete(self, id: str, organisation_id: str) -> bool:
+        assert self.session is not None
+        assert self.logger is not None
+        try:
+            result = await self.session.execute(
+                select(VerificationRecordModel).where(
+                    VerificationRecordModel.id == id,
+                    VerificationRecordModel.organisationId == organisation_id,
+                )
+            )
+            verification_record = result.scalar_one()
+            await self.session.delete(verification_record)
+            await self.session.commit()
+            self.logger.debug(f"Verification record with ID: {id} has been deleted.")
+            return True
+        except exc.NoResultFound:
+            self.logger.debug(f"No verification record found with id {id}")
+            return False
+
+    async def get_page_by_organisation_id(
+        self,
+        organisation_id: str,
+        page_query: PageQuery,
+    ) -> Page:
+        assert self.session is not None
+        stmt = select(VerificationRecordModel).where(
+            VerificationRecordModel.organisationId == organisation_id
+        )
+        result = await self.session.execute(
+            paginate(
+                stmt, VerificationRecordModel, page_query, VerificationRecordModel.status
+            )
+        )
+        return to_page(result.scalars().all(), page_query)
+
+    async def stream_by_organisation_id(
+        self, organisation_id: str, page_query: PageQuery
+    ) -> AsyncIterator[VerificationRecordModel]:
+        assert self.session is not None
+        stmt = select(VerificationRecordModel).where(
+            VerificationRecordModel.organisationId == organisation_id
+        )
+        result = await self.session.stream(
+            export_query(
+                stmt, VerificationRecordModel, page_query, VerificationRecordModel.status
+            )
+        )
+        async for row in result.scalars():
+            yield row
@@ -0,0 +1,249 @@
+import datetime
+import uuid
+from logging import Logger
+from typing import Callable, List, Optional
+
+from sqlalchemy import Row, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from eudi_wallet.ebsi.models.v2.webhook_delivery import WebhookDeliveryModel
+from eudi_wallet.ebsi.value_objects.domain.webhook import WebhookDeliveryStatus
+
+# Columns handed to the dispatcher when deliveries are claimed
+CLAIM_COLUMNS = (
+    WebhookDeliveryModel.id,
+    WebhookDeliveryModel.webhookUrl,
+    WebhookDeliveryModel.topic,
+    WebhookDeliveryModel.payload,
+    WebhookDeliveryModel.attempts,
+)
+
+
+def _claim_statement(limit: int, lease_until: datetime.datetime):
+    """Lease due deliveries so that no other worker or instance picks them up.
+
+    Rows locked by a concurrent claim are skipped rather than waited on.
+    """
+    due = (
+        select(WebhookDeliveryModel.id)
+        .where(
+            WebhookDeliveryModel.status == WebhookDeliveryStatus.Pending.value,
+            WebhookDeliveryModel.nextAttemptAt <= datetime.datetime.utcnow(),
+        )
+        .order_by(WebhookDeliveryModel.nextAttemptAt)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return (
+        update(WebhookDeliveryModel)
+        .where(WebhookDeliveryModel.id.in_(due.scalar_subquery()))
+        .values(nextAttemptAt=lease_until)
+        .returning(*CLAIM_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _make_due_statement(
+    ids: List[uuid.UUID], next_attempt_at: datetime.datetime
+):
+    return (
+        update(WebhookDeliveryModel)
+        .where(
+            WebhookDeliveryModel.id.in_(ids),
+            WebhookDeliveryModel.status == WebhookDeliveryStatus.Pending.value,
+        )
+        .values(nextAttemptAt=next_attempt_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _delivery_rows(
+    webhook_url: str,
+    topic: str,
+    payloads: List[Optional[dict]],
+    next_attempt_at: List[datetime.datetime],
+) -> List[dict]:
+    return [
+        {
+            "id": uuid.uuid4(),
+            "webhookUrl": webhook_url,
+            "topic": topic,
+            "payload": payload,
+            "status": WebhookDeliveryStatus.Pending.value,
+            "attempts": 0,
+            "nextAttemptAt": attempt_at,
+        }
+        for payload, attempt_at in zip(payloads, next_attempt_at)
+    ]
+
+
+class SqlAlchemyWebhookDeliveryRepository:
+    def __init__(self, session: Optional[Callable], logger: Optional[Logger]):
+        self.session_factory = session
+        self.logger = logger
+        self.session = None
+
+    def __enter__(self):
+        assert self.session_factory is not None
+        self.session = self.session_factory()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        assert self.session is not None, "DB session not available"
+        if exc_tb is not None:
+            assert self.logger is not None, "Logger not available"
+            self.logger.error(f"Exception occurred: {exc_type}, {exc_val}")
+            self.session.rollback()
+            return False
+
+        self.session.close()
+        self.session = None
+        return True
+
+    def create(
+        self,
+        webhook_url: str,
+        topic: str,
+        payload: Optional[dict],
+        next_attempt_at: datetime.datetime,
+    ) -> WebhookDeliveryModel:
+        assert self.session is not None
+        webhook_delivery = WebhookDeliveryModel(
+            id=uuid.uuid4(),
+            webhookUrl=webhook_url,
+            topic=topic,
+            payload=payload,
+            status=WebhookDeliveryStatus.Pending.value,
+            attempts=0,
+            nextAttemptAt=next_attempt_at,
+        )
+        self.session.add(webhook_delivery)
+        self.session.commit()
+        self.session.refresh(webhook_delivery)
+        return webhook_delivery
+
+    def create_many(
+        self,
+        webhook_url: str,
+        topic: str,
+        payloads: List[Optional[dict]],
+        next_attempt_at: List[datetime.datetime],
+    ) -> List[uuid.UUID]:
+        """Insert deliveries in one executemany statement and commit once"""
+        assert self.session is not None
+        rows = _delivery_rows(webhook_url, topic, payloads, next_attempt_at)
+        if rows:
+            self.session.execute(insert(WebhookDeliveryModel), rows)
+        self.session.commit()
+        return [row["id"] for row in rows]
+
+    def update(self, id: uuid.UUID, **kwargs) -> None:
+        assert self.session is not None
+        self.session.execute(
+            update(WebhookDeliveryModel)
+            .where(WebhookDeliveryModel.id == id)
+            .values(**kwargs)
+        )
+        self.session.commit()
+
+    def make_due(
+        self, ids: List[uuid.UUID], next_attempt_at: datetime.datetime
+    ) -> None:
+        """End the lease of deliveries the dispatcher could not queue"""
+        assert self.session is not None
+        self.session.execute(_make_due_statement(ids, next_attempt_at))
+        self.session.commit()
+
+    def claim_due(self, limit: int, lease_until: datetime.datetime) -> List[Row]:
+        assert self.session is not None
+        rows = self.session.execute(_claim_statement(limit, lease_until)).all()
+        self.session.commit()
+        return list(rows)
+
+
+class AsyncSqlAlchemyWebhookDeliveryRepository:
+    def __init__(self, session: Optional[Callable], logger: Optional[Logger]):
+        self.session_factory = session
+        self.logger = logger
+        self.session: Optional[AsyncSession] = None
+
+    async def __aenter__(self):
+        assert self.session_factory is not None
+        self.session = self.session_factory()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        assert self.logger is not None, "Logger not available"
+        assert self.session is not None, "DB session not available"
+        if exc_tb is not None:
+            await self.session.rollback()
+            await self.session.close()
+            self.session = None
+            self.logger.error(f"Exception occurred: {exc_type}, {exc_val}")
+            return False
+
+        await self.session.close()
+        self.session = None
+        return True
+
+    async def create(
+        self,
+        webhook_url: str,
+        topic: str,
+        payload: Optional[dict],
+        next_attempt_at: datetime.datetime,
+    ) -> WebhookDeliveryModel:
+        assert self.session is not None
+        webhook_delivery = WebhookDeliveryModel(
+            id=uuid.uuid4(),
+            webhookUrl=webhook_url,
+            topic=topic,
+            payload=payload,
+            status=WebhookDeliveryStatus.Pending.value,
+            attempts=0,
+            nextAttemptAt=next_attempt_at,
+        )
+        self.session.add(webhook_delivery)
+        await self.session.commit()
+        return webhook_delivery
+
+    async def create_many(
+        self,
+        webhook_url: str,
+        topic: str,
+        payloads: List[Optional[dict]],
+        next_attempt_at: List[datetime.datetime],
+    ) -> List[uuid.UUID]:
+        """Insert deliveries in one executemany statement and commit once"""
+        assert self.session is not None
+        rows = _delivery_rows(webhook_url, topic, payloads, next_attempt_at)
+        if rows:
+            await self.session.execute(insert(WebhookDeliveryModel), rows)
+        await self.session.commit()
+        return [row["id"] for row in rows]
+
+    async def update(self, id: uuid.UUID, **kwargs) -> None:
+        assert self.session is not None
+        await self.session.execute(
+            update(WebhookDeliveryModel)
+            .where(WebhookDeliveryModel.id == id)
+            .values(**kwargs)
+        )
+        await self.session.commit()
+
+    async def make_due(
+        self, ids: List[uuid.UUID], next_attempt_at: datetime.datetime
+    ) -> None:
+        """End the lease of deliveries the dispatcher could not queue"""
+        assert self.session is not None
+        await self.session.execute(_make_due_statement(ids, next_attempt_at))
+        await self.session.commit()
+
+    async def claim_due(
+        self, limit: int, lease_until: datetime.datetime
+    ) -> List[Row]:
+        assert self.session is not None
+        result = await self.session.execute(_claim_statement(limit, lease_until))
+        rows = result.all()
+        await self.session.commit()
+        return list(rows)
@@ -4,7 +4,7 @@ import urllib.parse
 import uuid
 from datetime import datetime
 from logging import Logger
-from typing import List, Optional, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 from eth_account import Account
 from eth_account.signers.local import LocalAccount
@@ -39,9 +39,6 @@ from eudi_wallet.ebsi.exceptions.domain.issuer import (
     CredentialRevocationStatusListNotFoundError,
 )
 from eudi_wallet.ebsi.models.credential_offer import CredentialOfferModel
-from eudi_wallet.ebsi.models.credential_revocation_status_list import (
-    CredentialRevocationStatusListModel,
-)
 from eudi_wallet.ebsi.models.data_agreement import DataAgreementModel
 from eudi_wallet.ebsi.models.organisation import OrganisationModel
 from eudi_wallet.ebsi.repositories.credential_offer import (
@@ -61,6 +58,13 @@ from eudi_wallet.ebsi.services.domain.authorisation import AuthorisationService
 from eudi_wallet.ebsi.services.domain.did_registry import DIDRegistryService
 from eudi_wallet.ebsi.services.domain.issuer import IssuerService
 from eudi_wallet.ebsi.services.domain.ledger import LedgerService
+from eudi_wallet.ebsi.services.domain.revocation_index import (
+    revocation_index_allocator,
+)
+from eudi_wallet.ebsi.services.domain.status_list import (
+    SignedStatusList,
+    status_list_engine,
+)
 from eudi_wallet.ebsi.services.domain.trusted_issuer_registry import TIRService
 from eudi_wallet.ebsi.services.domain.utils.authn import generate_code_challenge
 from eudi_wallet.ebsi.services.domain.utils.credential import (
@@ -68,7 +72,6 @@ from eudi_wallet.ebsi.services.domain.utils.credential import (
     create_credential_token,
     deserialize_credential_jwt,
     generate_w3c_vc_statuslist_encoded_bitstring,
-    update_w3c_vc_statuslist_encoded_bitstring,
 )
 from eudi_wallet.ebsi.services.domain.utils.did import generate_and_store_did
 from eudi_wallet.ebsi.utils.date_time import generate_ISO8601_UTC
@@ -77,6 +80,7 @@ from eudi_wallet.ebsi.utils.hex import (
     generate_random_ebsi_reserved_attribute_id,
 )
 from eudi_wallet.ebsi.utils.jwt import decode_header_and_claims_in_jwt
+from eudi_wallet.ebsi.utils.signing import run_signing
 from eudi_wallet.ebsi.value_objects.application.organisation import (
     DataAgreementExchangeModes,
     OrganisationRoles,
@@ -169,6 +173,17 @@ class OrganisationService:
         )
         self.crypto_seed = None
 
+    def credential_revocation_status_list_repository_factory(
+        self,
+    ) -> SqlAlchemyCredentialRevocationStatusListRepository:
+        # A repository of its own, as status lists are saved outside of
+        # the request that changed them
+        assert self.credential_revocation_status_list_repository is not None
+        return SqlAlchemyCredentialRevocationStatusListRepository(
+            session=self.credential_revocation_status_list_repository.session_factory,
+            logger=self.logger,
+        )
+
     async def set_cryptographic_seed(self, crypto_seed: str) -> None:
         self.crypto_seed = crypto_seed
         self.eth, self.ebsi_did, self.key_did = await generate_and_store_did(
@@ -1297,7 +1312,7 @@ class OrganisationService:
                         cryptographic_seed=f"{int(time.time())}",
                     )
 
-    def _create_credential_token(
+    async def _create_credential_token(
         self,
         credential_issuer: str,
         credential_id: str,
@@ -1334,7 +1349,8 @@ class OrganisationService:
         if terms_of_use:
             vc["termsOfUse"] = terms_of_use
 
-        return create_credential_token(
+        return await run_signing(
+            create_credential_token,
             vc=vc,
             jti=jti,
             sub=sub,
@@ -1393,7 +1409,7 @@ class OrganisationService:
                 sub = credential_offer_entity.client_id
             else:
                 sub = ""
-            to_be_issued_credential = self._create_credential_token(
+            to_be_issued_credential = await self._create_credential_token(
                 credential_id=credential_id,
                 credential_type=credential_type,
                 credential_context=credential_context,
@@ -1541,7 +1557,7 @@ class OrganisationService:
                 jti = credential_id
                 iss = self.key_did.did
                 sub = credential_offer_entity.client_id
-                to_be_issued_credential = self._create_credential_token(
+                to_be_issued_credential = await self._create_credential_token(
                     credential_id=credential_id,
                     credential_type=credential_type,
                     credential_context=credential_context,
@@ -1703,7 +1719,7 @@ class OrganisationService:
         jti = credential_id
         iss = self.ebsi_did.did
         sub = client_id
-        to_be_issued_credential = self._create_credential_token(
+        to_be_issued_credential = await self._create_credential_token(
             credential_id=credential_id,
             credential_type=credential_type,
             credential_context=credential_context,
@@ -1807,7 +1823,8 @@ class OrganisationService:
         }
 
         key = self.key_did._key
-        to_be_issued_credential = create_credential_token(
+        to_be_issued_credential = await run_signing(
+            create_credential_token,
             vc=status_list_vc,
             jti=credential_list_url,
             sub=credential_list_url,
@@ -1822,87 +1839,101 @@ class OrganisationService:
         )
         return credential_response.to_dict()
 
-    async def get_credential_status(self, status_list_index: str) -> dict:
+    async def get_credential_status(self, status_list_index: str) -> SignedStatusList:
         assert self.legal_entity_entity is not None, "Legal entity not found"
         assert (
             self.legal_entity_entity.verifiable_accreditation_to_attest is not None
         ), "Verifiable accreditation to attest not found"
 
-        vc_to_attest: VerifiableAccreditation = deserialize_credential_jwt(
-            self.legal_entity_entity.verifiable_accreditation_to_attest
-        )
-        # reserved_attribute_id = (
-        #     vc_to_attest.credentialSubject.reservedAttributeId.lstrip("0x")
-        # )
-        schema = vc_to_attest.credentialSubject.accreditedFor[0].schemaId
-
         with self.credential_revocation_status_list_repository as revocation_repo:
-            revocation_list = revocation_repo.get_by_id(status_list_index)
-            if not revocation_list:
+            updated_at = revocation_repo.get_updated_at_by_id(status_list_index)
+            if not updated_at:
                 raise CredentialRevocationStatusListNotFoundError(
                     "Status list not found"
                 )
 
-        credential_list_url = (
-            f"{self.issuer_domain}/credentials/status/{status_list_index}#list"
-        )
+        key = self.key_did._key
+        kid = f"{self.ebsi_did.did}#{key.key_id}"
 
-        seconds_in_one_year = 31536000
-        iss_in_epoch, issuance_date = generate_ISO8601_UTC()
-        exp_in_epoch, expiration_date = generate_ISO8601_UTC(seconds_in_one_year)
-        status_list_vc = {
-            "@context": [
-                "https://www.w3.org/2018/credentials/v1",
-                "https://w3id.org/vc/status-list/2021/v1",
-            ],
-            "id": credential_list_url,
-            "type": [
-                "VerifiableCredential",
-                "VerifiableAttestation",
-                "StatusList2021Credential",
-            ],
-            "issuer": self.ebsi_did.did,
-            "issuanceDate": issuance_date,
-            "issued": issuance_date,
-            "validFrom": issuance_date,
-            "expirationDate": expiration_date,
-            "validUntil": expiration_date,
-            "credentialSubject": {
+        async def sign() -> Tuple[str, int]:
+            vc_to_attest: VerifiableAccreditation = deserialize_credential_jwt(
+                self.legal_entity_entity.verifiable_accreditation_to_attest
+            )
+            # reserved_attribute_id = (
+            #     vc_to_attest.credentialSubject.reservedAttributeId.lstrip("0x")
+            # )
+            schema = vc_to_attest.credentialSubject.accreditedFor[0].schemaId
+
+            with self.credential_revocation_status_list_repository as revocation_repo:
+                revocation_list = revocation_repo.get_by_id(status_list_index)
+                if not revocation_list:
+                    raise CredentialRevocationStatusListNotFoundError(
+                        "Status list not found"
+                    )
+                encoded_status_list = revocation_list.encoded_status_list
+
+            credential_list_url = (
+                f"{self.issuer_domain}/credentials/status/{status_list_index}#list"
+            )
+
+            seconds_in_one_year = 31536000
+            iss_in_epoch, issuance_date = generate_ISO8601_UTC()
+            exp_in_epoch, expiration_date = generate_ISO8601_UTC(seconds_in_one_year)
+            status_list_vc = {
+                "@context": [
+                    "https://www.w3.org/2018/credentials/v1",
+                    "https://w3id.org/vc/status-list/2021/v1",
+                ],
                 "id": credential_list_url,
-                "type": "StatusList2021",
-                "statusPurpose": "revocation",
-                "encodedList": revocation_list.encoded_status_list,
-            },
-            "credentialSchema": [
-                {
-                    "id": schema,
-                    "type": "FullJsonSchemaValidator2021",
-                }
-            ],
-        }
+                "type": [
+                    "VerifiableCredential",
+                    "VerifiableAttestation",
+                    "StatusList2021Credential",
+                ],
+                "issuer": self.ebsi_did.did,
+                "issuanceDate": issuance_date,
+                "issued": issuance_date,
+                "validFrom": issuance_date,
+                "expirationDate": expiration_date,
+                "validUntil": expiration_date,
+                "credentialSubject": {
+                    "id": credential_list_url,
+                    "type": "StatusList2021",
+                    "statusPurpose": "revocation",
+                    "encodedList": encoded_status_list,
+                },
+                "credentialSchema": [
+                    {
+                        "id": schema,
+                        "type": "FullJsonSchemaValidator2021",
+                    }
+                ],
+            }
 
-        # terms_of_use = {
-        #     "termsOfUse": {
-        #         "id": f"https://api-conformance.ebsi.eu/trusted-issuers-registry/v4/issuers/{self.ebsi_did.did}/attributes/{reserved_attribute_id}",
-        #         "type": "IssuanceCertificate",
-        #     },
-        # }
+            # terms_of_use = {
+            #     "termsOfUse": {
+            #         "id": f"https://api-conformance.ebsi.eu/trusted-issuers-registry/v4/issuers/{self.ebsi_did.did}/attributes/{reserved_attribute_id}",
+            #         "type": "IssuanceCertificate",
+            #     },
+            # }
+
+            to_be_issued_credential = await run_signing(
+                create_credential_token,
+                vc=status_list_vc,
+                jti=credential_list_url,
+                sub=credential_list_url,
+                iss=self.ebsi_did.did,
+                kid=kid,
+                key=key,
+                iat=iss_in_epoch,
+                exp=exp_in_epoch,
+            )
+            return to_be_issued_credential, exp_in_epoch
 
-        key = self.key_did._key
-        to_be_issued_credential = create_credential_token(
-            vc=status_list_vc,
-            jti=credential_list_url,
-            sub=credential_list_url,
-            iss=self.ebsi_did.did,
-            kid=f"{self.ebsi_did.did}#{key.key_id}",
-            key=key,
-            iat=iss_in_epoch,
-            exp=exp_in_epoch,
-        )
-        credential_response = CredentialResponse(
-            format="jwt_vc", credential=to_be_issued_credential
+        # Signed again only when the list or the signing key changes
+        return await status_list_engine.get_signed_status_list(
+            status_list_index, updated_at, kid, sign
         )
-        return credential_response.to_dict()
 
     async def revoke_verifiable_accreditation(self, attribute_id: str, did: str):
         ebsi_auth_client = AuthorisationService(
@@ -1967,7 +1998,7 @@ class OrganisationService:
             self.credential_offer_repository is not None
         ), "Credential offer repository not found"
 
-        with self.credential_offer_repository as offer_repo, self.credential_revocation_status_list_repository as revocation_repo:
+        with self.credential_offer_repository as offer_repo:
             credential_offer_entity = offer_repo.get_by_id_and_credential_schema_id(
                 credential_offer_id, data_agreement_id
             )
@@ -2003,30 +2034,91 @@ class OrganisationService:
                     did=credential_offer_entity.did,
                 )
             else:
-                revocation_list: CredentialRevocationStatusListModel = (
-                    credential_offer_entity.credential_revocation_status_list
+                credential_offer_entity = offer_repo.update(
+                    id=credential_offer_id, is_revoked=is_revoked
                 )
 
-                encoded_bitstring = update_w3c_vc_statuslist_encoded_bitstring(
-                    encoded_bitstring=revocation_list.encoded_status_list,
-                    credential_statuses=[
+                # Batched with concurrent revocations of the same list
+                await status_list_engine.update_statuses(
+                    credential_offer_entity.credential_revocation_status_list_id,
+                    [
                         CredentialStatus(
                             status_list_index=credential_offer_entity.credential_revocation_status_list_index,
                             is_revoked=is_revoked,
                         )
                     ],
+                    self.credential_revocation_status_list_repository_factory,
                 )
 
-                credential_offer_entity = offer_repo.update(
-                    id=credential_offer_id, is_revoked=is_revoked
+            return credential_offer_entity.to_dict()
+
+    async def update_revocation_status_for_credential_offers(
+        self,
+        data_agreement_id: str,
+        credential_offer_ids: List[str],
+        is_revoked: bool,
+    ) -> dict:
+        assert (
+            self.credential_offer_repository is not None
+        ), "Credential offer repository not found"
+        assert (
+            self.credential_revocation_status_list_repository is not None
+        ), "Credential revocation status list repository not found"
+
+        credential_offer_ids = list(dict.fromkeys(credential_offer_ids))
+        with self.credential_offer_repository as offer_repo:
+            credential_offers = {
+                str(credential_offer_entity.id): credential_offer_entity
+                for credential_offer_entity in offer_repo.get_all_by_ids_and_credential_schema_id(
+                    credential_offer_ids, data_agreement_id
                 )
+            }
 
-                revocation_list = revocation_repo.update(
-                    id=credential_offer_entity.credential_revocation_status_list_id,
-                    encoded_status_list=encoded_bitstring,
+        updated = []
+        errors = []
+        credential_statuses_by_status_list_id: Dict[str, List[CredentialStatus]] = {}
+        for credential_offer_id in credential_offer_ids:
+            credential_offer_entity = credential_offers.get(credential_offer_id)
+            if credential_offer_entity is None:
+                error = f"Credential offer with id {credential_offer_id} not found"
+            elif not credential_offer_entity.supports_revocation:
+                error = f"Credential offer with id {credential_offer_id} does not support revocation"
+            elif (
+                credential_offer_entity.credential_status
+                == CredentialStatuses.Pending.value
+            ):
+                error = f"Credential offer with id {credential_offer_id} is in pending state"
+            elif (
+                credential_offer_entity.trusted_issuer_attribute_id is not None
+                or credential_offer_entity.trusted_accreditation_organisation_attribute_id
+                is not None
+            ):
+                # Accreditations are revoked on the ledger, one at a time
+                error = f"Credential offer with id {credential_offer_id} must be revoked individually"
+            else:
+                credential_statuses_by_status_list_id.setdefault(
+                    str(credential_offer_entity.credential_revocation_status_list_id),
+                    [],
+                ).append(
+                    CredentialStatus(
+                        status_list_index=credential_offer_entity.credential_revocation_status_list_index,
+                        is_revoked=is_revoked,
+                    )
                 )
+                updated.append(credential_offer_id)
+                continue
 
-            return credential_offer_entity.to_dict()
+            errors.append({"credential_offer_id": credential_offer_id, "error": error})
+
+        if updated:
+            with self.credential_revocation_status_list_repository as revocation_repo:
+                revocation_repo.update_revocation_statuses(
+                    credential_offer_ids=updated,
+                    credential_statuses_by_status_list_id=credential_statuses_by_status_list_id,
+                    is_revoked=is_revoked,
+                )
+
+        return {"updated": updated, "errors": errors}
 
     async def update_deferred_credential_offer_with_data_attribute_values(
         self,
@@ -2616,9 +2708,12 @@ class OrganisationService:
             iat = int(time.time())
             exp = iat + 3600
 
-            with self.credential_offer_repository as credential_offer_repo, self.credential_revocation_status_list_repository as revocation_repo:
-                if supports_revocation:
-                    revocation_list = revocation_repo.reserve_revocation_index()
+            if supports_revocation:
+                revocation_index = revocation_index_allocator.allocate(
+                    self.credential_revocation_status_list_repository_factory
+                )
+
+            with self.credential_offer_repository as credential_offer_repo:
                 credential_offer_entity = credential_offer_repo.create(
                     data_agreement_id=data_agreement_model.id,
                     data_attribute_values=data_attribute_values
@@ -2633,17 +2728,18 @@ class OrganisationService:
                     else CredentialStatuses.Pending.value,
                     supports_revocation=supports_revocation,
                     is_revoked=False,
-                    credential_revocation_status_list_index=revocation_list.last_assigned_index
+                    credential_revocation_status_list_index=revocation_index.status_list_index
                     if supports_revocation
                     else -1,
-                    credential_revocation_status_list_id=revocation_list.id
+                    credential_revocation_status_list_id=revocation_index.status_list_id
                     if supports_revocation
                     else None,
                     trust_framework=trust_framework.value if trust_framework else None,
                 )
 
                 if is_pre_authorised:
-                    pre_authorised_code = IssuerService.create_pre_authorised_code(
+                    pre_authorised_code = await run_signing(
+                        IssuerService.create_pre_authorised_code,
                         iss=self.key_did.did,
                         aud=self.key_did.did,
                         sub=self.key_did.did,
@@ -2660,7 +2756,8 @@ class OrganisationService:
                         pre_authorised_code=pre_authorised_code,
                     )
                 else:
-                    issuer_state = IssuerService.create_issuer_state(
+                    issuer_state = await run_signing(
+                        IssuerService.create_issuer_state,
                         iss=self.key_did.did,
                         aud=self.key_did.did,
                         sub=self.key_did.did,
@@ -2952,7 +3049,8 @@ class OrganisationService:
             exp = iat + 86400
             nonce = str(uuid.uuid4())
 
-            access_token = AuthorisationService.create_access_token(
+            access_token = await run_signing(
+                AuthorisationService.create_access_token,
                 iss=self.key_did.did,
                 aud=self.key_did.did,
                 sub=client_id,
@@ -1,14 +1,16 @@
+import asyncio
 import json
 import time
 import urllib.parse
 import uuid
 from datetime import datetime
 from logging import Logger
-from typing import List, Optional, Tuple, Union
+from typing import AsyncIterator, List, Optional, Tuple, Union
 
 from eth_account import Account
 from eth_account.signers.local import LocalAccount
 from jsonschema import exceptions, validate
+from jsonschema.validators import validator_for
 from jwcrypto import jwk
 
 from eudi_wallet.ebsi.exceptions.application.organisation import (
@@ -44,6 +46,7 @@ from eudi_wallet.ebsi.repositories.v2.issue_credential_record import (
     SqlAlchemyIssueCredentialRecordRepository,
 )
 from eudi_wallet.ebsi.repositories.organisation import SqlAlchemyOrganisationRepository
+from eudi_wallet.ebsi.repositories.pagination import Page, PageQuery
 from eudi_wallet.ebsi.services.domain.authorisation import AuthorisationService
 from eudi_wallet.ebsi.services.domain.did_registry import DIDRegistryService
 from eudi_wallet.ebsi.services.domain.issuer import IssuerService
@@ -51,9 +54,14 @@ from eudi_wallet.ebsi.services.domain.utils.authn import generate_code_challenge
 from eudi_wallet.ebsi.services.domain.utils.credential import (
     create_credential_token,
 )
-from eudi_wallet.ebsi.services.domain.utils.did import generate_and_store_did_v2
+from eudi_wallet.ebsi.services.domain.utils.did import (
+    generate_and_store_did_v2,
+    get_or_generate_did_v2,
+)
+from eudi_wallet.ebsi.utils.organisation_cache import organisation_cache
 from eudi_wallet.ebsi.utils.date_time import generate_ISO8601_UTC
 from eudi_wallet.ebsi.utils.jwt import decode_header_and_claims_in_jwt
+from eudi_wallet.ebsi.utils.signing import run_signing
 from eudi_wallet.ebsi.value_objects.application.organisation import (
     DataAgreementExchangeModes,
 )
@@ -68,13 +76,14 @@ from eudi_wallet.ebsi.value_objects.domain.discovery import (
 from eudi_wallet.ebsi.value_objects.domain.issuer import (
     AcceptanceTokenResponse,
     CredentialIssuanceModes,
+    CredentialOfferRequest,
     CredentialResponse,
     CredentialStatuses,
     CredentialTypes,
     IssuerTrustFrameworks,
     CredentialOfferStatuses,
 )
-from eudi_wallet.ebsi.utils.webhook import send_webhook
+from eudi_wallet.ebsi.utils.webhook import send_webhook, send_webhooks
 
 from sdjwt.sdjwt import (
     create_w3c_vc_sd_jwt,
@@ -85,8 +94,41 @@ from eudi_wallet.ebsi.utils.common import (
     convert_data_attributes_to_json_schema,
     convert_data_attributes_to_credential,
     convert_data_attributes_raw_list_to_data_attributes_list,
+    validate_data_attribute_schema_against_data_attribute_values,
 )
 
+# Credential offer codes signed per executor job in batch issuance
+SIGNING_BATCH_SIZE = 500
+
+
+def sign_credential_offer_codes(
+    credential_offers: List[Tuple[str, bool]], did: str, kid: str, key: jwk.JWK
+) -> List[str]:
+    """Pre-authorised code or issuer state for each (id, is pre-authorised)"""
+    iat = int(time.time())
+    exp = iat + 3600
+    codes = []
+    for credential_offer_id, is_pre_authorised in credential_offers:
+        create_code = (
+            IssuerService.create_pre_authorised_code
+            if is_pre_authorised
+            else IssuerService.create_issuer_state
+        )
+        codes.append(
+            create_code(
+                iss=did,
+                aud=did,
+                sub=did,
+                iat=iat,
+                nbf=iat,
+                exp=exp,
+                kid=kid,
+                key=key,
+                credential_offer_id=credential_offer_id,
+            )
+        )
+    return codes
+
 
 class V2OrganisationService:
     def __init__(
@@ -122,16 +164,48 @@ class V2OrganisationService:
         assert (
             self.legal_entity_repository is not None
         ), "Legal entity repository not found"
-        with self.legal_entity_repository as repo:
-            return repo.get_by_id(id=organisation_id)
 
-    async def set_cryptographic_seed(self, crypto_seed: str, salt: str) -> None:
-        self.crypto_seed = crypto_seed
+        async def load() -> Union[OrganisationModel, None]:
+            async with self.legal_entity_repository as repo:
+                return await repo.get_by_id(id=organisation_id)
+
+        # Read on every request to an organisation endpoint
+        return await organisation_cache.get_organisation(organisation_id, load)
+
+    async def get_data_agreement(
+        self, organisation_id: str, data_agreement_id: str
+    ) -> Union[V2DataAgreementModel, None]:
+        assert (
+            self.data_agreement_repository is not None
+        ), "Data agreement repository not found"
 
-        self.eth, self.ebsi_did, self.key_did = await generate_and_store_did_v2(
-            crypto_seed=self.crypto_seed, salt=salt
+        async def load() -> Union[V2DataAgreementModel, None]:
+            async with self.data_agreement_repository as repo:
+                return await repo.get_by_id_and_organisation_id(
+                    organisation_id=organisation_id, id=data_agreement_id
+                )
+
+        return await organisation_cache.get_data_agreement(
+            organisation_id, data_agreement_id, load
         )
 
+    async def set_cryptographic_seed(
+        self, crypto_seed: str, salt: str, organisation_id: Optional[str] = None
+    ) -> None:
+        self.crypto_seed = crypto_seed
+
+        if organisation_id is not None:
+            # Key derivation is expensive, reuse the cached key material
+            self.eth, self.ebsi_did, self.key_did = await get_or_generate_did_v2(
+                organisation_id=organisation_id,
+                crypto_seed=self.crypto_seed,
+                salt=salt,
+            )
+        else:
+            self.eth, self.ebsi_did, self.key_did = await generate_and_store_did_v2(
+                crypto_seed=self.crypto_seed, salt=salt
+            )
+
     async def set_entity(
         self,
         legal_entity_entity: Optional[OrganisationModel] = None,
@@ -164,9 +238,9 @@ class V2OrganisationService:
         iat = int(time.time())
         exp = iat + 3600
 
-        with self.issue_credential_record_repository as credential_offer_repo:
+        async with self.issue_credential_record_repository as credential_offer_repo:
             credential_offer_entity = (
-                credential_offer_repo.create_without_data_agreement(
+                await credential_offer_repo.create_without_data_agreement(
                     organisation_id=organisation_id,
                     issuance_mode=issuance_mode.value,
                     is_pre_authorised=is_pre_authorised,
@@ -183,7 +257,8 @@ class V2OrganisationService:
             )
 
             if is_pre_authorised:
-                pre_authorised_code = IssuerService.create_pre_authorised_code(
+                pre_authorised_code = await run_signing(
+                    IssuerService.create_pre_authorised_code,
                     iss=self.key_did.did,
                     aud=self.key_did.did,
                     sub=self.key_did.did,
@@ -195,12 +270,13 @@ class V2OrganisationService:
                     credential_offer_id=str(credential_offer_entity.id),
                 )
 
-                credential_offer_entity = credential_offer_repo.update(
+                credential_offer_entity = await credential_offer_repo.update(
                     id=credential_offer_entity.id,
                     preAuthorisedCode=pre_authorised_code,
                 )
             else:
-                issuer_state = IssuerService.create_issuer_state(
+                issuer_state = await run_signing(
+                    IssuerService.create_issuer_state,
                     iss=self.key_did.did,
                     aud=self.key_did.did,
                     sub=self.key_did.did,
@@ -212,12 +288,12 @@ class V2OrganisationService:
                     credential_offer_id=str(credential_offer_entity.id),
                 )
 
-                credential_offer_entity = credential_offer_repo.update(
+                credential_offer_entity = await credential_offer_repo.update(
                     id=credential_offer_entity.id, issuerState=issuer_state
                 )
         if self.legal_entity_entity.webhook_url:
             try:
-                send_webhook(
+                await send_webhook(
                     self.legal_entity_entity.webhook_url,
                     credential_offer_entity.to_dict(),
                 )
@@ -239,18 +315,14 @@ class V2OrganisationService:
         assert (
             self.issue_credential_record_repository is not None
         ), "Issue credential record repository not found"
-        assert (
-            self.data_agreement_repository is not None
-        ), "Data agreement repository not found"
 
-        with self.data_agreement_repository as repo:
-            data_agreement_model = repo.get_by_id_and_organisation_id(
-                organisation_id=organisation_id, id=data_agreement_id
+        data_agreement_model = await self.get_data_agreement(
+            organisation_id=organisation_id, data_agreement_id=data_agreement_id
+        )
+        if not data_agreement_model:
+            raise CreateCredentialOfferError(
+                f"Credential schema with id {data_agreement_id} not found"
             )
-            if not data_agreement_model:
-                raise CreateCredentialOfferError(
-                    f"Credential schema with id {data_agreement_id} not found"
-                )
 
         if (
             data_agreement_model.methodOfUse
@@ -308,8 +380,8 @@ class V2OrganisationService:
             iat = int(time.time())
             exp = iat + 3600
 
-            with self.issue_credential_record_repository as credential_offer_repo:
-                credential_offer_entity = credential_offer_repo.create(
+            async with self.issue_credential_record_repository as credential_offer_repo:
+                credential_offer_entity = await credential_offer_repo.create(
                     data_agreement_id=data_agreement_model.id,
                     organisation_id=organisation_id,
                     data_attribute_values=(
@@ -328,7 +400,8 @@ class V2OrganisationService:
                 )
 
                 if is_pre_authorised:
-                    pre_authorised_code = IssuerService.create_pre_authorised_code(
+                    pre_authorised_code = await run_signing(
+                        IssuerService.create_pre_authorised_code,
                         iss=self.key_did.did,
                         aud=self.key_did.did,
                         sub=self.key_did.did,
@@ -340,12 +413,13 @@ class V2OrganisationService:
                         credential_offer_id=str(credential_offer_entity.id),
                     )
 
-                    credential_offer_entity = credential_offer_repo.update(
+                    credential_offer_entity = await credential_offer_repo.update(
                         id=credential_offer_entity.id,
                         preAuthorisedCode=pre_authorised_code,
                     )
                 else:
-                    issuer_state = IssuerService.create_issuer_state(
+                    issuer_state = await run_signing(
+                        IssuerService.create_issuer_state,
                         iss=self.key_did.did,
                         aud=self.key_did.did,
                         sub=self.key_did.did,
@@ -357,12 +431,12 @@ class V2OrganisationService:
                         credential_offer_id=str(credential_offer_entity.id),
                     )
 
-                    credential_offer_entity = credential_offer_repo.update(
+                    credential_offer_entity = await credential_offer_repo.update(
                         id=credential_offer_entity.id, issuerState=issuer_state
                     )
             if self.legal_entity_entity.webhook_url:
                 try:
-                    send_webhook(
+                    await send_webhook(
                         self.legal_entity_entity.webhook_url,
                         credential_offer_entity.to_dict(),
                     )
@@ -374,6 +448,148 @@ class V2OrganisationService:
             )
         return credential_offer_entity.to_dict()
 
+    async def issue_credential_records(
+        self,
+        data_agreement_id: str,
+        organisation_id: str,
+        credential_offer_requests: List[CredentialOfferRequest],
+    ) -> List[dict]:
+        """Create many credential offers for one data agreement at once.
+
+        The data agreement is read and its schema compiled once, records are
+        inserted in bulk and their codes are signed in the executor. Nothing
+        is created if any of the offers is invalid.
+        """
+        assert (
+            self.issue_credential_record_repository is not None
+        ), "Issue credential record repository not found"
+
+        data_agreement_model = await self.get_data_agreement(
+            organisation_id=organisation_id, data_agreement_id=data_agreement_id
+        )
+        if not data_agreement_model:
+            raise CreateCredentialOfferError(
+                f"Credential schema with id {data_agreement_id} not found"
+            )
+
+        if (
+            data_agreement_model.methodOfUse
+            != DataAgreementExchangeModes.DataSource.value
+        ):
+            raise exceptions.ValidationError(
+                "Data agreement method of use is not data source"
+            )
+
+        data_attributes_schema = convert_data_attributes_to_json_schema(
+            data_agreement_model.dataAttributes
+        )
+        data_attributes_validator = validator_for(data_attributes_schema)(
+            data_attributes_schema
+        )
+
+        records = []
+        for index, credential_offer_request in enumerate(credential_offer_requests):
+            if (
+                credential_offer_request.is_pre_authorised
+                and not credential_offer_request.user_pin
+            ):
+                raise UserPinRequiredError(
+                    f"Credential offer {index}: User pin is required for pre-authorised credential offers"
+                )
+
+            data_attribute_values = credential_offer_request.data_attribute_values
+            if (
+                credential_offer_request.issuance_mode == CredentialIssuanceModes.InTime
+                and not data_attribute_values
+            ):
+                raise CreateCredentialOfferError(
+                    f"Credential offer {index}: Data attribute values are required for in time issuance"
+                )
+
+            if data_attribute_values:
+                try:
+                    validate_data_attribute_schema_against_data_attribute_values(
+                        data_agreement_model.dataAttributes, data_attribute_values
+                    )
+                except ValueError as e:
+                    raise CreateCredentialOfferError(
+                        f"Credential offer {index}: {e}"
+                    )
+                error = exceptions.best_match(
+                    data_attributes_validator.iter_errors(
+                        convert_data_attributes_to_credential(data_attribute_values)
+                    )
+                )
+                if error is not None:
+                    raise CreateCredentialOfferError(
+                        f"Credential offer {index}: {error.message}"
+                    )
+
+            records.append(
+                {
+                    "id": uuid.uuid4(),
+                    "dataAgreementId": data_agreement_model.id,
+                    "organisationId": organisation_id,
+                    "dataAttributeValues": (
+                        data_attribute_values if data_attribute_values else None
+                    ),
+                    "issuanceMode": credential_offer_request.issuance_mode.value,
+                    "isPreAuthorised": credential_offer_request.is_pre_authorised,
+                    "userPin": credential_offer_request.user_pin,
+                    "credentialStatus": (
+                        CredentialStatuses.Ready.value
+                        if data_attribute_values
+                        else CredentialStatuses.Pending.value
+                    ),
+                    "status": CredentialOfferStatuses.OfferSent.value,
+                    "limitedDisclosure": credential_offer_request.limited_disclosure,
+                    "preAuthorisedCode": None,
+                    "issuerState": None,
+                }
+            )
+
+        # Codes carry the record id, so they are signed before the insert
+        # instead of updating every record afterwards
+        signed_batches = await asyncio.gather(
+            *(
+                run_signing(
+                    sign_credential_offer_codes,
+                    credential_offers=[
+                        (str(record["id"]), record["isPreAuthorised"])
+                        for record in records[offset : offset + SIGNING_BATCH_SIZE]
+                    ],
+                    did=self.key_did.did,
+                    kid=f"{self.key_did.did}#{self.key_did._method_specific_id}",
+                    key=self.key_did._key,
+                )
+                for offset in range(0, len(records), SIGNING_BATCH_SIZE)
+            )
+        )
+        codes = [code for signed_batch in signed_batches for code in signed_batch]
+        for record, code in zip(records, codes):
+            if record["isPreAuthorised"]:
+                record["preAuthorisedCode"] = code
+            else:
+                record["issuerState"] = code
+
+        async with self.issue_credential_record_repository as credential_offer_repo:
+            credential_offer_entities = await credential_offer_repo.create_many(
+                records
+            )
+
+        credential_offers = [
+            credential_offer_entity.to_dict()
+            for credential_offer_entity in credential_offer_entities
+        ]
+        if self.legal_entity_entity.webhook_url:
+            try:
+                await send_webhooks(
+                    self.legal_entity_entity.webhook_url, credential_offers
+                )
+            except Exception:
+                self.logger.error("Exception occurred during sending webhooks")
+        return credential_offers
+
     async def get_credential_offer_without_data_agreement(
         self,
         credential_offer_entity,
@@ -436,8 +652,8 @@ class V2OrganisationService:
     ) -> dict:
         # https://openid.net/specs/openid-4-verifiable-credential-issuance-1_0.html#section-4.1.3
 
-        with self.issue_credential_record_repository as repo:
-            credential_offer_entity = repo.get_by_id(credential_offer_id)
+        async with self.issue_credential_record_repository as repo:
+            credential_offer_entity = await repo.get_by_id(credential_offer_id)
             data_agreement_model: V2DataAgreementModel = (
                 credential_offer_entity.dataAgreement
             )
@@ -491,7 +707,7 @@ class V2OrganisationService:
                             AuthorisationGrants.AuthorisationCode.value.grant_data: credential_offer_entity.issuerState
                         }
                     }
-            credential_offer_entity = repo.update(
+            credential_offer_entity = await repo.update(
                 id=credential_offer_entity.id,
                 status=CredentialOfferStatuses.OfferReceived.value,
                 isAccessed=True,
@@ -499,7 +715,7 @@ class V2OrganisationService:
 
             if self.legal_entity_entity.webhook_url:
                 try:
-                    send_webhook(
+                    await send_webhook(
                         self.legal_entity_entity.webhook_url,
                         credential_offer_entity.to_dict(),
                     )
@@ -527,8 +743,8 @@ class V2OrganisationService:
 
             credential_offer_id = issuer_state_decoded.claims.get("credential_offer_id")
 
-            with self.issue_credential_record_repository as repo:
-                credential_offer_entity = repo.get_by_id(credential_offer_id)
+            async with self.issue_credential_record_repository as repo:
+                credential_offer_entity = await repo.get_by_id(credential_offer_id)
                 if credential_offer_entity is None:
                     raise UpdateCredentialOfferError(
                         f"Credential offer with id {credential_offer_id} not found"
@@ -539,7 +755,7 @@ class V2OrganisationService:
                         f"Credential offer with id {credential_offer_id} is already pre-authorized"
                     )
 
-                return repo.update(
+                return await repo.update(
                     credential_offer_id,
                     issuerState=issuer_state,
                     authorisationRequestState=authorisation_request_state,
@@ -563,8 +779,8 @@ class V2OrganisationService:
                     "authorization_details"
                 )[0].get("types")
 
-                with self.issue_credential_record_repository as repo:
-                    credential_offers = repo.get_all_by_client_id(client_id)
+                async with self.issue_credential_record_repository as repo:
+                    credential_offers = await repo.get_all_by_client_id(client_id)
                     if len(credential_offers) == 0:
                         raise UpdateCredentialOfferError(
                             f"Credential offer with client ID {client_id} not found"
@@ -586,7 +802,7 @@ class V2OrganisationService:
                         raise UpdateCredentialOfferError(
                             f"Credential offer with client ID {client_id} not found"
                         )
-                    credential_offer_entity = repo.update(
+                    credential_offer_entity = await repo.update(
                         credential_offer_entity.id,
                         issuerState=issuer_state,
                         authorisationRequestState=authorisation_request_state,
@@ -597,14 +813,14 @@ class V2OrganisationService:
                     )
                     return credential_offer_entity
             else:
-                with self.issue_credential_record_repository as repo:
-                    credential_offers = repo.get_all_by_client_id(client_id)
+                async with self.issue_credential_record_repository as repo:
+                    credential_offers = await repo.get_all_by_client_id(client_id)
                     if len(credential_offers) == 0:
                         raise UpdateCredentialOfferError(
                             f"Credential offer with client ID {client_id} not found"
                         )
                     credential_offer_entity = credential_offers[0]
-                    credential_offer_entity = repo.update(
+                    credential_offer_entity = await repo.update(
                         credential_offer_entity.id,
                         issuerState=issuer_state,
                         authorisationRequestState=authorisation_request_state,
@@ -666,8 +882,8 @@ class V2OrganisationService:
             key=key,
         )
         # Save state to credential offer.
-        with self.issue_credential_record_repository as repo:
-            repo.update(
+        async with self.issue_credential_record_repository as repo:
+            await repo.update(
                 id=credential_offer_id,
                 idTokenRequestState=state,
                 idTokenRequest=id_token_request,
@@ -705,9 +921,9 @@ class V2OrganisationService:
         # if did:key identifier then obtain from method specific id, else obtain from /jwks endpoint
 
         # Query credential offer by id_token request state
-        with self.issue_credential_record_repository as repo:
+        async with self.issue_credential_record_repository as repo:
             if id_token_response:
-                credential_offer_entity = repo.get_by_id_token_request_state(state)
+                credential_offer_entity = await repo.get_by_id_token_request_state(state)
                 if credential_offer_entity is None:
                     raise InvalidStateInIDTokenResponseError(
                         f"Invalid state {state} in ID token response"
@@ -721,7 +937,7 @@ class V2OrganisationService:
             # Create authorisation code and new state and save to db.
             authorisation_code = str(uuid.uuid4())
             authorisation_code_state = str(uuid.uuid4())
-            credential_offer_entity = repo.update(
+            credential_offer_entity = await repo.update(
                 id=credential_offer_entity.id,
                 authorisationCode=authorisation_code,
                 authorisationCodeState=authorisation_code_state,
@@ -755,7 +971,7 @@ class V2OrganisationService:
         ], "Invalid grant type"
 
         # Query credential offer by authorisation code
-        with self.issue_credential_record_repository as repo:
+        async with self.issue_credential_record_repository as repo:
             if grant_type == AuthorisationGrants.PreAuthorisedCode.value.grant_type:
                 assert user_pin is not None, "User pin not found"
                 assert pre_authorised_code is not None, "Pre-authorised code not found"
@@ -770,7 +986,7 @@ class V2OrganisationService:
                 credential_offer_id = pre_authorised_code_decoded.claims.get(
                     "credential_offer_id"
                 )
-                credential_offer_entity = repo.get_by_id(credential_offer_id)
+                credential_offer_entity = await repo.get_by_id(credential_offer_id)
                 if credential_offer_entity is None:
                     raise InvalidPreAuthorisedCodeError(
                         f"Invalid pre-authorised code {pre_authorised_code}"
@@ -782,7 +998,7 @@ class V2OrganisationService:
                 assert code is not None, "Code not found"
                 assert client_id is not None, "Client id not found"
 
-                credential_offer_entity = repo.get_by_authorisation_code(code)
+                credential_offer_entity = await repo.get_by_authorisation_code(code)
                 if credential_offer_entity is None:
                     raise InvalidAuthorisationCodeError(
                         f"Invalid authorisation code {code}"
@@ -813,7 +1029,8 @@ class V2OrganisationService:
             exp = iat + 86400
             nonce = str(uuid.uuid4())
 
-            access_token = AuthorisationService.create_access_token(
+            access_token = await run_signing(
+                AuthorisationService.create_access_token,
                 iss=self.key_did.did,
                 aud=self.key_did.did,
                 sub=client_id,
@@ -925,11 +1142,11 @@ class V2OrganisationService:
                 f"Access token is required for credential type {credential_type_to_be_issued}"
             )
 
-        with self.issue_credential_record_repository as repo:
+        async with self.issue_credential_record_repository as repo:
             decoded_claims = decode_header_and_claims_in_jwt(access_token)
 
             credential_offer_id = decoded_claims.claims.get("credential_offer_id")
-            credential_offer_entity = repo.get_by_id(credential_offer_id)
+            credential_offer_entity = await repo.get_by_id(credential_offer_id)
             if not credential_offer_entity:
                 raise InvalidAccessTokenError(f"Invalid access token {access_token}")
 
@@ -945,7 +1162,7 @@ class V2OrganisationService:
                 == CredentialIssuanceModes.Deferred.value
             ):
                 acceptance_token = str(uuid.uuid4())
-                credential_offer_entity = repo.update(
+                credential_offer_entity = await repo.update(
                     id=credential_offer_entity.id,
                     acceptanceToken=acceptance_token,
                 )
@@ -983,7 +1200,8 @@ class V2OrganisationService:
                     )
                     if credential_offer_entity.limitedDisclosure:
                         format = "vc+sd-jwt"
-                        to_be_issued_credential = create_w3c_vc_sd_jwt_for_data_attributes(
+                        to_be_issued_credential = await run_signing(
+                            create_w3c_vc_sd_jwt_for_data_attributes,
                             jti=jti,
                             iss=iss,
                             sub=sub,
@@ -1002,7 +1220,8 @@ class V2OrganisationService:
                     else:
                         format = "jwt_vc"
                         to_be_issued_credential = (
-                            create_w3c_vc_sd_jwt_for_data_attributes(
+                            await run_signing(
+                                create_w3c_vc_sd_jwt_for_data_attributes,
                                 credential_id=credential_id,
                                 credential_type=credential_type,
                                 credential_context=credential_context,
@@ -1021,7 +1240,7 @@ class V2OrganisationService:
                         )
 
                     # Update the credential offer entity with the DID of the client
-                    credential_offer_entity = repo.update(
+                    credential_offer_entity = await repo.update(
                         credential_offer_entity.id,
                         did=credential_offer_entity.clientId,
                         status=CredentialOfferStatuses.CredentialAcknowledged.value,
@@ -1032,7 +1251,7 @@ class V2OrganisationService:
                     )
                     if self.legal_entity_entity.webhook_url:
                         try:
-                            send_webhook(
+                            await send_webhook(
                                 self.legal_entity_entity.webhook_url,
                                 credential_offer_entity.to_dict(),
                             )
@@ -1060,7 +1279,8 @@ class V2OrganisationService:
                     sub = credential_offer_entity.clientId
                     if credential_offer_entity.disclosureMapping:
                         format = "vc+sd-jwt"
-                        to_be_issued_credential = create_w3c_vc_jwt_with_disclosure_mapping(
+                        to_be_issued_credential = await run_signing(
+                            create_w3c_vc_jwt_with_disclosure_mapping,
                             jti=jti,
                             iss=iss,
                             sub=sub,
@@ -1081,7 +1301,8 @@ class V2OrganisationService:
                     else:
                         format = "jwt_vc"
                         to_be_issued_credential = (
-                            create_w3c_vc_jwt_with_disclosure_mapping(
+                            await run_signing(
+                                create_w3c_vc_jwt_with_disclosure_mapping,
                                 jti=jti,
                                 iss=iss,
                                 sub=sub,
@@ -1102,7 +1323,7 @@ class V2OrganisationService:
                         )
 
                     # Update the credential offer entity with the DID of the client
-                    credential_offer_entity = repo.update(
+                    credential_offer_entity = await repo.update(
                         credential_offer_entity.id,
                         did=credential_offer_entity.clientId,
                         status=CredentialOfferStatuses.CredentialAcknowledged.value,
@@ -1113,7 +1334,7 @@ class V2OrganisationService:
                     )
                     if self.legal_entity_entity.webhook_url:
                         try:
-                            send_webhook(
+                            await send_webhook(
                                 self.legal_entity_entity.webhook_url,
                                 credential_offer_entity.to_dict(),
                             )
@@ -1132,8 +1353,8 @@ class V2OrganisationService:
                 "Acceptance token is required to issue deferred credential"
             )
 
-        with self.issue_credential_record_repository as repo:
-            credential_offer_entity = repo.get_by_acceptance_token(acceptance_token)
+        async with self.issue_credential_record_repository as repo:
+            credential_offer_entity = await repo.get_by_acceptance_token(acceptance_token)
             if not credential_offer_entity:
                 raise CredentialOfferNotFoundError("Credential offer not found")
 
@@ -1178,7 +1399,8 @@ class V2OrganisationService:
                 )
                 if credential_offer_entity.limitedDisclosure:
                     format = "vc+sd-jwt"
-                    to_be_issued_credential = create_w3c_vc_sd_jwt_for_data_attributes(
+                    to_be_issued_credential = await run_signing(
+                        create_w3c_vc_sd_jwt_for_data_attributes,
                         jti=jti,
                         iss=iss,
                         sub=sub,
@@ -1196,7 +1418,8 @@ class V2OrganisationService:
                     )
                 else:
                     format = "jwt_vc"
-                    to_be_issued_credential = create_w3c_vc_sd_jwt_for_data_attributes(
+                    to_be_issued_credential = await run_signing(
+                        create_w3c_vc_sd_jwt_for_data_attributes,
                         jti=jti,
                         iss=iss,
                         sub=sub,
@@ -1234,7 +1457,8 @@ class V2OrganisationService:
                 sub = credential_offer_entity.clientId
                 if credential_offer_entity.disclosureMapping:
                     format = "vc+sd-jwt"
-                    to_be_issued_credential = create_w3c_vc_jwt_with_disclosure_mapping(
+                    to_be_issued_credential = await run_signing(
+                        create_w3c_vc_jwt_with_disclosure_mapping,
                         jti=jti,
                         iss=iss,
                         sub=sub,
@@ -1253,7 +1477,8 @@ class V2OrganisationService:
                 else:
                     print(credential_subject)
                     format = "jwt_vc"
-                    to_be_issued_credential = create_w3c_vc_jwt_with_disclosure_mapping(
+                    to_be_issued_credential = await run_signing(
+                        create_w3c_vc_jwt_with_disclosure_mapping,
                         jti=jti,
                         iss=iss,
                         sub=sub,
@@ -1273,13 +1498,13 @@ class V2OrganisationService:
             credential_response = CredentialResponse(
                 format=format, credential=to_be_issued_credential
             )
-            credential_offer_entity = repo.update(
+            credential_offer_entity = await repo.update(
                 credential_offer_entity.id,
                 status=CredentialOfferStatuses.CredentialAcknowledged.value,
             )
             if self.legal_entity_entity.webhook_url:
                 try:
-                    send_webhook(
+                    await send_webhook(
                         self.legal_entity_entity.webhook_url,
                         credential_offer_entity.to_dict(),
                     )
@@ -1297,8 +1522,8 @@ class V2OrganisationService:
             self.issue_credential_record_repository is not None
         ), "Credential offer repository not found"
 
-        with self.issue_credential_record_repository as repo:
-            credential_offer_entity = repo.get_by_id(credential_offer_id)
+        async with self.issue_credential_record_repository as repo:
+            credential_offer_entity = await repo.get_by_id(credential_offer_id)
             if credential_offer_entity is None:
                 raise UpdateCredentialOfferError(
                     f"Credential offer with id {credential_offer_id} not found"
@@ -1337,7 +1562,7 @@ class V2OrganisationService:
                 ),
             )
 
-            credential_offer_entity = repo.update(
+            credential_offer_entity = await repo.update(
                 id=credential_offer_id,
                 credentialStatus=CredentialStatuses.Ready.value,
                 status=CredentialOfferStatuses.CredentialIssued.value,
@@ -1346,7 +1571,7 @@ class V2OrganisationService:
             )
             if self.legal_entity_entity.webhook_url:
                 try:
-                    send_webhook(
+                    await send_webhook(
                         self.legal_entity_entity.webhook_url,
                         credential_offer_entity.to_dict(),
                     )
@@ -1365,8 +1590,8 @@ class V2OrganisationService:
             self.issue_credential_record_repository is not None
         ), "Credential offer repository not found"
 
-        with self.issue_credential_record_repository as repo:
-            credential_offer_entity = repo.get_by_id_and_data_agreement_id(
+        async with self.issue_credential_record_repository as repo:
+            credential_offer_entity = await repo.get_by_id_and_data_agreement_id(
                 credential_offer_id, data_agreement_id
             )
             if credential_offer_entity is None:
@@ -1429,7 +1654,7 @@ class V2OrganisationService:
                 except exceptions.ValidationError as e:
                     raise UpdateCredentialOfferError(e.message)
 
-            credential_offer_entity = repo.update(
+            credential_offer_entity = await repo.update(
                 id=credential_offer_id,
                 dataAttributeValues=data_attribute_values,
                 credentialStatus=CredentialStatuses.Ready.value,
@@ -1438,7 +1663,7 @@ class V2OrganisationService:
             )
             if self.legal_entity_entity.webhook_url:
                 try:
-                    send_webhook(
+                    await send_webhook(
                         self.legal_entity_entity.webhook_url,
                         credential_offer_entity.to_dict(),
                     )
@@ -1453,8 +1678,8 @@ class V2OrganisationService:
         assert (
             self.issue_credential_record_repository is not None
         ), "Credential offer repository not found"
-        with self.issue_credential_record_repository as repo:
-            credential_offer_entity = repo.get_by_id(id=credential_offer_id)
+        async with self.issue_credential_record_repository as repo:
+            credential_offer_entity = await repo.get_by_id(id=credential_offer_id)
             return credential_offer_entity
 
     async def get_all_credential_offers_by_organisation_id(
@@ -1463,8 +1688,8 @@ class V2OrganisationService:
         assert (
             self.issue_credential_record_repository is not None
         ), "Credential offer repository not found"
-        with self.issue_credential_record_repository as repo:
-            return repo.get_all_by_organisation_id(organisation_id=organisation_id)
+        async with self.issue_credential_record_repository as repo:
+            return await repo.get_all_by_organisation_id(organisation_id=organisation_id)
 
     async def get_all_credential_offers_by_data_agreement_id(
         self, data_agreement_id: str
@@ -1472,16 +1697,44 @@ class V2OrganisationService:
         assert (
             self.issue_credential_record_repository is not None
         ), "Credential offer repository not found"
-        with self.issue_credential_record_repository as repo:
-            return repo.get_all_by_data_agreement_id(
+        async with self.issue_credential_record_repository as repo:
+            return await repo.get_all_by_data_agreement_id(
                 data_agreement_id=data_agreement_id
             )
 
+    async def get_credential_offers_page(
+        self,
+        organisation_id: str,
+        page_query: PageQuery,
+        data_agreement_id: Optional[str] = None,
+    ) -> Page:
+        assert (
+            self.issue_credential_record_repository is not None
+        ), "Credential offer repository not found"
+        async with self.issue_credential_record_repository as repo:
+            return await repo.get_page_by_organisation_id(
+                organisation_id=organisation_id,
+                page_query=page_query,
+                data_agreement_id=data_agreement_id,
+            )
+
+    async def stream_credential_offers(
+        self, organisation_id: str, page_query: PageQuery
+    ) -> AsyncIterator[IssueCredentialRecordModel]:
+        assert (
+            self.issue_credential_record_repository is not None
+        ), "Credential offer repository not found"
+        async with self.issue_credential_record_repository as repo:
+            async for credential_offer in repo.stream_by_organisation_id(
+                organisation_id=organisation_id, page_query=page_query
+            ):
+                yield credential_offer
+
     async def delete_credential_offer(
         self, credential_offer_id: str, organisation_id: str
     ) -> bool:
         assert (
             self.issue_credential_record_repository is not None
         ), "Credential offer repository not found"
-        with self.issue_credential_record_repository as repo:
-            return repo.delete(credential_offer_id, organisation_id)
+        async with self.issue_credential_record_repository as repo:
+            return await repo.delete(credential_offer_id, organisation_id)
@@ -14,11 +14,17 @@ from eudi_wallet.ebsi.exceptions.domain.issuer import (
 )
 from eudi_wallet.ebsi.services.domain.utils.jwt import get_alg_for_key
 from eudi_wallet.ebsi.utils.httpx_client import HttpxClient
+from eudi_wallet.ebsi.utils.poller import BackoffPolicy
 from eudi_wallet.ebsi.value_objects.domain.issuer import (
     CredentialResponse,
     SendCredentialRequest,
 )
 
+# Deferred credentials are issued out of band, possibly minutes later
+DEFERRED_CREDENTIAL_POLICY = BackoffPolicy(
+    initial=5.0, factor=2.0, max_interval=60.0, deadline=600.0
+)
+
 
 class IssuerService:
     def __init__(
@@ -45,13 +51,14 @@ class IssuerService:
             return res.status_code == 200
 
         async with HttpxClient(logger=self.logger) as http_client:
-            response = await http_client.call_every_n_seconds(
+            response = await http_client.call_with_backoff(
                 "post",
                 self.credential_deferred_endpoint,
                 is_credential_available,
                 {},
                 headers,
-                5,
+                DEFERRED_CREDENTIAL_POLICY,
+                "deferred_credential",
             )
         if response.status_code == 200:
             credential_dict = response.json()
@@ -7,6 +7,7 @@ from web3.auto import w3
 
 from eudi_wallet.ebsi.exceptions.domain.ledger import SendSignedTransactionError
 from eudi_wallet.ebsi.utils.httpx_client import HttpxClient
+from eudi_wallet.ebsi.utils.poller import BackoffPolicy
 from eudi_wallet.ebsi.value_objects.domain.ledger import (
     GetTransactionReceiptJSONRPC20RequestBody,
     SendSignedTransactionJSONRPC20RequestBody,
@@ -15,6 +16,12 @@ from eudi_wallet.ebsi.value_objects.domain.ledger import (
     TransactionReceiptJSONRPC20ResponseBody,
 )
 
+# Start close to the block time and back off gently, so that receipts are
+# picked up soon after the block is sealed without flooding the Besu RPC
+TRANSACTION_RECEIPT_POLICY = BackoffPolicy(
+    initial=1.0, factor=1.5, max_interval=5.0, deadline=120.0
+)
+
 
 class LedgerService:
     def __init__(
@@ -93,13 +100,14 @@ class LedgerService:
                     )
 
         async with HttpxClient(logger=self.logger) as http_client:
-            response = await http_client.call_every_n_seconds(
+            response = await http_client.call_with_backoff(
                 "post",
                 self.besu_rpc_endpoint,
                 check_transaction_result,
                 payload.to_json(),
                 headers,
-                5,
+                TRANSACTION_RECEIPT_POLICY,
+                "ledger_transaction_receipt",
             )
             # response = await http_client.post(
             #     self.besu_rpc_endpoint, payload.to_json(), headers
@@ -0,0 +1,52 @@
+import dataclasses
+import threading
+import typing
+
+# Indexes reserved from the database at a time
+BLOCK_SIZE = 1024
+
+
+@dataclasses.dataclass
+class RevocationIndex:
+    status_list_id: str
+    status_list_index: int
+
+
+class RevocationIndexAllocator:
+    """Hands out status list indexes from blocks reserved per process.
+
+    A block is reserved with one short transaction, so concurrent issuers
+    only meet on the status list row lock once per block instead of once
+    per credential. Indexes left in a block when the process stops are
+    never assigned, their bits stay unrevoked.
+    """
+
+    def __init__(self, block_size: int = BLOCK_SIZE):
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._status_list_id: typing.Optional[str] = None
+        self._next_index = 0
+        self._last_index = -1
+
+    def allocate(self, repository_factory: typing.Callable) -> RevocationIndex:
+        with self._lock:
+            if self._next_index > self._last_index:
+                with repository_factory() as revocation_repo:
+                    (
+                        self._status_list_id,
+                        self._next_index,
+                        self._last_index,
+                    ) = revocation_repo.reserve_revocation_index_block(
+                        self.block_size
+                    )
+
+            assert self._status_list_id is not None
+            revocation_index = RevocationIndex(
+                status_list_id=self._status_list_id,
+                status_list_index=self._next_index,
+            )
+            self._next_index += 1
+            return revocation_index
+
+
+revocation_index_allocator = RevocationIndexAllocator()
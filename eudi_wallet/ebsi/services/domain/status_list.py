@@ -0,0 +1,214 @@
+import asyncio
+import dataclasses
+import datetime
+import hashlib
+import time
+import typing
+
+from bitarray import bitarray
+
+from eudi_wallet.ebsi.exceptions.domain.issuer import (
+    CredentialRevocationStatusListNotFoundError,
+)
+from eudi_wallet.ebsi.models.credential_revocation_status_list import (
+    CredentialRevocationStatusListModel,
+)
+from eudi_wallet.ebsi.services.domain.utils.credential import (
+    CredentialStatus,
+    decode_bitstring,
+    encode_bitstring,
+)
+from eudi_wallet.ebsi.utils.cache import LRUCache
+
+# Seconds status changes are collected before a list is encoded and saved
+FLUSH_WINDOW = 0.1
+# Seconds before expiry at which a cached status list credential is re-signed
+RESIGN_BEFORE_EXPIRY = 7 * 86400
+# Seconds relying parties may reuse a status list credential without
+# revalidating it
+CACHE_MAX_AGE = 60
+
+
+@dataclasses.dataclass
+class SignedStatusList:
+    credential: str
+    key_id: str
+    # Version of the list that was signed
+    updated_at: datetime.datetime
+    expires_at: int
+    # Weak, derived from the list version and signing key rather than the
+    # signed bytes, which differ between workers and re-signs of a version.
+    # There is no Last-Modified, the list changes several times a second.
+    etag: str
+
+
+def status_list_etag(
+    list_id: typing.Any, updated_at: typing.Optional[datetime.datetime], key_id: str
+) -> str:
+    version = updated_at.isoformat() if updated_at is not None else ""
+    digest = hashlib.sha256(f"{list_id}:{version}:{key_id}".encode()).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+@dataclasses.dataclass
+class StatusListState:
+    bitstring: typing.Optional[bitarray] = None
+    # Version of the list the bitstring was decoded from
+    updated_at: typing.Optional[datetime.datetime] = None
+    pending: typing.Dict[int, bool] = dataclasses.field(default_factory=dict)
+    flush: typing.Optional[asyncio.Future] = None
+    lock: asyncio.Lock = dataclasses.field(default_factory=asyncio.Lock)
+    signed: typing.Optional[SignedStatusList] = None
+    # Signing in progress per signing key and list version
+    signing: typing.Dict[
+        typing.Tuple[str, typing.Optional[datetime.datetime]], asyncio.Task
+    ] = dataclasses.field(default_factory=dict)
+
+
+class StatusListEngine:
+    """Keeps hot revocation status lists decoded in memory.
+
+    Status changes are collected per list for a short flush window, then
+    applied to the in-memory bitstring, encoded and saved in one update no
+    matter how many credentials changed. Callers wait for the update that
+    includes their change to be committed. The signed status list
+    credential is reused until the list changes or nears expiry.
+    """
+
+    def __init__(self, maxsize: int = 64, flush_window: float = FLUSH_WINDOW):
+        self.lists = LRUCache(maxsize=maxsize)
+        self.flush_window = flush_window
+
+    def _get_state(self, list_id: typing.Any) -> StatusListState:
+        state = self.lists.get(str(list_id))
+        if state is None:
+            state = StatusListState()
+            self.lists.set(str(list_id), state)
+        return state
+
+    async def update_statuses(
+        self,
+        list_id: typing.Any,
+        credential_statuses: typing.List[CredentialStatus],
+        repository_factory: typing.Callable,
+    ) -> None:
+        state = self._get_state(list_id)
+        for credential_status in credential_statuses:
+            state.pending[credential_status.status_list_index] = (
+                credential_status.is_revoked
+            )
+
+        if state.flush is None:
+            loop = asyncio.get_running_loop()
+            state.flush = loop.create_future()
+            loop.call_later(
+                self.flush_window,
+                lambda: asyncio.ensure_future(
+                    self._flush(str(list_id), state, repository_factory)
+                ),
+            )
+        await asyncio.shield(state.flush)
+
+    async def _flush(
+        self,
+        list_id: str,
+        state: StatusListState,
+        repository_factory: typing.Callable,
+    ) -> None:
+        flush, state.flush = state.flush, None
+        pending, state.pending = state.pending, {}
+        assert flush is not None
+        try:
+            async with state.lock:
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(
+                    None, self._save, list_id, state, pending, repository_factory
+                )
+        except Exception as e:
+            flush.set_exception(e)
+        else:
+            flush.set_result(None)
+
+    def _save(
+        self,
+        list_id: str,
+        state: StatusListState,
+        pending: typing.Dict[int, bool],
+        repository_factory: typing.Callable,
+    ) -> None:
+        def encode(revocation_list: CredentialRevocationStatusListModel) -> str:
+            # Decode again only if another process changed the list
+            if state.bitstring is None or revocation_list.updated_at != state.updated_at:
+                state.bitstring = decode_bitstring(revocation_list.encoded_status_list)
+            for status_list_index, is_revoked in pending.items():
+                state.bitstring[status_list_index] = is_revoked
+            return encode_bitstring(state.bitstring)
+
+        try:
+            with repository_factory() as revocation_repo:
+                revocation_list = revocation_repo.update_encoded_status_list(
+                    list_id, encode
+                )
+        except Exception:
+            state.bitstring = None
+            raise
+
+        if revocation_list is None:
+            state.bitstring = None
+            raise CredentialRevocationStatusListNotFoundError("Status list not found")
+        state.updated_at = revocation_list.updated_at
+
+    async def get_signed_status_list(
+        self,
+        list_id: typing.Any,
+        updated_at: datetime.datetime,
+        key_id: str,
+        sign: typing.Callable[[], typing.Awaitable[typing.Tuple[str, int]]],
+    ) -> SignedStatusList:
+        """Return the signed credential for this version of the list.
+
+        `sign` resolves to the credential JWT and its expiry, and is only awaited
+        when there is no usable cached credential. Concurrent requests for the
+        same version wait on a single signing.
+        """
+        state = self._get_state(list_id)
+        signed = state.signed
+        if (
+            signed is not None
+            and signed.key_id == key_id
+            and signed.updated_at == updated_at
+            and signed.expires_at - time.time() >= RESIGN_BEFORE_EXPIRY
+        ):
+            return signed
+
+        version = (key_id, updated_at)
+        task = state.signing.get(version)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._sign(list_id, state, key_id, updated_at, sign)
+            )
+            state.signing[version] = task
+            task.add_done_callback(lambda _: state.signing.pop(version, None))
+        return await asyncio.shield(task)
+
+    async def _sign(
+        self,
+        list_id: typing.Any,
+        state: StatusListState,
+        key_id: str,
+        updated_at: datetime.datetime,
+        sign: typing.Callable[[], typing.Awaitable[typing.Tuple[str, int]]],
+    ) -> SignedStatusList:
+        credential, expires_at = await sign()
+        signed = SignedStatusList(
+            credential=credential,
+            key_id=key_id,
+            updated_at=updated_at,
+            expires_at=expires_at,
+            etag=status_list_etag(list_id, updated_at, key_id),
+        )
+        state.signed = signed
+        return signed
+
+
+status_list_engine = StatusListEngine()
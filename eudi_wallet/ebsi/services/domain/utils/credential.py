@@ -103,6 +103,16 @@ def initialise_bitstring() -> bitarray:
     return bitstring
 
 
+def encode_bitstring(bitstring: bitarray) -> str:
+    # Use gzip to compress the bitstring
+    compressed = gzip.compress(bitstring.tobytes())
+
+    # Base64-encode the compressed bitstring
+    encoded_bitstring = base64.b64encode(compressed).rstrip(b"=").decode("utf-8")
+
+    return encoded_bitstring
+
+
 def revoke_credentials_create_encoded_bitstring(
     bitstring: bitarray, credential_statuses: typing.List[CredentialStatus]
 ) -> str:
@@ -113,13 +123,7 @@ def revoke_credentials_create_encoded_bitstring(
             1 if credential_status.is_revoked else 0
         )
 
-    # Use gzip to compress the bitstring
-    compressed = gzip.compress(bitstring.tobytes())
-
-    # Base64-encode the compressed bitstring
-    encoded_bitstring = base64.b64encode(compressed).rstrip(b"=").decode("utf-8")
-
-    return encoded_bitstring
+    return encode_bitstring(bitstring)
 
 
 def generate_w3c_vc_statuslist_encoded_bitstring(
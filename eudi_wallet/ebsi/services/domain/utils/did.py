@@ -1,10 +1,39 @@
+import dataclasses
+import json
 import typing
 import hashlib
 
 from eudi_wallet.did_key import KeyDid, PublicKeyJWK
+from eudi_wallet.ebsi.utils.cache import LRUCache
 from eudi_wallet.ebsi_did import EbsiDid
 from eudi_wallet.ethereum import Ethereum
 
+# Maximum number of organisations whose key material is kept in memory
+DID_CACHE_MAX_SIZE = 1024
+
+# Organisation id -> (seed/salt fingerprint, (Ethereum, EbsiDid, KeyDid))
+_did_cache = LRUCache(maxsize=DID_CACHE_MAX_SIZE)
+
+# Seconds clients may reuse a JWKS, bounds how long a rotated key is served
+JWKS_MAX_AGE = 300
+
+# Organisation id, or seed fingerprint for the v1 legal entity
+# -> (seed/salt fingerprint, JWKS)
+_jwks_cache = LRUCache(maxsize=DID_CACHE_MAX_SIZE)
+
+
+@dataclasses.dataclass(frozen=True)
+class JWKS:
+    body: bytes
+    etag: str
+
+
+def _render_jwks(eth: Ethereum, key_did: KeyDid) -> JWKS:
+    body = json.dumps(
+        {"keys": [key_did.public_key_jwk, eth.public_key_to_jwk()]}
+    ).encode("utf-8")
+    return JWKS(body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
 
 async def generate_and_store_did(
     crypto_seed: str,
@@ -56,3 +85,64 @@ async def generate_and_store_did_v2(
     key_did.generate_did(public_key_jwk)
 
     return eth, ebsi_did, key_did
+
+
+def _crypto_seed_fingerprint(crypto_seed: str, salt: typing.Optional[str]) -> str:
+    # Salt is optional, so keep "no salt" distinct from an empty salt
+    material = f"{crypto_seed}\x00{'' if salt is None else 's:' + salt}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+async def get_or_generate_did_v2(
+    organisation_id: str,
+    crypto_seed: str,
+    salt: str = None,
+) -> typing.Tuple[Ethereum, EbsiDid, KeyDid]:
+    organisation_id = str(organisation_id)
+    fingerprint = _crypto_seed_fingerprint(crypto_seed, salt)
+
+    cached = _did_cache.get(organisation_id)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+
+    # Cache miss or the seed/salt of the organisation changed
+    dids = await generate_and_store_did_v2(crypto_seed=crypto_seed, salt=salt)
+    _did_cache.set(organisation_id, (fingerprint, dids))
+    return dids
+
+
+def invalidate_did_v2_cache(organisation_id: str) -> None:
+    _did_cache.pop(str(organisation_id))
+    _jwks_cache.pop(str(organisation_id))
+
+
+async def get_jwks(crypto_seed: str) -> JWKS:
+    """Serialised public keys of the legal entity, derived once per seed"""
+    fingerprint = _crypto_seed_fingerprint(crypto_seed, None)
+    cached = _jwks_cache.get(fingerprint)
+    if cached is not None:
+        return cached[1]
+
+    eth, _, key_did = await generate_and_store_did(crypto_seed)
+    jwks = _render_jwks(eth, key_did)
+    _jwks_cache.set(fingerprint, (fingerprint, jwks))
+    return jwks
+
+
+async def get_jwks_v2(
+    organisation_id: str, crypto_seed: str, salt: str = None
+) -> JWKS:
+    """Serialised public keys of an organisation, rendered again on key rotation"""
+    organisation_id = str(organisation_id)
+    fingerprint = _crypto_seed_fingerprint(crypto_seed, salt)
+
+    cached = _jwks_cache.get(organisation_id)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+
+    eth, _, key_did = await get_or_generate_did_v2(
+        organisation_id=organisation_id, crypto_seed=crypto_seed, salt=salt
+    )
+    jwks = _render_jwks(eth, key_did)
+    _jwks_cache.set(organisation_id, (fingerprint, jwks))
+    return jwks
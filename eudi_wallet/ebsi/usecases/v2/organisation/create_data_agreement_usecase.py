@@ -30,7 +30,7 @@ class CreateV2DataAgreementUsecase:
         else:
             return sentence
 
-    def execute(
+    async def execute(
         self,
         organisation_id: str,
         purpose: str,
@@ -51,14 +51,14 @@ class CreateV2DataAgreementUsecase:
             validate(instance=data_attributes_json_schema, schema=meta_schema_draft_7)
         except exceptions.ValidationError as e:
             raise CreateDataAgreementUsecaseError(e.message)
-        with self.dataagreement_repository as repo:
-            existing_agreement = repo.get_by_purpose_and_organisation_id(organisation_id, purpose)
+        async with self.dataagreement_repository as repo:
+            existing_agreement = await repo.get_by_purpose_and_organisation_id(organisation_id, purpose)
             if existing_agreement:
                 error_message = f"A data agreement with purpose '{purpose}' already exists."
                 self.logger.error(error_message)
                 raise CreateDataAgreementUsecaseError(error_message)
             
-            return repo.create(
+            return await repo.create(
                 organisation_id=organisation_id,
                 purpose=purpose,
                 data_attributes=data_attributes,
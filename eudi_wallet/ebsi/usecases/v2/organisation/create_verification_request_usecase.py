@@ -64,7 +64,7 @@ class CreateVerificationRequestUsecase:
         token.make_signed_token(key)
         return token.serialize()
 
-    def execute(
+    async def execute(
         self,
         key_did: KeyDid,
         domain: str,
@@ -123,8 +123,8 @@ class CreateVerificationRequestUsecase:
         redirection_url = f"openid4vp://?{encoded_params}"
 
         # Create verification record
-        with self.repository as repo:
-            verification_record = repo.create(
+        async with self.repository as repo:
+            verification_record = await repo.create(
                 id=verification_record_id,
                 organisation_id=organisation_id,
                 status=VerificationRecordStatus.RequestSent.value,
@@ -135,7 +135,7 @@ class CreateVerificationRequestUsecase:
 
         if webhook_url:
             try:
-                send_webhook(
+                await send_webhook(
                     webhook_url,
                     verification_record.to_dict(),
                     topic="/topic/present_proof/"
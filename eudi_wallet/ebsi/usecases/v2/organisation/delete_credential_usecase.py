@@ -18,13 +18,13 @@ class DeleteCredentialUsecase:
         self.repository = repository
         self.logger = logger
 
-    def execute(
+    async def execute(
         self,
         organisation_id: str,
         credential_id: str,
     ) -> CredentialModel:
-        with self.repository as repo:
-            is_deleted = repo.delete(id=credential_id, organisation_id=organisation_id)
+        async with self.repository as repo:
+            is_deleted = await repo.delete(id=credential_id, organisation_id=organisation_id)
             if not is_deleted:
                 raise DeleteCredentialUsecaseError("Credential is not found")
         return is_deleted
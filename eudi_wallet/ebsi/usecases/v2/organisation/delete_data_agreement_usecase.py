@@ -4,6 +4,7 @@ from typing import Optional
 from eudi_wallet.ebsi.repositories.v2.data_agreement import (
     SqlAlchemyV2DataAgreementRepository,
 )
+from eudi_wallet.ebsi.utils.organisation_cache import organisation_cache
 
 class V2DeleteDataAgreementUsecase:
     def __init__(
@@ -14,13 +15,18 @@ class V2DeleteDataAgreementUsecase:
         self.dataagreement_repository = dataagreement_repository
         self.logger = logger
 
-    def execute(
+    async def execute(
         self,
         organisation_id: str,
         data_agreement_id: str,
     ) -> bool:
-        with self.dataagreement_repository as repo:
-            return repo.delete_by_organisation_id(
+        async with self.dataagreement_repository as repo:
+            is_deleted = await repo.delete_by_organisation_id(
                 id=data_agreement_id,
                 organisation_id=organisation_id,
             )
+
+        await organisation_cache.invalidate_data_agreement(
+            organisation_id, data_agreement_id
+        )
+        return is_deleted
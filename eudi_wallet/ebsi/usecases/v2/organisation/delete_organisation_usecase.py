@@ -2,6 +2,8 @@ from logging import Logger
 
 from eudi_wallet.ebsi.models.organisation import OrganisationModel
 from eudi_wallet.ebsi.repositories.organisation import SqlAlchemyOrganisationRepository
+from eudi_wallet.ebsi.services.domain.utils.did import invalidate_did_v2_cache
+from eudi_wallet.ebsi.utils.organisation_cache import organisation_cache
 
 
 class DeleteOrganisationUsecase:
@@ -11,12 +13,16 @@ class DeleteOrganisationUsecase:
         self.organisation_repository = organisation_repository
         self.logger = logger
 
-    def execute(
+    async def execute(
         self,
         id: str,
     ) -> OrganisationModel:
         # Delete an organistion in db
-        with self.organisation_repository as repo:
-            return repo.delete(
+        async with self.organisation_repository as repo:
+            is_deleted = await repo.delete(
                 id=id,
             )
+
+        invalidate_did_v2_cache(id)
+        await organisation_cache.invalidate_organisation(id)
+        return is_deleted
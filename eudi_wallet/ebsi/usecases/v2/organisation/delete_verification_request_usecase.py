@@ -18,13 +18,13 @@ class DeleteVerificationRequestUsecase:
         self.repository = repository
         self.logger = logger
 
-    def execute(
+    async def execute(
         self,
         organisation_id: str,
         verification_record_id: str,
     ) -> VerificationRecordModel:
-        with self.repository as repo:
-            is_deleted = repo.delete(
+        async with self.repository as repo:
+            is_deleted = await repo.delete(
                 id=verification_record_id, organisation_id=organisation_id
             )
             if not is_deleted:
@@ -0,0 +1,28 @@
+from logging import Logger
+from typing import AsyncIterator, Optional
+from eudi_wallet.ebsi.repositories.pagination import PageQuery
+from eudi_wallet.ebsi.repositories.v2.credential import (
+    SqlAlchemyCredentialRepository,
+)
+
+
+class ExportCredentialUsecase:
+    def __init__(
+        self,
+        repository: SqlAlchemyCredentialRepository,
+        logger: Logger,
+    ) -> None:
+        self.repository = repository
+        self.logger = logger
+
+    async def execute(
+        self,
+        organisation_id: str,
+        page_query: Optional[PageQuery] = None,
+    ) -> AsyncIterator[dict]:
+        async with self.repository as repo:
+            async for credential in repo.stream_by_organisation_id(
+                organisation_id=organisation_id,
+                page_query=page_query or PageQuery(),
+            ):
+                yield credential.to_dict()
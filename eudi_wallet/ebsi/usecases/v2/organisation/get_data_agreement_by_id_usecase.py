@@ -16,12 +16,12 @@ class V2GetDataAgreementByIdUsecase:
         self.dataagreement_repository = dataagreement_repository
         self.logger = logger
 
-    def execute(
+    async def execute(
         self,
         organisation_id: str,
         data_agreement_id: str,
     ) -> V2DataAgreementModel:
-        with self.dataagreement_repository as repo:
-            return repo.get_by_id_and_organisation_id(
+        async with self.dataagreement_repository as repo:
+            return await repo.get_by_id_and_organisation_id(
                 organisation_id=organisation_id, id=data_agreement_id
             )
@@ -16,11 +16,11 @@ class V2ListAllDataAgreementsUsecase:
         self.dataagreement_repository = dataagreement_repository
         self.logger = logger
 
-    def execute(
+    async def execute(
         self,
         organisation_id: str,
     ) -> List[V2DataAgreementModel]:
-        with self.dataagreement_repository as repo:
-            return repo.get_all_by_organisation_id(
+        async with self.dataagreement_repository as repo:
+            return await repo.get_all_by_organisation_id(
                 organisation_id=organisation_id,
             )
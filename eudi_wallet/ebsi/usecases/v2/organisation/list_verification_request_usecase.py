@@ -1,6 +1,6 @@
 from logging import Logger
-from typing import List
-from eudi_wallet.ebsi.models.v2.verification_record import VerificationRecordModel
+from typing import Optional
+from eudi_wallet.ebsi.repositories.pagination import Page, PageQuery
 from eudi_wallet.ebsi.repositories.v2.verification_record import (
     SqlAlchemyVerificationRecordRepository,
 )
@@ -15,12 +15,14 @@ class ListVerificationRequestUsecase:
         self.repository = repository
         self.logger = logger
 
-    def execute(
+    async def execute(
         self,
         organisation_id: str,
-    ) -> List[VerificationRecordModel]:
-        with self.repository as repo:
-            verification_records = repo.get_all_by_organisation_id(
-                organisation_id=organisation_id
+        page_query: Optional[PageQuery] = None,
+    ) -> Page:
+        async with self.repository as repo:
+            verification_records = await repo.get_page_by_organisation_id(
+                organisation_id=organisation_id,
+                page_query=page_query or PageQuery(),
             )
         return verification_records
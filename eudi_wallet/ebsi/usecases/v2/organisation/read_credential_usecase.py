@@ -18,12 +18,12 @@ class ReadCredentialUsecase:
         self.repository = repository
         self.logger = logger
 
-    def execute(
+    async def execute(
         self,
         credential_id: str,
     ) -> CredentialModel:
-        with self.repository as repo:
-            credential = repo.get_by_id(id=credential_id)
+        async with self.repository as repo:
+            credential = await repo.get_by_id(id=credential_id)
             if credential is None:
                 raise ReadCredentialUsecaseError("Credential not found")
         return credential
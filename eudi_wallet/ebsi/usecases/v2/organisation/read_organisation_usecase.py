@@ -12,13 +12,13 @@ class ReadOrganisationUsecase:
         self.organisation_repository = organisation_repository
         self.logger = logger
 
-    def execute(
+    async def execute(
         self,
         id: str,
     ) -> OrganisationModel:
         # Read an organistion in db
-        with self.organisation_repository as repo:
+        async with self.organisation_repository as repo:
 
-            return repo.get_by_id(
+            return await repo.get_by_id(
                 id=id,
             )
@@ -20,26 +20,26 @@ class ReadVerificationRequestByReferenceUsecase:
         self.repository = repository
         self.logger = logger
 
-    def execute(
+    async def execute(
         self,
         verification_record_id: str,
         webhook_url: Optional[str] = None,
     ) -> VerificationRecordModel:
-        with self.repository as repo:
-            verification_record = repo.get_by_id(id=verification_record_id)
+        async with self.repository as repo:
+            verification_record = await repo.get_by_id(id=verification_record_id)
             if verification_record is None:
                 raise ReadVerificationRequestByReferenceUsecaseError(
                     "Verification request not found"
                 )
 
-            verification_record = repo.update(
+            verification_record = await repo.update(
                 id=verification_record.id,
                 status=VerificationRecordStatus.RequestReceived.value,
             )
 
             if webhook_url:
                 try:
-                    send_webhook(
+                    await send_webhook(
                         webhook_url,
                         verification_record.to_dict(),
                         topic="/topic/present_proof/",
@@ -18,12 +18,12 @@ class ReadVerificationRequestUsecase:
         self.repository = repository
         self.logger = logger
 
-    def execute(
+    async def execute(
         self,
         verification_record_id: str,
     ) -> VerificationRecordModel:
-        with self.repository as repo:
-            verification_record = repo.get_by_id(id=verification_record_id)
+        async with self.repository as repo:
+            verification_record = await repo.get_by_id(id=verification_record_id)
             if verification_record is None:
                 raise ReadVerificationRequestUsecaseError(
                     "Verification record not found"
@@ -58,8 +58,8 @@ class ReceiveCredentialUsecase:
             last_slash_index = credential_offer.rfind("/")
             credential_exchange_id = credential_offer[last_slash_index + 1 :]
 
-            with self.issue_credential_repository as issue_credential_repo:
-                credential_history = issue_credential_repo.get_by_id(
+            async with self.issue_credential_repository as issue_credential_repo:
+                credential_history = await issue_credential_repo.get_by_id(
                     id=credential_exchange_id
                 )
                 assert credential_history is not None
@@ -85,8 +85,8 @@ class ReceiveCredentialUsecase:
                 acceptance_token = credential_response.acceptance_token
         except ValidationError as e:
             raise ReceiveCredentialUsecaseError(json.dumps(e.errors()))
-        with self.repository as repo:
-            credential = repo.create(
+        async with self.repository as repo:
+            credential = await repo.create(
                 organisation_id=organisation_id,
                 status=status,
                 acceptance_token=(
@@ -103,7 +103,7 @@ class ReceiveCredentialUsecase:
             )
         if webhook_url:
             try:
-                send_webhook(
+                await send_webhook(
                     webhook_url, credential.to_dict(), topic="/topic/credential/"
                 )
             except Exception:
@@ -56,14 +56,14 @@ class ReceiveDeferredCredentialUsecase:
         organisation_id: str,
         webhook_url: Optional[str] = None,
     ) -> CredentialModel:
-        with self.repository as repo:
-            credential = repo.get_by_organisation_id_and_credential_id(
+        async with self.repository as repo:
+            credential = await repo.get_by_organisation_id_and_credential_id(
                 organisation_id=organisation_id,
                 credential_id=credential_id,
             )
 
-            with self.issue_credential_repository as issue_credential_repo:
-                credential_history = issue_credential_repo.get_by_id(
+            async with self.issue_credential_repository as issue_credential_repo:
+                credential_history = await issue_credential_repo.get_by_id(
                     id=credential.credentialExchangeId
                 )
                 assert credential_history is not None
@@ -93,7 +93,7 @@ class ReceiveDeferredCredentialUsecase:
                         credential_token
                     )
 
-                credential = repo.update(
+                credential = await repo.update(
                     id=credential.id,
                     credentialToken=credential_token,
                     credential=credential_decoded,
@@ -111,7 +111,7 @@ class ReceiveDeferredCredentialUsecase:
 
             if webhook_url:
                 try:
-                    send_webhook(
+                    await send_webhook(
                         webhook_url, credential.to_dict(), topic="/topic/credential/"
                     )
                 except Exception:
@@ -26,7 +26,7 @@ class ReceiveVpTokenUsecase:
         self.repository = repository
         self.logger = logger
 
-    def execute(
+    async def execute(
         self,
         organisation_id: str,
         state: str,
@@ -34,8 +34,8 @@ class ReceiveVpTokenUsecase:
         presentation_submission: dict,
         webhook_url: Optional[str] = None,
     ) -> Tuple[VerificationRecordModel]:
-        with self.repository as repo:
-            verification_record = repo.get_by_vp_token_request_state(
+        async with self.repository as repo:
+            verification_record = await repo.get_by_vp_token_request_state(
                 vp_token_request_state=state
             )
             assert verification_record is not None
@@ -56,7 +56,7 @@ class ReceiveVpTokenUsecase:
                 PresentationSubmissionValidationError,
                 PresentationDefinitionValidationError,
             ):
-                verification_record = repo.update(
+                verification_record = await repo.update(
                     id=verification_record.id,
                     organisationId=organisation_id,
                     status=VerificationRecordStatus.PresentationAck.value,
@@ -67,7 +67,7 @@ class ReceiveVpTokenUsecase:
 
                 if webhook_url:
                     try:
-                        send_webhook(
+                        await send_webhook(
                             webhook_url,
                             verification_record.to_dict(),
                             topic="/topic/present_proof/"
@@ -76,7 +76,7 @@ class ReceiveVpTokenUsecase:
                         self.logger.error("Exception occurred during sending webhook")
                 return verification_record
 
-            verification_record = repo.update(
+            verification_record = await repo.update(
                 id=verification_record.id,
                 organisationId=organisation_id,
                 status=VerificationRecordStatus.PresentationAck.value,
@@ -87,7 +87,7 @@ class ReceiveVpTokenUsecase:
 
             if webhook_url:
                 try:
-                    send_webhook(
+                    await send_webhook(
                         webhook_url,
                         verification_record.to_dict(),
                         topic="/topic/present_proof/"
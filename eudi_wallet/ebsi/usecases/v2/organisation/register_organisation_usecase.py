@@ -18,7 +18,7 @@ class RegisterOrganisationUsecase:
         self.organisation_repository = organisation_repository
         self.logger = logger
 
-    def execute(
+    async def execute(
         self,
         name: str,
         description: Optional[str] = None,
@@ -29,12 +29,12 @@ class RegisterOrganisationUsecase:
         cryptographic_seed: Optional[str] = None,
     ) -> OrganisationModel:
         # Create an organistion in db
-        with self.organisation_repository as repo:
+        async with self.organisation_repository as repo:
             # mnemo = Mnemonic("english")
             # seed_phrase = mnemo.generate(strength=256)
             if cryptographic_seed is None:
                 cryptographic_seed = str(time.time())
-            return repo.create(
+            return await repo.create(
                 name=name,
                 cryptographic_seed=cryptographic_seed,
                 description=description,
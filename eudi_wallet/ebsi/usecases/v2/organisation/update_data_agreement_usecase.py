@@ -11,6 +11,7 @@ from eudi_wallet.ebsi.repositories.v2.data_agreement import (
     SqlAlchemyV2DataAgreementRepository,
 )
 from eudi_wallet.ebsi.utils.jsonschema import meta_schema_draft_7
+from eudi_wallet.ebsi.utils.organisation_cache import organisation_cache
 from eudi_wallet.ebsi.utils.common import convert_data_attributes_to_json_schema
 
 
@@ -30,7 +31,7 @@ class UpdateDataAgreementUsecase:
         else:
             return sentence
 
-    def execute(
+    async def execute(
         self,
         id: str,
         organisation_id: str,
@@ -52,15 +53,15 @@ class UpdateDataAgreementUsecase:
             validate(instance=data_attributes_json_schema, schema=meta_schema_draft_7)
         except exceptions.ValidationError as e:
             raise UpdateDataAgreementUsecaseError(e.message)
-        with self.dataagreement_repository as repo:
+        async with self.dataagreement_repository as repo:
             
-            existing_agreement = repo.get_by_purpose_and_organisation_id(organisation_id, purpose)
+            existing_agreement = await repo.get_by_purpose_and_organisation_id(organisation_id, purpose)
             if existing_agreement and str(existing_agreement.id) != id:
                 error_message = f"A data agreement with purpose '{purpose}' already exists."
                 self.logger.error(error_message)
                 raise UpdateDataAgreementUsecaseError(error_message)
             
-            return repo.update(
+            data_agreement = await repo.update(
                 id = id,
                 organisation_id=organisation_id,
                 purpose=purpose,
@@ -70,3 +71,6 @@ class UpdateDataAgreementUsecase:
                 purposeDescription=purpose_description,
                 limitedDisclosure=limited_disclosure,
             )
+
+        await organisation_cache.invalidate_data_agreement(organisation_id, id)
+        return data_agreement
@@ -3,6 +3,8 @@ from typing import Optional
 
 from eudi_wallet.ebsi.models.organisation import OrganisationModel
 from eudi_wallet.ebsi.repositories.organisation import SqlAlchemyOrganisationRepository
+from eudi_wallet.ebsi.services.domain.utils.did import invalidate_did_v2_cache
+from eudi_wallet.ebsi.utils.organisation_cache import organisation_cache
 
 
 class UpdateOrganisationUsecase:
@@ -12,7 +14,7 @@ class UpdateOrganisationUsecase:
         self.organisation_repository = organisation_repository
         self.logger = logger
 
-    def execute(
+    async def execute(
         self,
         organisation_id: str,
         name: str,
@@ -25,8 +27,8 @@ class UpdateOrganisationUsecase:
         cryptographic_salt: Optional[str] = None,
     ) -> OrganisationModel:
         # Update an organisation
-        with self.organisation_repository as repo:
-            return repo.update(
+        async with self.organisation_repository as repo:
+            organisation = await repo.update(
                 organisation_id,
                 name=name,
                 description=description,
@@ -37,3 +39,8 @@ class UpdateOrganisationUsecase:
                 cryptographic_seed=cryptographic_seed,
                 cryptographic_salt=cryptographic_salt,
             )
+
+        # Key material is derived from the organisation row
+        invalidate_did_v2_cache(organisation_id)
+        await organisation_cache.invalidate_organisation(organisation_id)
+        return organisation
@@ -0,0 +1,94 @@
+import dataclasses
+import json
+import random
+import typing
+
+import click
+
+# Keys whose values are never logged, matched case-insensitively
+REDACTED_KEYS = frozenset(
+    key.lower()
+    for key in (
+        "vp_token",
+        "id_token",
+        "access_token",
+        "refresh_token",
+        "acceptance_token",
+        "pre-authorized_code",
+        "pre_authorised_code",
+        "preAuthorisedCode",
+        "user_pin",
+        "userPin",
+        "pin",
+        "code",
+        "code_verifier",
+        "client_assertion",
+        "proof",
+        "jwt",
+        "request",
+        "presentation_submission",
+        "credential",
+        "password",
+        "cryptographic_seed",
+    )
+)
+REDACTED = "[redacted]"
+
+
+@dataclasses.dataclass
+class AccessLogConfig:
+    # Fraction of requests that are logged, server errors always are
+    sample_rate: float = 1.0
+    # Characters of a request body logged at DEBUG
+    max_body_length: int = 2048
+
+    def is_sampled(self) -> bool:
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+
+def redact(value: typing.Any) -> typing.Any:
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if str(key).lower() in REDACTED_KEYS else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    return value
+
+
+def format_body(body: typing.Any, max_length: int) -> str:
+    text = json.dumps(redact(body), default=str)
+    if len(text) > max_length:
+        return f"{text[:max_length]}... ({len(text)} characters)"
+    return text
+
+
+def access_log_options(func):
+    options = [
+        click.option(
+            "--log-sample-rate",
+            envvar="LOG_SAMPLE_RATE",
+            default=AccessLogConfig.sample_rate,
+            type=click.FloatRange(0.0, 1.0),
+            help="Fraction of successful requests written to the access log",
+        ),
+        click.option(
+            "--log-body-max-length",
+            envvar="LOG_BODY_MAX_LENGTH",
+            default=AccessLogConfig.max_body_length,
+            type=int,
+            help="Characters of a request body logged at DEBUG",
+        ),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
+
+
+def get_access_log_config(
+    log_sample_rate: float, log_body_max_length: int
+) -> AccessLogConfig:
+    return AccessLogConfig(
+        sample_rate=log_sample_rate, max_body_length=log_body_max_length
+    )
@@ -0,0 +1,51 @@
+import threading
+import typing
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Bounded, thread-safe least-recently-used cache.
+
+    The cache is process-wide by design; callers own the key scheme and are
+    responsible for invalidating entries when the underlying data changes.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        assert maxsize > 0, "Cache size must be positive"
+        self.maxsize = maxsize
+        self._items: "OrderedDict[typing.Hashable, typing.Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: typing.Hashable, default: typing.Any = None) -> typing.Any:
+        with self._lock:
+            if key not in self._items:
+                return default
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def set(self, key: typing.Hashable, value: typing.Any) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def pop(self, key: typing.Hashable, default: typing.Any = None) -> typing.Any:
+        with self._lock:
+            return self._items.pop(key, default)
+
+    def items(self) -> typing.List[typing.Tuple[typing.Hashable, typing.Any]]:
+        with self._lock:
+            return list(self._items.items())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def __contains__(self, key: typing.Hashable) -> bool:
+        with self._lock:
+            return key in self._items
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
@@ -0,0 +1,303 @@
+import asyncio
+import dataclasses
+import threading
+import time
+import typing
+
+import click
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import Connection, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.util import await_only
+
+
+@dataclasses.dataclass
+class DBPoolConfig:
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: int = 30
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    # Milliseconds, 0 leaves the server default in place
+    statement_timeout: int = 0
+
+    def engine_kwargs(self, db_uri: str) -> dict:
+        kwargs: dict = {
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.pool_timeout,
+            "pool_recycle": self.pool_recycle,
+            "pool_pre_ping": self.pool_pre_ping,
+        }
+        if self.statement_timeout > 0:
+            if make_url(db_uri).get_driver_name() == "asyncpg":
+                kwargs["connect_args"] = {
+                    "server_settings": {
+                        "statement_timeout": str(self.statement_timeout)
+                    }
+                }
+            else:
+                kwargs["connect_args"] = {
+                    "options": f"-c statement_timeout={self.statement_timeout}"
+                }
+        return kwargs
+
+
+class PoolMetrics:
+    """Time spent waiting for a pooled connection, shared by all engines"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class _TimedPoolMixin:
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()  # type: ignore
+        except exc.TimeoutError:
+            pool_metrics.record_timeout()
+            raise
+        finally:
+            pool_metrics.record_wait(time.perf_counter() - started)
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def create_db_engine(db_uri: str, pool_config: DBPoolConfig) -> Engine:
+    return create_engine(
+        db_uri, poolclass=TimedQueuePool, **pool_config.engine_kwargs(db_uri)
+    )
+
+
+def create_async_db_engine(db_uri: str, pool_config: DBPoolConfig) -> AsyncEngine:
+    return create_async_engine(
+        db_uri,
+        poolclass=TimedAsyncAdaptedQueuePool,
+        **pool_config.engine_kwargs(db_uri),
+    )
+
+
+class _RequestBoundSession(Session):
+    """Session that runs on its request's shared connection when it is free"""
+
+    def get_bind(self, *args, **kwargs):
+        # Only reached when the session first needs a connection
+        return self.info["request_session"].checkout(self)
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            self.info["request_session"].release(self)
+
+
+class RequestScopedSession:
+    """Session factory whose sessions reuse one pooled connection.
+
+    Repositories keep opening and closing their own session. A session
+    runs on the request's connection unless another session of the request
+    holds it; an overlapping session, such as a repository opened inside
+    another repository's block, checks out a connection of its own so that
+    its commit is not folded into the other session's transaction. The
+    connection is checked out on the first query and returned to the pool
+    when its session closes, so it is not held between database sections,
+    for example while the request waits on outbound calls. The owner must
+    call `close` when done.
+    """
+
+    def __init__(self, session_factory: typing.Callable):
+        self.session_factory = session_factory
+        self.connection: typing.Optional[Connection] = None
+        # Session whose transaction is on the shared connection
+        self.holder: typing.Optional[Session] = None
+        # Repositories run in executor threads
+        self._lock = threading.Lock()
+
+    def checkout(self, session: Session) -> typing.Union[Connection, Engine]:
+        engine = self.session_factory.kw["bind"]  # type: ignore
+        with self._lock:
+            if session.info.get("own_connection") or self.holder not in (
+                None,
+                session,
+            ):
+                session.info["own_connection"] = True
+                return engine
+            if self.connection is None:
+                self.connection = engine.connect()
+            self.holder = session
+            return self.connection
+
+    def release(self, session: Session) -> None:
+        session.info.pop("own_connection", None)
+        with self._lock:
+            if self.holder is not session:
+                return
+            self.holder = None
+            connection, self.connection = self.connection, None
+        if connection is not None:
+            connection.close()
+
+    async def close(self) -> None:
+        with self._lock:
+            connection, self.connection = self.connection, None
+            self.holder = None
+        if connection is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, connection.close)
+
+    def __call__(self):
+        kwargs = dict(self.session_factory.kw)  # type: ignore
+        kwargs["info"] = {"request_session": self}
+        return _RequestBoundSession(**kwargs)
+
+
+class AsyncRequestScopedSession:
+    """Async counterpart of `RequestScopedSession`"""
+
+    def __init__(self, session_factory: typing.Callable):
+        self.session_factory = session_factory
+        self.connection: typing.Optional[AsyncConnection] = None
+        self.holder: typing.Optional[Session] = None
+        self._lock = asyncio.Lock()
+
+    def checkout(self, session: Session) -> typing.Union[Connection, Engine]:
+        # Runs in the greenlet of an AsyncSession call, where awaitables are
+        # awaited with await_only
+        engine = self.session_factory.kw["bind"]  # type: ignore
+        await_only(self._lock.acquire())
+        try:
+            if session.info.get("own_connection") or self.holder not in (
+                None,
+                session,
+            ):
+                session.info["own_connection"] = True
+                return engine.sync_engine
+            if self.connection is None:
+                self.connection = await_only(engine.connect())
+            self.holder = session
+            return self.connection.sync_connection
+        finally:
+            self._lock.release()
+
+    def release(self, session: Session) -> None:
+        session.info.pop("own_connection", None)
+        if self.holder is not session:
+            return
+        self.holder = None
+        if self.connection is not None:
+            connection, self.connection = self.connection, None
+            await_only(connection.close())
+
+    async def close(self) -> None:
+        self.holder = None
+        if self.connection is not None:
+            connection, self.connection = self.connection, None
+            await connection.close()
+
+    def __call__(self):
+        return self.session_factory(
+            sync_session_class=_RequestBoundSession,
+            info={"request_session": self},
+        )
+
+
+def database_pool_options(func):
+    options = [
+        click.option(
+            "--database-pool-size",
+            envvar="DATABASE_POOL_SIZE",
+            default=DBPoolConfig.pool_size,
+            type=int,
+            help="Connections kept open in the pool",
+        ),
+        click.option(
+            "--database-max-overflow",
+            envvar="DATABASE_MAX_OVERFLOW",
+            default=DBPoolConfig.max_overflow,
+            type=int,
+            help="Connections allowed above the pool size",
+        ),
+        click.option(
+            "--database-pool-timeout",
+            envvar="DATABASE_POOL_TIMEOUT",
+            default=DBPoolConfig.pool_timeout,
+            type=int,
+            help="Seconds to wait for a pooled connection",
+        ),
+        click.option(
+            "--database-pool-recycle",
+            envvar="DATABASE_POOL_RECYCLE",
+            default=DBPoolConfig.pool_recycle,
+            type=int,
+            help="Seconds after which a pooled connection is replaced",
+        ),
+        click.option(
+            "--database-pool-pre-ping/--no-database-pool-pre-ping",
+            envvar="DATABASE_POOL_PRE_PING",
+            default=DBPoolConfig.pool_pre_ping,
+            help="Test connections for liveness on checkout",
+        ),
+        click.option(
+            "--database-statement-timeout",
+            envvar="DATABASE_STATEMENT_TIMEOUT",
+            default=DBPoolConfig.statement_timeout,
+            type=int,
+            help="Statement timeout in milliseconds, 0 to disable",
+        ),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
+
+
+def get_db_pool_config(
+    database_pool_size: int,
+    database_max_overflow: int,
+    database_pool_timeout: int,
+    database_pool_recycle: int,
+    database_pool_pre_ping: bool,
+    database_statement_timeout: int,
+) -> DBPoolConfig:
+    return DBPoolConfig(
+        pool_size=database_pool_size,
+        max_overflow=database_max_overflow,
+        pool_timeout=database_pool_timeout,
+        pool_recycle=database_pool_recycle,
+        pool_pre_ping=database_pool_pre_ping,
+        statement_timeout=database_statement_timeout,
+    )
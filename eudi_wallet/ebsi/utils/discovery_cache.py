@@ -0,0 +1,159 @@
+import asyncio
+import dataclasses
+import logging
+import re
+import time
+import typing
+
+from eudi_wallet.ebsi.exceptions.domain.discovery import DiscoveryError
+from eudi_wallet.ebsi.utils.cache import LRUCache
+from eudi_wallet.ebsi.utils.httpx_client import HttpxClient
+
+# Used when the response carries no max-age
+DEFAULT_TTL = 300
+# How long an expired document may still be served while it is refreshed
+DEFAULT_STALE_TTL = 3600
+
+_CACHE_CONTROL_DIRECTIVE = re.compile(r"([\w-]+)(?:=\"?(\d+)\"?)?")
+
+
+@dataclasses.dataclass
+class CachedDocument:
+    document: dict
+    etag: typing.Optional[str]
+    last_modified: typing.Optional[str]
+    expires_at: float
+    stale_until: float
+
+
+def parse_cache_control(
+    header: typing.Optional[str], default_ttl: int, default_stale_ttl: int
+) -> typing.Tuple[int, int]:
+    """Return the fresh and stale lifetimes in seconds from Cache-Control"""
+    ttl, stale_ttl = default_ttl, default_stale_ttl
+    for name, value in _CACHE_CONTROL_DIRECTIVE.findall(header or ""):
+        name = name.lower()
+        if name in ("no-cache", "no-store"):
+            # Revalidate on every use, the ETag still saves the body
+            ttl = 0
+        elif name == "max-age" and value:
+            ttl = int(value)
+        elif name == "stale-while-revalidate" and value:
+            stale_ttl = int(value)
+    return ttl, stale_ttl
+
+
+class DiscoveryCache:
+    """Cache of well-known metadata documents keyed by URL.
+
+    Fresh documents are served from memory. Expired documents are served
+    stale while one background request revalidates them with the stored
+    ETag, and are also served if revalidation fails. Only a document that
+    was never fetched, or is past its stale window, is awaited.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 256,
+        default_ttl: int = DEFAULT_TTL,
+        default_stale_ttl: int = DEFAULT_STALE_TTL,
+        logger: typing.Optional[logging.Logger] = None,
+    ):
+        self.entries = LRUCache(maxsize=maxsize)
+        self.default_ttl = default_ttl
+        self.default_stale_ttl = default_stale_ttl
+        self.logger = logger
+        self.in_flight: typing.Dict[str, asyncio.Task] = {}
+
+    async def get(self, url: str) -> dict:
+        entry: typing.Optional[CachedDocument] = self.entries.get(url)
+        now = time.monotonic()
+        if entry is not None and now < entry.expires_at:
+            return entry.document
+        if entry is not None and now < entry.stale_until:
+            self._refresh_in_background(url)
+            return entry.document
+        return await self.refresh(url)
+
+    def _refresh_in_background(self, url: str) -> None:
+        if url not in self.in_flight:
+            self._start_refresh(url).add_done_callback(self._log_refresh_error)
+
+    def _log_refresh_error(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() and self.logger is not None:
+            self.logger.error(f"Failed to refresh discovery document: {task.exception()}")
+
+    def _start_refresh(self, url: str) -> asyncio.Task:
+        task = asyncio.create_task(self._fetch(url))
+        self.in_flight[url] = task
+        task.add_done_callback(lambda _: self.in_flight.pop(url, None))
+        return task
+
+    async def refresh(self, url: str) -> dict:
+        # Concurrent callers share one request per URL
+        task = self.in_flight.get(url) or self._start_refresh(url)
+        return await asyncio.shield(task)
+
+    async def _fetch(self, url: str) -> dict:
+        entry: typing.Optional[CachedDocument] = self.entries.get(url)
+        headers = {}
+        if entry is not None and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry is not None and entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+
+        try:
+            async with HttpxClient(logger=self.logger) as http_client:
+                response = await http_client.get(url, headers=headers)
+        except Exception as e:
+            if entry is not None:
+                return entry.document
+            raise DiscoveryError(f"Unable to fetch {url}: {e}") from e
+
+        if response.status_code == 304 and entry is not None:
+            document = entry.document
+        elif response.status_code == 200:
+            document = response.json()
+        elif entry is not None:
+            return entry.document
+        else:
+            raise DiscoveryError(
+                f"Invalid response status {response.status_code} for {url}"
+            )
+
+        ttl, stale_ttl = parse_cache_control(
+            response.headers.get("Cache-Control"),
+            self.default_ttl,
+            self.default_stale_ttl,
+        )
+        now = time.monotonic()
+        self.entries.set(
+            url,
+            CachedDocument(
+                document=document,
+                etag=response.headers.get("ETag") or (entry and entry.etag),
+                last_modified=response.headers.get("Last-Modified")
+                or (entry and entry.last_modified),
+                expires_at=now + ttl,
+                stale_until=now + ttl + stale_ttl,
+            ),
+        )
+        return document
+
+    async def refresh_expiring(self, within: float) -> None:
+        """Revalidate every document that expires in the next `within` seconds"""
+        deadline = time.monotonic() + within
+        urls = [
+            url
+            for url, entry in self.entries.items()
+            if entry.expires_at <= deadline
+        ]
+        await asyncio.gather(
+            *(self.refresh(url) for url in urls), return_exceptions=True
+        )
+
+    def invalidate(self, url: str) -> None:
+        self.entries.pop(url)
+
+
+discovery_cache = DiscoveryCache()
@@ -1,4 +1,5 @@
 import asyncio
+import functools
 import logging
 import typing
 
@@ -12,6 +13,8 @@ from tenacity import (
     wait_fixed,
 )
 
+from eudi_wallet.ebsi.utils.poller import BackoffPolicy, fixed_interval, poll
+
 
 class HttpClient:
     def __init__(
@@ -77,24 +80,17 @@ class HttpClient:
         self,
         method: str,
         url: str,
-        condition: typing.Callable[[aiohttp.ClientResponse], bool],
+        condition: typing.Callable[[aiohttp.ClientResponse], typing.Awaitable[bool]],
         data: typing.Optional[typing.Dict] = None,
         headers: typing.Optional[typing.Dict] = None,
         n: int = 5,
+        policy: typing.Optional[BackoffPolicy] = None,
     ) -> aiohttp.ClientResponse:
-        while True:
-            if method.lower() == "get":
-                response = await self.get(url, headers=headers)
-            elif method.lower() == "post":
-                response = await self.post(url, data=data, headers=headers)
-            else:
-                raise ValueError(f"Unsupported method: {method}")
-
-            if await condition(response):
-                return response
-
-            await asyncio.sleep(n)
-            if await condition(response):
-                return response
+        if method.lower() == "get":
+            call = functools.partial(self.get, url, headers=headers)
+        elif method.lower() == "post":
+            call = functools.partial(self.post, url, data=data, headers=headers)
+        else:
+            raise ValueError(f"Unsupported method: {method}")
 
-            await asyncio.sleep(n)
+        return await poll(call, condition, policy or fixed_interval(n), "http")
@@ -1,7 +1,13 @@
 import asyncio
+import contextlib
+import dataclasses
+import functools
+import importlib.util
 import logging
+import time
 import typing
 
+import click
 import httpx
 from tenacity import (
     after_log,
@@ -12,6 +18,67 @@ from tenacity import (
     wait_fixed,
 )
 
+from eudi_wallet.ebsi.utils.metrics import http_client_request_duration_seconds
+from eudi_wallet.ebsi.utils.poller import BackoffPolicy, fixed_interval, poll
+
+
+@dataclasses.dataclass
+class HttpClientPoolConfig:
+    max_connections: int = 100
+    max_connections_per_host: int = 10
+    max_keepalive_connections: int = 20
+    # Seconds an idle keep-alive connection is kept open
+    keepalive_expiry: float = 30.0
+    timeout: int = 10
+    http2: bool = True
+
+
+class HttpClientPool:
+    """Application scoped httpx client shared by all outbound calls.
+
+    Connections are kept alive and reused across requests, and over HTTP/2
+    when the server supports it, instead of a new TCP and TLS handshake per
+    call. httpx only limits connections in total, so requests to a single
+    host are additionally limited with a semaphore per host.
+    """
+
+    def __init__(self, config: typing.Optional[HttpClientPoolConfig] = None):
+        self.config = config or HttpClientPoolConfig()
+        self.client = httpx.AsyncClient(
+            timeout=self.config.timeout,
+            # HTTP/2 needs the optional h2 package (httpx[http2])
+            http2=self.config.http2 and importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(
+                max_connections=self.config.max_connections,
+                max_keepalive_connections=self.config.max_keepalive_connections,
+                keepalive_expiry=self.config.keepalive_expiry,
+            ),
+        )
+        self.host_limits: typing.Dict[str, asyncio.Semaphore] = {}
+
+    def host_limit(self, url: str) -> asyncio.Semaphore:
+        host = httpx.URL(url).host
+        semaphore = self.host_limits.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.config.max_connections_per_host)
+            self.host_limits[host] = semaphore
+        return semaphore
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+_shared_pool: typing.Optional[HttpClientPool] = None
+
+
+def set_shared_http_client_pool(pool: typing.Optional[HttpClientPool]) -> None:
+    global _shared_pool
+    _shared_pool = pool
+
+
+def get_shared_http_client_pool() -> typing.Optional[HttpClientPool]:
+    return _shared_pool
+
 
 class HttpxClient:
     def __init__(
@@ -20,8 +87,10 @@ class HttpxClient:
         retry_wait: int = 1,
         timeout: int = 10,
         logger: typing.Optional[logging.Logger] = None,
+        pool: typing.Optional[HttpClientPool] = None,
     ):
         self.client: typing.Optional[httpx.AsyncClient] = None
+        self.pool = pool
         self.retry_attempts = retry_attempts
         self.retry_wait = retry_wait
         self.timeout = timeout
@@ -34,14 +103,36 @@ class HttpxClient:
             self.before = self.after = None
 
     async def __aenter__(self):
-        self.client = httpx.AsyncClient(timeout=self.timeout)
+        if self.pool is None:
+            self.pool = get_shared_http_client_pool()
+        if self.pool is not None:
+            self.client = self.pool.client
+        else:
+            self.client = httpx.AsyncClient(timeout=self.timeout)
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         assert self.client is not None
-        await self.client.aclose()
+        # The pooled client outlives this context and is closed with the app
+        if self.pool is None:
+            await self.client.aclose()
         self.client = None
 
+    def _host_limit(self, url: str) -> typing.AsyncContextManager:
+        if self.pool is None:
+            return contextlib.nullcontext()
+        return self.pool.host_limit(url)
+
+    @contextlib.asynccontextmanager
+    async def _timed(self, url: str) -> typing.AsyncIterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            http_client_request_duration_seconds.observe(
+                time.perf_counter() - started, httpx.URL(url).host
+            )
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_fixed(1),
@@ -53,9 +144,10 @@ class HttpxClient:
         if self.client is None:
             raise RuntimeError("Client is closed")
 
-        return await self.client.get(
-            url, headers=headers, follow_redirects=allow_redirects
-        )
+        async with self._host_limit(url), self._timed(url):
+            return await self.client.get(
+                url, headers=headers, follow_redirects=allow_redirects
+            )
 
     @retry(
         stop=stop_after_attempt(3),
@@ -68,9 +160,29 @@ class HttpxClient:
         if self.client is None:
             raise RuntimeError("Client is closed")
 
-        return await self.client.post(
-            url, data=data, headers=headers, follow_redirects=allow_redirects
-        )
+        async with self._host_limit(url), self._timed(url):
+            return await self.client.post(
+                url, data=data, headers=headers, follow_redirects=allow_redirects
+            )
+
+    async def call_with_backoff(
+        self,
+        method: str,
+        url: str,
+        condition: typing.Callable[[httpx.Response], typing.Awaitable[bool]],
+        data: typing.Optional[typing.Dict] = None,
+        headers: typing.Optional[typing.Dict] = None,
+        policy: typing.Optional[BackoffPolicy] = None,
+        name: str = "http",
+    ) -> httpx.Response:
+        if method.lower() == "get":
+            call = functools.partial(self.get, url, headers=headers)
+        elif method.lower() == "post":
+            call = functools.partial(self.post, url, data=data, headers=headers)
+        else:
+            raise ValueError(f"Unsupported method: {method}")
+
+        return await poll(call, condition, policy, name)
 
     async def call_every_n_seconds(
         self,
@@ -81,19 +193,46 @@ class HttpxClient:
         headers: typing.Optional[typing.Dict] = None,
         n: int = 5,
     ) -> httpx.Response:
-        while True:
-            if method.lower() == "get":
-                response = await self.get(url, headers=headers)
-            elif method.lower() == "post":
-                response = await self.post(url, data=data, headers=headers)
-            else:
-                raise ValueError(f"Unsupported method: {method}")
-
-            if await condition(response):
-                return response
-
-            await asyncio.sleep(n)
-            if await condition(response):
-                return response
-
-            await asyncio.sleep(n)
+        return await self.call_with_backoff(
+            method, url, condition, data, headers, fixed_interval(n)
+        )
+
+
+def http_client_pool_options(func):
+    options = [
+        click.option(
+            "--http-max-connections",
+            envvar="HTTP_MAX_CONNECTIONS",
+            default=HttpClientPoolConfig.max_connections,
+            type=int,
+            help="Outbound HTTP connections kept open in total",
+        ),
+        click.option(
+            "--http-max-connections-per-host",
+            envvar="HTTP_MAX_CONNECTIONS_PER_HOST",
+            default=HttpClientPoolConfig.max_connections_per_host,
+            type=int,
+            help="Concurrent outbound HTTP requests per host",
+        ),
+        click.option(
+            "--http2/--no-http2",
+            envvar="HTTP2",
+            default=HttpClientPoolConfig.http2,
+            help="Use HTTP/2 for outbound calls when the server supports it",
+        ),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
+
+
+def get_http_client_pool_config(
+    http_max_connections: int,
+    http_max_connections_per_host: int,
+    http2: bool,
+) -> HttpClientPoolConfig:
+    return HttpClientPoolConfig(
+        max_connections=http_max_connections,
+        max_connections_per_host=http_max_connections_per_host,
+        http2=http2,
+    )
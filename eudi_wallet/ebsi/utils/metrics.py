@@ -0,0 +1,231 @@
+import bisect
+import contextvars
+import dataclasses
+import threading
+import time
+import typing
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+# Upper bounds of the queries per request histogram buckets
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+Labels = typing.Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Labels, values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Labels = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        self.values: typing.Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, value: float = 1.0) -> None:
+        with self._lock:
+            self.values[labels] = self.values.get(labels, 0.0) + value
+
+    def render(self, extra: str = "") -> typing.List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self.values.items()):
+                label_string = _format_labels(self.labelnames, labels, extra)
+                lines.append(f"{self.name}{label_string} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Labels = (),
+        buckets: typing.Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # Per label values: count per bucket with +Inf last, sum
+        self.values: typing.Dict[Labels, typing.Tuple[typing.List[int], float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self.values.get(labels) or (
+                [0] * (len(self.buckets) + 1),
+                0.0,
+            )
+            counts[index] += 1
+            self.values[labels] = (counts, total + value)
+
+    def render(self, extra: str = "") -> typing.List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total) in sorted(self.values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    bucket_labels = ",".join(filter(None, (extra, f'le="{le}"')))
+                    label_string = _format_labels(
+                        self.labelnames, labels, bucket_labels
+                    )
+                    lines.append(f"{self.name}_bucket{label_string} {cumulative}")
+                label_string = _format_labels(self.labelnames, labels, extra)
+                lines.append(f"{self.name}_sum{label_string} {total}")
+                lines.append(f"{self.name}_count{label_string} {cumulative}")
+        return lines
+
+
+class Gauges:
+    """Gauges read from a snapshot function when the metrics are rendered"""
+
+    def __init__(
+        self, prefix: str, help: str, snapshot: typing.Callable[[], dict]
+    ):
+        self.prefix = prefix
+        self.help = help
+        self.snapshot = snapshot
+
+    def render(self, extra: str = "") -> typing.List[str]:
+        lines = []
+        for key, value in self._flatten(self.snapshot()):
+            name = f"{self.prefix}_{key}"
+            lines.append(f"# HELP {name} {self.help}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name}{_format_labels((), (), extra)} {value}")
+        return lines
+
+    def _flatten(self, snapshot: dict, prefix: str = "") -> typing.Iterator:
+        for key, value in sorted(snapshot.items()):
+            key = f"{prefix}{key}".replace("-", "_").replace(".", "_")
+            if isinstance(value, dict):
+                yield from self._flatten(value, f"{key}_")
+            elif isinstance(value, (int, float)):
+                yield key, float(value)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: typing.List[typing.Any] = []
+        # Added to every series, such as the worker process that serves them
+        self.labels: typing.Dict[str, str] = {}
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        extra = ",".join(
+            f'{name}="{_escape(value)}"' for name, value in sorted(self.labels.items())
+        )
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render(extra))
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+http_requests_total = metrics.register(
+    Counter(
+        "http_requests_total",
+        "Requests handled per route, method and status",
+        ("route", "method", "status"),
+    )
+)
+http_request_duration_seconds = metrics.register(
+    Histogram(
+        "http_request_duration_seconds", "Request handling time per route", ("route",)
+    )
+)
+db_queries_per_request = metrics.register(
+    Histogram(
+        "db_queries_per_request",
+        "Database queries run while handling a request",
+        ("route",),
+        QUERY_COUNT_BUCKETS,
+    )
+)
+db_query_seconds_per_request = metrics.register(
+    Histogram(
+        "db_query_seconds_per_request",
+        "Time spent in database queries while handling a request",
+        ("route",),
+    )
+)
+http_client_request_duration_seconds = metrics.register(
+    Histogram(
+        "http_client_request_duration_seconds",
+        "Outbound HTTP request time per target host",
+        ("host",),
+    )
+)
+signing_duration_seconds = metrics.register(
+    Histogram(
+        "signing_duration_seconds",
+        "Time to sign a credential or token, including executor queueing",
+        ("function",),
+    )
+)
+
+
+@dataclasses.dataclass
+class RequestStats:
+    queries: int = 0
+    query_seconds: float = 0.0
+    lock: threading.Lock = dataclasses.field(default_factory=threading.Lock)
+
+    def record_query(self, seconds: float) -> None:
+        # Repository calls of one request may run in executor threads
+        with self.lock:
+            self.queries += 1
+            self.query_seconds += seconds
+
+
+request_stats: contextvars.ContextVar[typing.Optional[RequestStats]] = (
+    contextvars.ContextVar("request_stats", default=None)
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # A connection runs one query at a time
+    conn.info["query_started"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = request_stats.get()
+    if stats is not None:
+        stats.record_query(time.perf_counter() - conn.info["query_started"])
@@ -0,0 +1,248 @@
+import asyncio
+import copy
+import dataclasses
+import json
+import logging
+import time
+import typing
+
+import asyncpg
+import click
+from sqlalchemy import inspect
+
+from eudi_wallet.ebsi.utils.cache import LRUCache
+
+T = typing.TypeVar("T")
+
+# Channel on which workers announce invalidated organisations
+INVALIDATION_CHANNEL = "organisation_cache_invalidation"
+
+
+@dataclasses.dataclass
+class OrganisationCacheConfig:
+    # Seconds an organisation or data agreement is served from memory, 0
+    # disables the cache
+    ttl: float = 30.0
+    max_size: int = 4096
+    # Propagate invalidations to the other workers with LISTEN/NOTIFY
+    notify: bool = False
+
+
+def _detached_copy(model: T) -> T:
+    # The loaded row stays bound to the session of the request that loaded
+    # it, other requests read a copy that is not attached to any session
+    mapper = inspect(model).mapper
+    return mapper.class_(
+        **{
+            attribute.key: copy.deepcopy(getattr(model, attribute.key))
+            for attribute in mapper.column_attrs
+        }
+    )
+
+
+class OrganisationCache:
+    """Read-through cache of organisation and data agreement rows.
+
+    Entries live for a short TTL and are dropped by the usecases that
+    update or delete them. Rows loaded while an invalidation is in progress
+    are not cached, so a reader cannot put back a row that was just
+    changed. Cached rows are shared between requests and must be treated
+    as read only.
+    """
+
+    def __init__(self, config: typing.Optional[OrganisationCacheConfig] = None):
+        self.configure(config or OrganisationCacheConfig())
+        # Sends an invalidation to the other workers, set by the listener
+        self.publish: typing.Optional[
+            typing.Callable[[str], typing.Awaitable[None]]
+        ] = None
+        self.logger: typing.Optional[logging.Logger] = None
+        self.generation = 0
+
+    def configure(self, config: OrganisationCacheConfig) -> None:
+        self.config = config
+        self.entries = LRUCache(maxsize=config.max_size)
+
+    async def _get(
+        self,
+        key: typing.Tuple[str, ...],
+        load: typing.Callable[[], typing.Awaitable[typing.Optional[T]]],
+    ) -> typing.Optional[T]:
+        if self.config.ttl <= 0:
+            return await load()
+
+        entry = self.entries.get(key)
+        if entry is not None and time.monotonic() < entry[0]:
+            return entry[1]
+
+        generation = self.generation
+        value = await load()
+        # Missing rows are not cached, they may be created at any time
+        if value is not None and generation == self.generation:
+            self.entries.set(
+                key, (time.monotonic() + self.config.ttl, _detached_copy(value))
+            )
+        return value
+
+    async def get_organisation(
+        self,
+        organisation_id: str,
+        load: typing.Callable[[], typing.Awaitable[typing.Optional[T]]],
+    ) -> typing.Optional[T]:
+        return await self._get(("organisation", str(organisation_id)), load)
+
+    async def get_data_agreement(
+        self,
+        organisation_id: str,
+        data_agreement_id: str,
+        load: typing.Callable[[], typing.Awaitable[typing.Optional[T]]],
+    ) -> typing.Optional[T]:
+        return await self._get(
+            ("data_agreement", str(organisation_id), str(data_agreement_id)), load
+        )
+
+    def drop(
+        self, organisation_id: str, data_agreement_id: typing.Optional[str] = None
+    ) -> None:
+        """Drop cached rows in this process only"""
+        self.generation += 1
+        organisation_id = str(organisation_id)
+        if data_agreement_id is not None:
+            self.entries.pop(("data_agreement", organisation_id, str(data_agreement_id)))
+            return
+
+        # The organisation and all of its data agreements
+        for key, _ in self.entries.items():
+            if key[1] == organisation_id:
+                self.entries.pop(key)
+
+    async def invalidate(
+        self, organisation_id: str, data_agreement_id: typing.Optional[str] = None
+    ) -> None:
+        self.drop(organisation_id, data_agreement_id)
+        if self.publish is None:
+            return
+
+        payload = json.dumps(
+            {
+                "organisationId": str(organisation_id),
+                "dataAgreementId": None
+                if data_agreement_id is None
+                else str(data_agreement_id),
+            }
+        )
+        try:
+            await self.publish(payload)
+        except Exception as e:
+            # Other workers still drop the rows once their TTL expires
+            if self.logger is not None:
+                self.logger.error(f"Failed to publish cache invalidation: {e}")
+
+    async def invalidate_organisation(self, organisation_id: str) -> None:
+        await self.invalidate(organisation_id)
+
+    async def invalidate_data_agreement(
+        self, organisation_id: str, data_agreement_id: str
+    ) -> None:
+        await self.invalidate(organisation_id, data_agreement_id)
+
+
+class OrganisationCacheListener:
+    """Shares cache invalidations between workers through Postgres.
+
+    One connection per worker listens on the invalidation channel and also
+    sends this worker's invalidations with NOTIFY. If the connection is
+    lost, other workers' changes are picked up once the TTL expires.
+    """
+
+    def __init__(
+        self, cache: OrganisationCache, dsn: str, logger: logging.Logger
+    ):
+        self.cache = cache
+        self.dsn = dsn
+        self.logger = logger
+        self.connection: typing.Optional[asyncpg.Connection] = None
+        # A connection runs one statement at a time
+        self.lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        self.connection = await asyncpg.connect(self.dsn)
+        await self.connection.add_listener(
+            INVALIDATION_CHANNEL, self._on_notification
+        )
+        self.connection.add_termination_listener(self._on_termination)
+        self.cache.publish = self.publish
+
+    async def publish(self, payload: str) -> None:
+        assert self.connection is not None
+        async with self.lock:
+            await self.connection.execute(
+                "SELECT pg_notify($1, $2)", INVALIDATION_CHANNEL, payload
+            )
+
+    def _on_notification(self, connection, pid, channel, payload) -> None:
+        # This worker dropped its own rows before notifying
+        if pid == connection.get_server_pid():
+            return
+        try:
+            invalidation = json.loads(payload)
+            self.cache.drop(
+                invalidation["organisationId"], invalidation.get("dataAgreementId")
+            )
+        except (ValueError, KeyError) as e:
+            self.logger.error(f"Invalid cache invalidation {payload!r}: {e}")
+
+    def _on_termination(self, connection) -> None:
+        self.cache.publish = None
+        self.logger.error(
+            "Cache invalidation connection closed, relying on the TTL"
+        )
+
+    async def stop(self) -> None:
+        self.cache.publish = None
+        if self.connection is not None and not self.connection.is_closed():
+            await self.connection.close()
+        self.connection = None
+
+
+organisation_cache = OrganisationCache()
+
+
+def organisation_cache_options(func):
+    options = [
+        click.option(
+            "--organisation-cache-ttl",
+            envvar="ORGANISATION_CACHE_TTL",
+            default=OrganisationCacheConfig.ttl,
+            type=click.FloatRange(min=0),
+            help="Seconds organisations and data agreements are cached, 0 disables",
+        ),
+        click.option(
+            "--organisation-cache-size",
+            envvar="ORGANISATION_CACHE_SIZE",
+            default=OrganisationCacheConfig.max_size,
+            type=click.IntRange(min=1),
+            help="Organisations and data agreements cached per process",
+        ),
+        click.option(
+            "--organisation-cache-notify",
+            envvar="ORGANISATION_CACHE_NOTIFY",
+            is_flag=True,
+            help="Share cache invalidations between workers with LISTEN/NOTIFY",
+        ),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
+
+
+def get_organisation_cache_config(
+    organisation_cache_ttl: float,
+    organisation_cache_size: int,
+    organisation_cache_notify: bool,
+) -> OrganisationCacheConfig:
+    return OrganisationCacheConfig(
+        ttl=organisation_cache_ttl,
+        max_size=organisation_cache_size,
+        notify=organisation_cache_notify,
+    )
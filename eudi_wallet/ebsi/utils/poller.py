@@ -0,0 +1,108 @@
+import asyncio
+import dataclasses
+import random
+import threading
+import typing
+
+T = typing.TypeVar("T")
+
+
+class PollDeadlineExceeded(Exception):
+    pass
+
+
+@dataclasses.dataclass
+class BackoffPolicy:
+    # Seconds to wait after the first attempt
+    initial: float = 1.0
+    factor: float = 2.0
+    max_interval: float = 30.0
+    # Fraction of each interval that is randomised
+    jitter: float = 0.2
+    # Seconds after which polling gives up, None to poll until cancelled
+    deadline: typing.Optional[float] = 120.0
+
+    def intervals(self) -> typing.Iterator[float]:
+        interval = self.initial
+        while True:
+            spread = interval * self.jitter
+            yield max(0.0, interval + random.uniform(-spread, spread))
+            interval = min(self.max_interval, interval * self.factor)
+
+
+def fixed_interval(seconds: float) -> BackoffPolicy:
+    return BackoffPolicy(
+        initial=seconds, factor=1.0, max_interval=seconds, jitter=0.0, deadline=None
+    )
+
+
+class PollerMetrics:
+    """Attempts and time to completion per poller name"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pollers: typing.Dict[str, dict] = {}
+
+    def record(self, name: str, outcome: str, attempts: int, seconds: float) -> None:
+        with self._lock:
+            metrics = self.pollers.setdefault(
+                name,
+                {
+                    "succeeded": 0,
+                    "timed_out": 0,
+                    "cancelled": 0,
+                    "attempts_total": 0,
+                    "seconds_total": 0.0,
+                    "seconds_max": 0.0,
+                },
+            )
+            metrics[outcome] += 1
+            metrics["attempts_total"] += attempts
+            metrics["seconds_total"] += seconds
+            metrics["seconds_max"] = max(metrics["seconds_max"], seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {name: dict(metrics) for name, metrics in self.pollers.items()}
+
+
+poller_metrics = PollerMetrics()
+
+
+async def poll(
+    call: typing.Callable[[], typing.Awaitable[T]],
+    condition: typing.Callable[[T], typing.Awaitable[bool]],
+    policy: typing.Optional[BackoffPolicy] = None,
+    name: str = "poll",
+) -> T:
+    """Call until the condition holds, backing off between attempts.
+
+    Raises `PollDeadlineExceeded` when the policy deadline would be passed
+    before the next attempt. Cancelling the awaiting task stops polling.
+    """
+    policy = policy or BackoffPolicy()
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    attempts = 0
+    intervals = policy.intervals()
+    try:
+        while True:
+            attempts += 1
+            result = await call()
+            if await condition(result):
+                poller_metrics.record(
+                    name, "succeeded", attempts, loop.time() - started
+                )
+                return result
+
+            interval = next(intervals)
+            elapsed = loop.time() - started
+            if policy.deadline is not None and elapsed + interval > policy.deadline:
+                poller_metrics.record(name, "timed_out", attempts, elapsed)
+                raise PollDeadlineExceeded(
+                    f"{name} did not complete after {attempts} attempts in {elapsed:.1f}s"
+                )
+            await asyncio.sleep(interval)
+    except asyncio.CancelledError:
+        poller_metrics.record(name, "cancelled", attempts, loop.time() - started)
+        raise
@@ -0,0 +1,146 @@
+import asyncio
+import concurrent.futures
+import dataclasses
+import functools
+import os
+import time
+import typing
+
+import click
+from jwcrypto import jwk
+
+from eudi_wallet.ebsi.utils.metrics import signing_duration_seconds
+
+T = typing.TypeVar("T")
+
+
+class SigningExecutorKinds:
+    Inline = "inline"
+    Thread = "thread"
+    Process = "process"
+
+
+@dataclasses.dataclass
+class SigningExecutorConfig:
+    kind: str = SigningExecutorKinds.Thread
+    # None to use one worker per CPU
+    workers: typing.Optional[int] = None
+
+
+@dataclasses.dataclass(frozen=True)
+class _ExportedKey:
+    key: str
+
+
+@functools.lru_cache(maxsize=64)
+def _import_key(key: str) -> jwk.JWK:
+    return jwk.JWK.from_json(key)
+
+
+def _call_in_process(func: typing.Callable[..., T], kwargs: dict) -> T:
+    # Keys are imported once per worker process and reused
+    kwargs = {
+        name: _import_key(value.key) if isinstance(value, _ExportedKey) else value
+        for name, value in kwargs.items()
+    }
+    return func(**kwargs)
+
+
+class SigningExecutor:
+    """Runs CPU bound JWT and SD-JWT signing off the event loop.
+
+    With a process pool, signing uses more than one core per server
+    process. Functions must then be importable by name and their arguments
+    picklable. JWK arguments are passed as exported JSON.
+    """
+
+    def __init__(self, config: typing.Optional[SigningExecutorConfig] = None):
+        self.config = config or SigningExecutorConfig()
+        workers = self.config.workers or os.cpu_count()
+        self.executor: typing.Optional[concurrent.futures.Executor] = None
+        if self.config.kind == SigningExecutorKinds.Thread:
+            self.executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="signing"
+            )
+        elif self.config.kind == SigningExecutorKinds.Process:
+            self.executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers
+            )
+
+    async def run(self, func: typing.Callable[..., T], **kwargs) -> T:
+        if self.executor is None:
+            return func(**kwargs)
+
+        loop = asyncio.get_running_loop()
+        if isinstance(self.executor, concurrent.futures.ProcessPoolExecutor):
+            kwargs = {
+                name: _ExportedKey(value.export(private_key=value.has_private))
+                if isinstance(value, jwk.JWK)
+                else value
+                for name, value in kwargs.items()
+            }
+            return await loop.run_in_executor(
+                self.executor, _call_in_process, func, kwargs
+            )
+        return await loop.run_in_executor(
+            self.executor, functools.partial(func, **kwargs)
+        )
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+_signing_executor: typing.Optional[SigningExecutor] = None
+
+
+def set_signing_executor(executor: typing.Optional[SigningExecutor]) -> None:
+    global _signing_executor
+    _signing_executor = executor
+
+
+async def run_signing(func: typing.Callable[..., T], **kwargs) -> T:
+    """Sign with the configured executor, or inline if none is set"""
+    started = time.perf_counter()
+    try:
+        if _signing_executor is None:
+            return func(**kwargs)
+        return await _signing_executor.run(func, **kwargs)
+    finally:
+        signing_duration_seconds.observe(
+            time.perf_counter() - started, func.__qualname__
+        )
+
+
+def signing_executor_options(func):
+    options = [
+        click.option(
+            "--signing-executor",
+            envvar="SIGNING_EXECUTOR",
+            default=SigningExecutorConfig.kind,
+            type=click.Choice(
+                [
+                    SigningExecutorKinds.Inline,
+                    SigningExecutorKinds.Thread,
+                    SigningExecutorKinds.Process,
+                ]
+            ),
+            help="Where credentials and tokens are signed",
+        ),
+        click.option(
+            "--signing-workers",
+            envvar="SIGNING_WORKERS",
+            default=None,
+            type=int,
+            help="Signing threads or processes, defaults to the CPU count",
+        ),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
+
+
+def get_signing_executor_config(
+    signing_executor: str, signing_workers: typing.Optional[int]
+) -> SigningExecutorConfig:
+    return SigningExecutorConfig(kind=signing_executor, workers=signing_workers)
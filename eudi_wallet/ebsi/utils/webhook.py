@@ -1,25 +1,427 @@
-import requests
+import asyncio
+import dataclasses
+import datetime
+import random
+import threading
+import time
+import typing
+import uuid
+from logging import Logger
+from urllib.parse import urlsplit
 
+import aiohttp
+import click
 
-def send_webhook(webhook_base_url, payload=None, topic="/topic/issue_credential/"):
-    method = "POST"
-    headers = {"Content-Type": "application/json"}
-    timeout = 10
-    webhook_url = webhook_base_url + topic
+from eudi_wallet.ebsi.value_objects.domain.webhook import WebhookDeliveryStatus
 
-    try:
-        # Send the request
-        response = requests.request(
-            method, webhook_url, json=payload, headers=headers, timeout=timeout
+
+@dataclasses.dataclass
+class WebhookConfig:
+    queue_size: int = 1000
+    concurrency: int = 16
+    connections_per_host: int = 4
+    timeout: int = 10
+    max_attempts: int = 8
+    # Seconds before the first retry, doubled on every further attempt
+    backoff_base: float = 2.0
+    backoff_max: float = 600.0
+    poll_interval: float = 5.0
+    # Seconds a claimed delivery is reserved for this process before the
+    # outbox hands it out again, e.g. after a crash mid delivery
+    lease: int = 300
+
+    def backoff(self, attempts: int) -> datetime.timedelta:
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1))
+        # Jitter spreads out retries to a receiver that comes back up
+        return datetime.timedelta(seconds=random.uniform(delay / 2, delay))
+
+
+class WebhookMetrics:
+    """Webhook delivery counters and latency, shared by all dispatchers"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.enqueued = 0
+        self.deferred = 0
+        self.delivered = 0
+        self.retried = 0
+        self.failed = 0
+        self.queue_depth = 0
+        self.latency_seconds_total = 0.0
+        self.latency_seconds_max = 0.0
+
+    def record_enqueued(self, deferred: bool) -> None:
+        with self._lock:
+            self.enqueued += 1
+            if deferred:
+                self.deferred += 1
+
+    def record_queue_depth(self, depth: int) -> None:
+        with self._lock:
+            self.queue_depth = depth
+
+    def record_attempt(self, seconds: float, status: str) -> None:
+        with self._lock:
+            self.latency_seconds_total += seconds
+            self.latency_seconds_max = max(self.latency_seconds_max, seconds)
+            if status == WebhookDeliveryStatus.Delivered.value:
+                self.delivered += 1
+            elif status == WebhookDeliveryStatus.Failed.value:
+                self.failed += 1
+            else:
+                self.retried += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "enqueued": self.enqueued,
+                "deferred": self.deferred,
+                "delivered": self.delivered,
+                "retried": self.retried,
+                "failed": self.failed,
+                "queue_depth": self.queue_depth,
+                "latency_seconds_total": self.latency_seconds_total,
+                "latency_seconds_max": self.latency_seconds_max,
+            }
+
+
+webhook_metrics = WebhookMetrics()
+
+
+@dataclasses.dataclass
+class WebhookDelivery:
+    id: uuid.UUID
+    webhook_url: str
+    topic: str
+    payload: typing.Optional[dict]
+    attempts: int
+
+    @property
+    def url(self) -> str:
+        return self.webhook_url + self.topic
+
+    @classmethod
+    def from_row(cls, row: typing.Any) -> "WebhookDelivery":
+        return cls(
+            id=row.id,
+            webhook_url=row.webhookUrl,
+            topic=row.topic,
+            payload=row.payload,
+            attempts=row.attempts,
+        )
+
+
+class WebhookDispatcher:
+    """Delivers webhooks in the background through a durable outbox.
+
+    Every webhook is written to the outbox table before it is queued, so
+    deliveries that are queued, retrying or in flight survive a restart.
+    A fixed number of workers drain the bounded queue over keep-alive
+    connections pooled per receiver host. Failed attempts are rescheduled
+    in the outbox with exponential backoff and picked up again by a poller.
+    """
+
+    def __init__(
+        self,
+        repository_factory: typing.Callable[[], typing.Any],
+        logger: Logger,
+        config: typing.Optional[WebhookConfig] = None,
+    ):
+        self.repository_factory = repository_factory
+        self.logger = logger
+        self.config = config or WebhookConfig()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=self.config.queue_size)
+        self.sessions: typing.Dict[str, aiohttp.ClientSession] = {}
+        self.in_flight: typing.Set[uuid.UUID] = set()
+        self.tasks: typing.List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        self.tasks = [
+            asyncio.create_task(self._work()) for _ in range(self.config.concurrency)
+        ]
+        self.tasks.append(asyncio.create_task(self._poll()))
+
+    async def stop(self) -> None:
+        # Queued deliveries are still pending in the outbox and are handed
+        # out again once their lease expires
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        for session in self.sessions.values():
+            await session.close()
+        self.sessions = {}
+
+    async def enqueue(
+        self, webhook_url: str, payload: typing.Optional[dict], topic: str
+    ) -> bool:
+        now = datetime.datetime.utcnow()
+        deferred = self.queue.full()
+        # A delivery that does not fit in the queue is due right away, so
+        # the poller picks it up as soon as there is room
+        next_attempt_at = (
+            now if deferred else now + datetime.timedelta(seconds=self.config.lease)
+        )
+        async with self.repository_factory() as repo:
+            webhook_delivery = await repo.create(
+                webhook_url=webhook_url,
+                topic=topic,
+                payload=payload,
+                next_attempt_at=next_attempt_at,
+            )
+        if not deferred:
+            # The queue may have filled up while the row was written
+            queued = await self._offer_all([WebhookDelivery.from_row(webhook_delivery)])
+            deferred = queued == 0
+        webhook_metrics.record_enqueued(deferred)
+        return True
+
+    async def enqueue_many(
+        self,
+        webhook_url: str,
+        payloads: typing.List[typing.Optional[dict]],
+        topic: str,
+    ) -> bool:
+        """Write a batch of deliveries to the outbox in one statement"""
+        now = datetime.datetime.utcnow()
+        leased_until = now + datetime.timedelta(seconds=self.config.lease)
+        room = (
+            len(payloads)
+            if self.queue.maxsize <= 0
+            else max(self.queue.maxsize - self.queue.qsize(), 0)
+        )
+        next_attempt_at = [
+            leased_until if index < room else now for index in range(len(payloads))
+        ]
+        async with self.repository_factory() as repo:
+            ids = await repo.create_many(
+                webhook_url=webhook_url,
+                topic=topic,
+                payloads=payloads,
+                next_attempt_at=next_attempt_at,
+            )
+        queued = await self._offer_all(
+            [
+                WebhookDelivery(
+                    id=delivery_id,
+                    webhook_url=webhook_url,
+                    topic=topic,
+                    payload=payload,
+                    attempts=0,
+                )
+                for delivery_id, payload in zip(ids[:room], payloads[:room])
+            ]
         )
+        for index in range(len(ids)):
+            webhook_metrics.record_enqueued(index >= queued)
+        return True
 
-        # Check if the request was successful (status code 200)
-        if response.status_code == 200:
-            print("Webhook sent successfully.")
+    def _offer(self, delivery: WebhookDelivery) -> bool:
+        """Queue a delivery, False if the queue is full"""
+        if delivery.id in self.in_flight:
             return True
-        else:
-            print(f"Failed to send webhook. Status code: {response.status_code}")
+        try:
+            self.queue.put_nowait(delivery)
+        except asyncio.QueueFull:
             return False
+        self.in_flight.add(delivery.id)
+        webhook_metrics.record_queue_depth(self.queue.qsize())
+        return True
+
+    async def _offer_all(self, deliveries: typing.List[WebhookDelivery]) -> int:
+        """Queue leased deliveries, returns how many were queued.
+
+        Deliveries that no longer fit, because the queue filled up while
+        they were written or claimed, are made due again rather than left
+        waiting for their lease to expire.
+        """
+        unqueued = [delivery.id for delivery in deliveries if not self._offer(delivery)]
+        if unqueued:
+            async with self.repository_factory() as repo:
+                await repo.make_due(unqueued, datetime.datetime.utcnow())
+        return len(deliveries) - len(unqueued)
+
+    def _get_session(self, url: str) -> aiohttp.ClientSession:
+        parts = urlsplit(url)
+        host = f"{parts.scheme}://{parts.netloc}"
+        session = self.sessions.get(host)
+        if session is None:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.config.connections_per_host),
+                timeout=aiohttp.ClientTimeout(total=self.config.timeout),
+            )
+            self.sessions[host] = session
+        return session
+
+    async def _work(self) -> None:
+        while True:
+            delivery = await self.queue.get()
+            webhook_metrics.record_queue_depth(self.queue.qsize())
+            try:
+                await self._deliver(delivery)
+            except Exception as e:
+                self.logger.error(f"Exception occurred during sending webhook: {e}")
+            finally:
+                self.in_flight.discard(delivery.id)
+                self.queue.task_done()
+
+    async def _deliver(self, delivery: WebhookDelivery) -> None:
+        attempts = delivery.attempts + 1
+        error = None
+        started = time.perf_counter()
+        try:
+            session = self._get_session(delivery.url)
+            async with session.post(delivery.url, json=delivery.payload) as response:
+                if not 200 <= response.status < 300:
+                    error = f"Status code: {response.status}"
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            error = f"{type(e).__name__}: {e}"
+        elapsed = time.perf_counter() - started
+
+        now = datetime.datetime.utcnow()
+        if error is None:
+            status = WebhookDeliveryStatus.Delivered.value
+            values = {"deliveredAt": now, "lastError": None}
+        elif attempts >= self.config.max_attempts:
+            status = WebhookDeliveryStatus.Failed.value
+            values = {"lastError": error}
+            self.logger.error(
+                f"Failed to send webhook {delivery.id} to {delivery.url} "
+                f"after {attempts} attempts: {error}"
+            )
+        else:
+            status = WebhookDeliveryStatus.Pending.value
+            values = {
+                "lastError": error,
+                "nextAttemptAt": now + self.config.backoff(attempts),
+            }
+        webhook_metrics.record_attempt(elapsed, status)
+
+        async with self.repository_factory() as repo:
+            await repo.update(
+                delivery.id, status=status, attempts=attempts, **values
+            )
+
+    async def _poll(self) -> None:
+        while True:
+            free = self.queue.maxsize - self.queue.qsize()
+            if free > 0:
+                try:
+                    lease_until = datetime.datetime.utcnow() + datetime.timedelta(
+                        seconds=self.config.lease
+                    )
+                    async with self.repository_factory() as repo:
+                        rows = await repo.claim_due(
+                            limit=free, lease_until=lease_until
+                        )
+                    await self._offer_all(
+                        [WebhookDelivery.from_row(row) for row in rows]
+                    )
+                except Exception as e:
+                    self.logger.error(f"Exception occurred polling webhook outbox: {e}")
+            await asyncio.sleep(self.config.poll_interval)
+
+
+_dispatcher: typing.Optional[WebhookDispatcher] = None
+
+
+def set_webhook_dispatcher(dispatcher: typing.Optional[WebhookDispatcher]) -> None:
+    global _dispatcher
+    _dispatcher = dispatcher
+
+
+async def send_webhook(webhook_base_url, payload=None, topic="/topic/issue_credential/"):
+    """Queue a webhook for delivery.
+
+    Without a running dispatcher, e.g. outside of the server, the webhook
+    is sent directly with a single attempt.
+    """
+    if _dispatcher is not None:
+        return await _dispatcher.enqueue(webhook_base_url, payload, topic)
+
+    webhook_url = webhook_base_url + topic
+    try:
+        async with aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=WebhookConfig.timeout)
+        ) as session:
+            async with session.post(webhook_url, json=payload) as response:
+                if response.status == 200:
+                    print("Webhook sent successfully.")
+                    return True
+                print(f"Failed to send webhook. Status code: {response.status}")
+                return False
     except Exception as e:
         print(f"An error occurred while sending the webhook: {e}")
         return False
+
+
+async def send_webhooks(
+    webhook_base_url, payloads, topic="/topic/issue_credential/"
+) -> bool:
+    """Queue a batch of webhooks for the same receiver"""
+    if _dispatcher is not None:
+        return await _dispatcher.enqueue_many(webhook_base_url, payloads, topic)
+
+    results = [
+        await send_webhook(webhook_base_url, payload, topic) for payload in payloads
+    ]
+    return all(results)
+
+
+def webhook_options(func):
+    options = [
+        click.option(
+            "--webhook-queue-size",
+            envvar="WEBHOOK_QUEUE_SIZE",
+            default=WebhookConfig.queue_size,
+            type=int,
+            help="Webhook deliveries held in memory before they wait in the outbox",
+        ),
+        click.option(
+            "--webhook-concurrency",
+            envvar="WEBHOOK_CONCURRENCY",
+            default=WebhookConfig.concurrency,
+            type=int,
+            help="Webhooks delivered at the same time",
+        ),
+        click.option(
+            "--webhook-connections-per-host",
+            envvar="WEBHOOK_CONNECTIONS_PER_HOST",
+            default=WebhookConfig.connections_per_host,
+            type=int,
+            help="Keep-alive connections per webhook receiver",
+        ),
+        click.option(
+            "--webhook-timeout",
+            envvar="WEBHOOK_TIMEOUT",
+            default=WebhookConfig.timeout,
+            type=int,
+            help="Seconds to wait for a webhook receiver",
+        ),
+        click.option(
+            "--webhook-max-attempts",
+            envvar="WEBHOOK_MAX_ATTEMPTS",
+            default=WebhookConfig.max_attempts,
+            type=int,
+            help="Attempts before a webhook delivery is marked as failed",
+        ),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
+
+
+def get_webhook_config(
+    webhook_queue_size: int,
+    webhook_concurrency: int,
+    webhook_connections_per_host: int,
+    webhook_timeout: int,
+    webhook_max_attempts: int,
+) -> WebhookConfig:
+    return WebhookConfig(
+        queue_size=webhook_queue_size,
+        concurrency=webhook_concurrency,
+        connections_per_host=webhook_connections_per_host,
+        timeout=webhook_timeout,
+        max_attempts=webhook_max_attempts,
+    )
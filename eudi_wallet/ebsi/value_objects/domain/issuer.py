@@ -48,6 +48,15 @@ class CredentialOfferStatuses(Enum):
     CredentialAcknowledged = "credential_acked"
 
 
+@dataclass
+class CredentialOfferRequest(DataClassJsonMixin):
+    issuance_mode: CredentialIssuanceModes
+    is_pre_authorised: bool = False
+    user_pin: typing.Optional[str] = None
+    data_attribute_values: typing.Optional[list] = None
+    limited_disclosure: bool = False
+
+
 @dataclass
 class AcceptanceTokenResponse(DataClassJsonMixin):
     acceptance_token: typing.Optional[str] = None
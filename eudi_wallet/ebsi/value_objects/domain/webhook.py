@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class WebhookDeliveryStatus(Enum):
+    Pending = "pending"
+    Delivered = "delivered"
+    Failed = "failed"
@@ -1,12 +1,31 @@
-from eudi_wallet.util import http_call
+import aiohttp
 
+from eudi_wallet.ebsi_did_resolver.cache import did_resolution_cache
 
-async def resolve(did, options):
 
-    did_document = await http_call(f"{options['registry']}/{did}", "GET")
+async def _fetch(did, options):
+    async with aiohttp.ClientSession() as session:
+        async with session.get(f"{options['registry']}/{did}") as resp:
+            if resp.status == 404:
+                return {
+                    "didDocument": None,
+                    "didDocumentMetadata": {},
+                    "didResolutionMetadata": {"error": "notFound"},
+                }, False
+
+            # Other errors are raised and not cached
+            resp.raise_for_status()
+            did_document = await resp.json(content_type=None)
 
     return {
         "didDocument": did_document,
         "didDocumentMetadata": {},
         "didResolutionMetadata": {"Content-Type": "application/did+ld+json"},
-    }
+    }, True
+
+
+async def resolve(did, options):
+
+    return await did_resolution_cache.get_or_resolve(
+        f"{options['registry']}/{did}", lambda: _fetch(did, options)
+    )
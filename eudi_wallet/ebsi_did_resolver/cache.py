@@ -0,0 +1,95 @@
+import asyncio
+import time
+import typing
+
+from eudi_wallet.ebsi.utils.cache import LRUCache
+
+# Seconds a resolved DID document is reused
+POSITIVE_TTL = 3600
+# Seconds an unknown DID is remembered as unknown
+NEGATIVE_TTL = 60
+
+
+class DIDDocumentStore(typing.Protocol):
+    """Optional persistent backing for the resolution cache"""
+
+    async def get(self, key: str) -> typing.Optional[typing.Tuple[dict, float]]:
+        """Return the resolution result and its expiry as a unix timestamp"""
+        ...
+
+    async def set(self, key: str, result: dict, expires_at: float) -> None:
+        ...
+
+
+class DIDResolutionCache:
+    """Resolution results keyed by registry and DID.
+
+    Concurrent resolutions of the same DID share a single registry request.
+    Results that were not found are cached for a shorter time than
+    documents, so that a newly registered DID is picked up quickly.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        positive_ttl: int = POSITIVE_TTL,
+        negative_ttl: int = NEGATIVE_TTL,
+        store: typing.Optional[DIDDocumentStore] = None,
+    ):
+        self.entries = LRUCache(maxsize=maxsize)
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.store = store
+        self.in_flight: typing.Dict[str, asyncio.Future] = {}
+
+    async def get_or_resolve(
+        self,
+        key: str,
+        resolve: typing.Callable[[], typing.Awaitable[typing.Tuple[dict, bool]]],
+    ) -> dict:
+        cached = self.entries.get(key)
+        if cached is not None and time.time() < cached[1]:
+            return cached[0]
+
+        future = self.in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._resolve(key, resolve))
+            self.in_flight[key] = future
+            future.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def _resolve(
+        self,
+        key: str,
+        resolve: typing.Callable[[], typing.Awaitable[typing.Tuple[dict, bool]]],
+    ) -> dict:
+        # The store only saves registry requests, resolution does not
+        # depend on it being available
+        if self.store is not None:
+            try:
+                stored = await self.store.get(key)
+            except Exception:
+                stored = None
+            if stored is not None and time.time() < stored[1]:
+                self.entries.set(key, stored)
+                return stored[0]
+
+        result, found = await resolve()
+        expires_at = time.time() + (self.positive_ttl if found else self.negative_ttl)
+        self.entries.set(key, (result, expires_at))
+        if self.store is not None:
+            try:
+                await self.store.set(key, result, expires_at)
+            except Exception:
+                pass
+        return result
+
+    def invalidate(self, key: str) -> None:
+        self.entries.pop(key)
+
+
+did_resolution_cache = DIDResolutionCache()
+
+
+def set_did_document_store(store: typing.Optional[DIDDocumentStore]) -> None:
+    did_resolution_cache.store = store
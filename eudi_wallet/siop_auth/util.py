@@ -15,6 +15,7 @@ from coincurve import PublicKey
 
 from eudi_wallet.did_jwt import create_jwt, decode_jwt
 from eudi_wallet.did_jwt.signer_algorithm import ES256K_signer_algorithm
+from eudi_wallet.ebsi.utils.discovery_cache import discovery_cache
 from eudi_wallet.ethereum import Ethereum
 from eudi_wallet.util import (
     get_element_by_index_from_list,
@@ -184,9 +185,7 @@ async def fetch_openid_credential_issuer_configuration(
     credential_issuer_uri: str,
 ) -> OpenIDCredentialIssuerConfig:
     wellknown_uri = credential_issuer_uri + "/.well-known/openid-credential-issuer"
-    openid_credential_issuer_config = await http_call(
-        wellknown_uri, "GET", data=None, headers=None
-    )
+    openid_credential_issuer_config = await discovery_cache.get(wellknown_uri)
     return OpenIDCredentialIssuerConfig(**openid_credential_issuer_config)
 
 
@@ -235,9 +234,7 @@ class OpenIDAuthServerConfig:
 
 async def fetch_openid_auth_server_configuration(authorization_server_uri: str) -> dict:
     wellknown_uri = authorization_server_uri + "/.well-known/openid-configuration"
-    openid_auth_server_config = await http_call(
-        wellknown_uri, "GET", data=None, headers=None
-    )
+    openid_auth_server_config = await discovery_cache.get(wellknown_uri)
     return OpenIDAuthServerConfig(**openid_auth_server_config)
 
 
@@ -0,0 +1,50 @@
+import asyncio
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from eudi_wallet.ebsi.utils.db import RequestScopedSession
+
+
+def _request_session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'request_session.db'}")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE record (id INTEGER PRIMARY KEY)"))
+    return engine, RequestScopedSession(sessionmaker(bind=engine))
+
+
+def _count_records(engine) -> int:
+    with engine.connect() as connection:
+        return connection.execute(text("SELECT count(*) FROM record")).scalar_one()
+
+
+def test_nested_session_commit_is_persisted(tmp_path):
+    engine, request_session = _request_session(tmp_path)
+
+    outer = request_session()
+    outer.execute(text("SELECT 1"))
+
+    inner = request_session()
+    inner.execute(text("INSERT INTO record (id) VALUES (1)"))
+    inner.commit()
+    inner.close()
+
+    # The outer session never commits, which must not undo the inner commit
+    outer.close()
+    asyncio.run(request_session.close())
+
+    assert _count_records(engine) == 1
+
+
+def test_sequential_sessions_commit(tmp_path):
+    engine, request_session = _request_session(tmp_path)
+
+    for record_id in (1, 2):
+        session = request_session()
+        session.execute(text(f"INSERT INTO record (id) VALUES ({record_id})"))
+        session.commit()
+        session.close()
+    asyncio.run(request_session.close())
+
+    assert _count_records(engine) == 2
+    assert request_session.connection is None